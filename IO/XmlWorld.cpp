@@ -2,6 +2,7 @@
 #include "View/Texturizer.h"
 #include <KrisLibrary/utils/stringutils.h>
 #include <KrisLibrary/utils/fileutils.h>
+#include <KrisLibrary/utils/SimpleFile.h>
 #include <fstream>
 
 ///defined in XmlODE.cpp
@@ -501,6 +502,45 @@ bool XmlWorld::GetWorld(RobotWorld& world)
   return true;
 }
 
+///Adds the geometry file referenced by an element file fn to files.  Object
+///(.obj) and terrain (.env) files are read to find their mesh files.
+static void AddGeometryFile(const string& fn,vector<string>& files)
+{
+  const char* ext=FileExtension(fn.c_str());
+  if(!ext) return;
+  if(0==strcmp(ext,"obj") || 0==strcmp(ext,"env")) {
+    SimpleFile f(fn.c_str());
+    if(!f || f.count("mesh")==0 || f["mesh"].size()!=1) return;
+    files.push_back(GetFilePath(fn) + f["mesh"][0].AsString());
+  }
+  else if(Geometry::AnyGeometry3D::CanLoadExt(ext))
+    files.push_back(fn);
+}
+
+void XmlWorld::GetGeometryFiles(vector<string>& files)
+{
+  files.resize(0);
+  if(!elem) return;
+  TiXmlElement* e = GetElement("rigidObject");
+  while(e) {
+    const char* fn = e->Attribute("file");
+    if(fn) AddGeometryFile(path + string(fn),files);
+    TiXmlElement* geom=e->FirstChildElement("geometry");
+    if(geom) {
+      fn = geom->Attribute("file");
+      if(!fn) fn = geom->Attribute("mesh");
+      if(fn) files.push_back(path + string(fn));
+    }
+    e = e->NextSiblingElement("rigidObject");
+  }
+  e = GetElement("terrain");
+  while(e) {
+    const char* fn = e->Attribute("file");
+    if(fn) AddGeometryFile(path + string(fn),files);
+    e = e->NextSiblingElement("terrain");
+  }
+}
+
 TiXmlElement* XmlWorld::GetElement(const string& name)
 {
   if(!elem) return NULL;
@@ -42,6 +42,9 @@ class XmlWorld
   bool Load(const string& fn);
   bool Load(TiXmlElement* e,string path=string());
   bool GetWorld(RobotWorld& world);
+  ///Returns the geometry files of the rigid objects and terrains in the world,
+  ///e.g., for ManagedGeometry::Preload.  Robot geometries are not included.
+  void GetGeometryFiles(vector<string>& files);
   TiXmlElement* GetElement(const string& name);
   TiXmlElement* GetElement(const string& name,int index);
   TiXmlElement* GetRobot(int index) { return GetElement("robot",index); }
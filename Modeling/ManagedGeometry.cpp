@@ -2,8 +2,11 @@
 #include "IO/ROS.h"
 #include <KrisLibrary/meshing/PointCloud.h>
 #include <string.h>
+#include <ctype.h>
+#include <set>
 #include <KrisLibrary/Timer.h>
 #include <KrisLibrary/utils/stringutils.h>
+#include <KrisLibrary/utils/threadutils.h>
 using namespace Math3D;
 
 #define CACHE_DEBUG 0
@@ -31,6 +34,7 @@ void GeometryManager::Clear()
       i->second.geoms[j]->cacheKey.clear();
   }
   cache.clear();
+  preloaded.clear();
 }
 
 
@@ -102,7 +106,7 @@ bool ManagedGeometry::Load(const std::string& filename)
   if(prev) {
     cacheKey = filename;
     //printf("ManagedGeometry: Copying data from previously loaded file %s\n",filename.c_str());
-    if(!prev->geometry->CollisionDataInitialized()) {
+    if(!deferCollisionInit && !prev->geometry->CollisionDataInitialized()) {
       Timer timer;
       prev->geometry->InitCollisionData();
       double t = timer.ElapsedTime();
@@ -167,16 +171,23 @@ bool ManagedGeometry::LoadNoCache(const std::string& filename)
   const char* ext=FileExtension(fn);
   if(ext) {
     if(Geometry::AnyGeometry3D::CanLoadExt(ext)) {
-      Timer timer;
-      geometry = new Geometry::AnyCollisionGeometry3D();
-      if(!geometry->Load(fn)) {
-        fprintf(stderr,"ManagedGeometry: Error loading geometry file %s\n",fn);
-	geometry = NULL;
-        return false;
+      std::map<std::string,GeometryPtr>::iterator p = manager.preloaded.find(PreloadKey(filename));
+      if(p != manager.preloaded.end()) {
+	geometry = p->second;
+	manager.preloaded.erase(p);
+      }
+      else {
+	Timer timer;
+	geometry = new Geometry::AnyCollisionGeometry3D();
+	if(!geometry->Load(fn)) {
+	  fprintf(stderr,"ManagedGeometry: Error loading geometry file %s\n",fn);
+	  geometry = NULL;
+	  return false;
+	}
+	double t = timer.ElapsedTime();
+	if(t > 0.2) 
+	  printf("ManagedGeometry: loaded %s in time %gs\n",filename.c_str(),t);
       }
-      double t = timer.ElapsedTime();
-      if(t > 0.2) 
-	printf("ManagedGeometry: loaded %s in time %gs\n",filename.c_str(),t);
       if(geometry->type == Geometry::AnyGeometry3D::TriangleMesh) {
 	if(geometry->TriangleMeshAppearanceData() != NULL) {
 	  appearance = new GLDraw::GeometryAppearance(*geometry->TriangleMeshAppearanceData());
@@ -213,6 +224,122 @@ ManagedGeometry* ManagedGeometry::IsCached(const std::string& filename)
   return i->second.geoms[0];
 }
 
+bool ManagedGeometry::IsReentrantFormat(const char* ext)
+{
+  //KrisLibrary's own mesh parsers keep no shared state
+  std::string lext = ext;
+  for(size_t i=0;i<lext.length();i++) lext[i] = tolower(lext[i]);
+  return (lext == "off" || lext == "tri");
+}
+
+std::string ManagedGeometry::PreloadKey(const std::string& filename)
+{
+  bool absolute = (!filename.empty() && (filename[0]=='/' || filename[0]=='\\'));
+  std::vector<std::string> parts;
+  size_t start = 0;
+  while(start <= filename.length()) {
+    size_t end = filename.find_first_of("/\\",start);
+    if(end == std::string::npos) end = filename.length();
+    std::string part = filename.substr(start,end-start);
+    if(part == ".." && !parts.empty() && parts.back() != "..") 
+      parts.pop_back();
+    else if(!part.empty() && part != "." && !(part == ".." && absolute))
+      parts.push_back(part);
+    start = end+1;
+  }
+  std::string res = (absolute ? "/" : "");
+  for(size_t i=0;i<parts.size();i++) {
+    if(i > 0) res += "/";
+    res += parts[i];
+  }
+  return res;
+}
+
+//serializes the readers that aren't reentrant
+static Mutex gNonReentrantLoadMutex;
+
+struct PreloadData
+{
+  std::vector<std::string> filenames;
+  std::vector<ManagedGeometry::GeometryPtr> geometries;
+  size_t next;
+  Mutex mutex;
+};
+
+static void* preload_thread_func(void* ptr)
+{
+  PreloadData* data = reinterpret_cast<PreloadData*>(ptr);
+  while(true) {
+    size_t i;
+    {
+      ScopedLock lock(data->mutex);
+      if(data->next >= data->filenames.size()) break;
+      i = data->next;
+      data->next++;
+    }
+    const char* fn = data->filenames[i].c_str();
+    ManagedGeometry::GeometryPtr geom = new Geometry::AnyCollisionGeometry3D();
+    bool loaded;
+    if(ManagedGeometry::IsReentrantFormat(FileExtension(fn)))
+      loaded = geom->Load(fn);
+    else {
+      ScopedLock lock(gNonReentrantLoadMutex);
+      loaded = geom->Load(fn);
+    }
+    if(loaded)
+      data->geometries[i] = geom;
+    //on failure, Load reports the error when it reads the file itself
+  }
+  return NULL;
+}
+
+int ManagedGeometry::Preload(const std::vector<std::string>& filenames,int numThreads)
+{
+  PreloadData data;
+  std::vector<std::string> keys;
+  std::set<std::string> added;
+  for(size_t i=0;i<filenames.size();i++) {
+    const std::string& fn = filenames[i];
+    if(0==strncmp(fn.c_str(),"ros:",4)) continue;
+    std::string key = PreloadKey(fn);
+    if(IsCached(fn) || manager.preloaded.count(key) != 0) continue;
+    const char* ext=FileExtension(fn.c_str());
+    if(!ext || !Geometry::AnyGeometry3D::CanLoadExt(ext)) continue;
+    if(added.count(key) != 0) continue;
+    added.insert(key);
+    data.filenames.push_back(fn);
+    keys.push_back(key);
+  }
+  if(data.filenames.empty()) return 0;
+  data.geometries.resize(data.filenames.size());
+  data.next = 0;
+  if(numThreads > (int)data.filenames.size()) numThreads = (int)data.filenames.size();
+  //the calling thread works too
+  int numWorkers = (numThreads > 1 ? numThreads-1 : 0);
+  Thread* threads = new Thread[numWorkers+1];
+  for(int i=0;i<numWorkers;i++)
+    threads[i] = ThreadStart(preload_thread_func,&data);
+  preload_thread_func(&data);
+  for(int i=0;i<numWorkers;i++)
+    ThreadJoin(threads[i]);
+  delete [] threads;
+  int n=0;
+  for(size_t i=0;i<data.filenames.size();i++) {
+    if(data.geometries[i]) {
+      manager.preloaded[keys[i]] = data.geometries[i];
+      n++;
+    }
+  }
+  return n;
+}
+
+int ManagedGeometry::ClearPreloaded()
+{
+  int n = (int)manager.preloaded.size();
+  manager.preloaded.clear();
+  return n;
+}
+
 bool ManagedGeometry::IsCached() const
 {
   return !cacheKey.empty();
@@ -367,3 +494,4 @@ bool ManagedGeometry::DynamicGeometryUpdate()
 
 
 GeometryManager ManagedGeometry::manager;
+bool ManagedGeometry::deferCollisionInit = false;
@@ -6,6 +6,7 @@
 #include <KrisLibrary/utils/SmartPointer.h>
 #include <map>
 #include <string>
+#include <vector>
 
 class GeometryManager;
 
@@ -27,6 +28,14 @@ class GeometryManager;
  * Note: geometries are not shared, but rather cached-and-copied.  Appearances
  * on the other hand are by default shared. To make an object have its own
  * custom appearance, call SetUniqueAppearance().
+ *
+ * Note: if deferCollisionInit is true, the collision data structures of the
+ * prior geometry are not created on a cached Load.  Each copy then creates
+ * its own on the first collision query.
+ *
+ * Note: many files can be decoded in parallel threads using Preload.
+ * Subsequent Load calls take the decoded geometries rather than reading the
+ * files again.
  */
 class ManagedGeometry
 {
@@ -57,6 +66,23 @@ class ManagedGeometry
   void AddToCache(const std::string& filename);
   ///Returns the filename to which this object is cached
   const std::string& CachedFilename() const;
+  ///Decodes the given geometry files using numThreads parallel threads, and
+  ///stores them for subsequent Load / LoadNoCache calls.  Files that are
+  ///already cached or have unknown extensions are skipped.  Only formats with
+  ///reentrant readers (see IsReentrantFormat) are decoded concurrently; the
+  ///others are decoded one at a time.  Returns the number of files decoded.
+  static int Preload(const std::vector<std::string>& filenames,int numThreads);
+  ///Discards preloaded geometries that were not taken by Load calls, and
+  ///returns how many there were.
+  static int ClearPreloaded();
+  ///Returns true if files with the given extension can be read by several
+  ///threads at once.  Readers that go through shared importer state (e.g.,
+  ///Assimp) are not.
+  static bool IsReentrantFormat(const char* ext);
+  ///Returns the key under which a preloaded file is stored, i.e., the
+  ///filename with "." and ".." components and repeated separators removed,
+  ///so that different spellings of the same path match.
+  static std::string PreloadKey(const std::string& filename);
   ///Remove self from cache, if in it
   void RemoveFromCache();
   ///Transforms the geometry (requires removing from cache, and
@@ -94,6 +120,9 @@ class ManagedGeometry
 
   friend class GeometryManager;
   static GeometryManager manager;
+  ///If true, cached Loads do not initialize collision data structures
+  ///(default false)
+  static bool deferCollisionInit;
 
  private:
   std::string cacheKey,dynamicGeometrySource;
@@ -114,6 +143,7 @@ public:
     std::vector<ManagedGeometry*> geoms;
   };
   std::map<std::string,GeometryList> cache;
+  std::map<std::string,SmartPointer<Geometry::AnyCollisionGeometry3D> > preloaded;
 };
 
 #endif
@@ -0,0 +1,42 @@
+#!/usr/bin/python
+
+import sys
+import time
+from klampt import *
+from klampt.model import ik,config,cartesian_trajectory
+from klampt.math import vectorops,se3
+
+if __name__ == "__main__":
+    print "cartesianbenchmark.py: compares the line search and resolved-rate"
+    print "modes of Cartesian straight line interpolation"
+    robotfile = "../../data/robots/tx90l.rob"
+    if len(sys.argv) > 1:
+        robotfile = sys.argv[1]
+    world = WorldModel()
+    robot = world.loadRobot(robotfile)
+    if robot.index < 0:
+        raise IOError("Unable to load robot file "+robotfile)
+    link = robot.link(robot.numLinks()-1)
+    qmin,qmax = robot.getJointLimits()
+    q0 = [0.5*(a+b) for (a,b) in zip(qmin,qmax)]
+    q0[2] = 0.5
+    q0[3] = 0.5
+    robot.setConfig(q0)
+    Ta = link.getTransform()
+    Tb = (Ta[0],vectorops.add(Ta[1],[0.0,0.4,-0.2]))
+    goal = ik.objective(link,R=Ta[0],t=Ta[1])
+    a = config.getConfig(goal)
+    goal = ik.objective(link,R=Tb[0],t=Tb[1])
+    b = config.getConfig(goal)
+    N = 10
+    for name,func in [('line search',cartesian_trajectory.cartesian_interpolate_linear),
+                      ('resolved rate',cartesian_trajectory.cartesian_interpolate_resolved_rate)]:
+        t0 = time.time()
+        for i in xrange(N):
+            robot.setConfig(q0)
+            res = func(robot,a,b,goal,startConfig=q0,delta=1e-2)
+        t = (time.time()-t0)/N
+        if res is None:
+            print "%s: failed, %.1fms"%(name,t*1000)
+        else:
+            print "%s: %d milestones, %.1fms"%(name,len(res.milestones),t*1000)
@@ -0,0 +1,85 @@
+#!/usr/bin/python
+
+import sys
+import time
+from klampt import *
+from klampt.math import se3
+from klampt.model import coordinates
+
+def make_frame_tree(world,depth,branching):
+    """Returns a coordinates.Manager containing the world's elements, with a
+    tree of fixed frames of the given depth and branching factor attached to
+    every robot link"""
+    manager = coordinates.Manager()
+    manager.setWorldModel(world)
+    offset = (se3.identity()[0],[0.0,0.0,0.1])
+    for i in xrange(world.numRobots()):
+        group = manager.subgroups[world.robot(i).getName()]
+        for j in xrange(world.robot(i).numLinks()):
+            parents = [world.robot(i).link(j).getName()]
+            for d in xrange(depth):
+                children = []
+                for p in parents:
+                    for b in xrange(branching):
+                        name = "%s_%d"%(p,b)
+                        group.addFrame(name,parent=p,relativeCoordinates=offset)
+                        children.append(name)
+                parents = children
+    return manager
+
+def naive_update(group):
+    """The original Group.updateFromWorld, which recomputes every frame"""
+    for (n,f) in group.frames.iteritems():
+        if f._data == None or not hasattr(f._data,'getTransform'):
+            continue
+        worldCoordinates = f._data.getTransform()
+        if hasattr(f._data,'getParent'):
+            p = f._data.getParent()
+            if p >= 0:
+                plink = f._data.robot().link(p)
+                f._relativeCoordinates = se3.mul(se3.inv(plink.getTransform()),worldCoordinates)
+            else:
+                f._relativeCoordinates = worldCoordinates
+        else:
+            f._relativeCoordinates = worldCoordinates
+        f._worldCoordinates = worldCoordinates
+        for c in group.childLists[f._name]:
+            if c._data == None or not hasattr(c._data,'getTransform'):
+                c._worldCoordinates = se3.mul(f._worldCoordinates,c._relativeCoordinates)
+                group.updateDependentFrames(c)
+    for (n,g) in group.subgroups.iteritems():
+        naive_update(g)
+
+def time_updates(func,robot,moves,iters):
+    t0 = time.time()
+    q = robot.getConfig()
+    for i in xrange(iters):
+        if moves:
+            q[-1] += 0.001
+            robot.setConfig(q)
+        func()
+    return (time.time()-t0)/iters
+
+if __name__ == "__main__":
+    print "coordinatesbenchmark.py: compares full and incremental"
+    print "coordinates.Manager.updateFromWorld on a deep frame tree"
+    fn = "../../data/robots/athlete.rob"
+    depth = 4
+    if len(sys.argv) > 1:
+        fn = sys.argv[1]
+    if len(sys.argv) > 2:
+        depth = int(sys.argv[2])
+    world = WorldModel()
+    if not world.readFile(fn):
+        raise IOError("Unable to read file "+fn)
+    robot = world.robot(0)
+    manager = make_frame_tree(world,depth,2)
+    numFrames = sum(len(g.frames) for g in manager.subgroups.itervalues())
+    print "%d links, %d frames"%(robot.numLinks(),numFrames)
+    iters = 20
+    manager.updateFromWorld()
+    for moves in [False,True]:
+        tnaive = time_updates(lambda:naive_update(manager),robot,moves,iters)
+        tforce = time_updates(lambda:manager.updateFromWorld(force=True),robot,moves,iters)
+        tinc = time_updates(lambda:manager.updateFromWorld(),robot,moves,iters)
+        print "%s: naive %.3fms, forced %.3fms, incremental %.3fms"%(("robot moving" if moves else "robot stationary"),tnaive*1000,tforce*1000,tinc*1000)
@@ -0,0 +1,48 @@
+#!/usr/bin/python
+
+import sys
+import time
+import random
+from klampt import *
+from klampt.model import ik
+from klampt.math import vectorops
+
+if __name__ == "__main__":
+    print "ikbenchmark.py: compares the throughput of ik.solve_many against"
+    print "constructing an objective and solving it for each target"
+    robotfile = "../../data/robots/tx90l.rob"
+    if len(sys.argv) > 1:
+        robotfile = sys.argv[1]
+    world = WorldModel()
+    robot = world.loadRobot(robotfile)
+    if robot.index < 0:
+        raise IOError("Unable to load robot file "+robotfile)
+    link = robot.link(robot.numLinks()-1)
+    localpt = [0,0,0]
+    #sample reachable targets from random configurations
+    N = 1000
+    random.seed(0)
+    targets = []
+    qmin,qmax = robot.getJointLimits()
+    for i in xrange(N):
+        robot.setConfig([random.uniform(a,b) for (a,b) in zip(qmin,qmax)])
+        targets.append(link.getWorldPosition(localpt))
+    #sort targets along a sweep so that neighbors tend to be nearby
+    targets = sorted(targets)
+    q0 = [0.5*(a+b) for (a,b) in zip(qmin,qmax)]
+
+    robot.setConfig(q0)
+    t0 = time.time()
+    numSolved = 0
+    for t in targets:
+        robot.setConfig(q0)
+        if ik.solve(ik.objective(link,local=localpt,world=t)):
+            numSolved += 1
+    tpercall = time.time()-t0
+    print "Per-call ik.solve: %.1f solves/s, %d/%d solved"%(N/tpercall,numSolved,N)
+
+    robot.setConfig(q0)
+    t0 = time.time()
+    solutions,success,residuals = ik.solve_many(ik.objective(link,local=localpt,world=targets[0]),targets)
+    tmany = time.time()-t0
+    print "ik.solve_many:     %.1f solves/s, %d/%d solved"%(N/tmany,sum(success),N)
@@ -0,0 +1,96 @@
+#!/usr/bin/python
+
+import sys
+import time
+import random
+from klampt import *
+from klampt.math import so3,se3
+from klampt.model.contact import ContactPoint,Hold
+from klampt.io import loader
+
+def token_read_vector_list(text):
+    """The original loader.readVectorList implementation, which converts
+    each vector token-by-token"""
+    items = text.split()
+    vectors = []
+    pos = 0
+    while pos < len(items):
+        n = int(items[pos])
+        vectors.append([float(v) for v in items[pos+1:pos+1+n]])
+        pos += 1+n
+    return vectors
+
+def token_read_matrix(text):
+    """The original loader.readMatrix implementation"""
+    items = text.split()
+    m,n = int(items[0]),int(items[1])
+    k = 2
+    x = []
+    for i in xrange(m):
+        x.append([float(v) for v in items[k:k+n]])
+        k += n
+    return x
+
+def make_samples(numConfigs,dim):
+    """Returns a dict mapping each type in loader.readers to a sample object"""
+    configs = [[random.uniform(-1,1) for j in xrange(dim)] for i in xrange(numConfigs)]
+    ik = IKObjective()
+    ik.setFixedPoint(3,[0.0,0.0,0.25],[0.5,0.5,0.0])
+    h = Hold()
+    h.link = 3
+    h.contacts = [ContactPoint([0.0,0.0,0.0],[0.0,0.0,1.0],0.5) for i in xrange(4)]
+    h.ikConstraint = ik
+    g = GeometricPrimitive()
+    g.setSphere([0.0,0.0,0.0],1.0)
+    return {'Config':configs[0],
+            'Vector':[random.uniform(-1,1) for i in xrange(numConfigs)],
+            'Configs':configs,
+            'Vector3':[0.5,1.0,-0.25],
+            'Matrix':configs,
+            'Matrix3':so3.matrix(so3.rotation([0,0,1],0.5)),
+            'RotationMatrix':so3.rotation([0,0,1],0.5),
+            'RigidTransform':se3.identity(),
+            'IKObjective':ik,
+            'Hold':h,
+            'GeometricPrimitive':g,
+            'IntArray':range(numConfigs),
+            'StringArray':['link'+str(i) for i in xrange(100)],
+            }
+
+def time_call(func,arg,iters):
+    t0 = time.time()
+    for i in xrange(iters):
+        res = func(arg)
+    return (time.time()-t0)/iters,res
+
+if __name__ == "__main__":
+    print "loaderbenchmark.py: times each reader and writer in klampt.io.loader"
+    numConfigs = 10000
+    if len(sys.argv) > 1:
+        numConfigs = int(sys.argv[1])
+    samples = make_samples(numConfigs,30)
+    iters = 10
+    print "%-20s %12s %12s"%("Type","write (ms)","read (ms)")
+    for type in sorted(loader.readers.keys()):
+        if type not in loader.writers or type not in samples:
+            print "%-20s skipped"%(type,)
+            continue
+        twrite,text = time_call(loader.writers[type],samples[type],iters)
+        tread,res = time_call(loader.readers[type],text,iters)
+        print "%-20s %12.3f %12.3f"%(type,twrite*1000,tread*1000)
+
+    print
+    text = loader.writeVectorList(samples['Configs'])
+    tnaive,res = time_call(token_read_vector_list,text,iters)
+    tbulk,res = time_call(loader.readVectorList,text,iters)
+    print "Configs, %d x 30: token-by-token %.3fms, bulk %.3fms"%(numConfigs,tnaive*1000,tbulk*1000)
+    text = loader.writeMatrix(samples['Matrix'])
+    tnaive,res = time_call(token_read_matrix,text,iters)
+    tbulk,res = time_call(loader.readMatrix,text,iters)
+    print "Matrix, %d x 30: token-by-token %.3fms, bulk %.3fms"%(numConfigs,tnaive*1000,tbulk*1000)
+
+    print
+    for type in ['Vector','Configs']:
+        tauto,res = time_call(loader.toJson,samples[type],iters)
+        ttyped,res = time_call(lambda x:loader.toJson(x,type),samples[type],iters)
+        print "toJson %s: inferred %.3fms, typed %.3fms"%(type,tauto*1000,ttyped*1000)
@@ -0,0 +1,53 @@
+#!/usr/bin/python
+
+import sys
+import time
+from klampt.model.multipath import MultiPath
+
+def linear_time_to_section(path,t):
+    """The original MultiPath.timeToSection implementation, which scans the
+    sections linearly"""
+    if t < path.startTime(): return -1
+    for i,s in enumerate(path.sections):
+        if t < s.times[-1]:
+            return i
+    return len(path.sections)
+
+if __name__ == "__main__":
+    print "multipathbenchmark.py: compares section lookup and evaluation on a"
+    print "long MultiPath"
+    numSections = 10000
+    if len(sys.argv) > 1:
+        numSections = int(sys.argv[1])
+    path = MultiPath()
+    for i in xrange(numSections):
+        s = MultiPath.Section()
+        s.times = [float(i),i+0.25,i+0.5,i+0.75,i+1.0]
+        s.configs = [[t,0.5*t,0.0] for t in s.times]
+        path.sections.append(s)
+    #evaluate at a 100Hz control rate over the whole path
+    dt = 0.01
+    N = int(path.duration()/dt)
+    queries = [i*dt for i in xrange(N)]
+
+    M = 1000
+    t0 = time.time()
+    for t in queries[::N/M]:
+        linear_time_to_section(path,t)
+    tlinear = (time.time()-t0)/M
+    t0 = time.time()
+    for t in queries[::N/M]:
+        path.timeToSection(t)
+    tindex = (time.time()-t0)/M
+    print "timeToSection: linear scan %.3fms, indexed %.3fms"%(tlinear*1000,tindex*1000)
+
+    t0 = time.time()
+    for t in queries:
+        path.eval(t)
+    teval = (time.time()-t0)/N
+    cursor = path.cursor()
+    t0 = time.time()
+    for t in queries:
+        cursor.eval(t)
+    tcursor = (time.time()-t0)/N
+    print "%d monotone evaluations: eval %.2fus, Cursor.eval %.2fus"%(N,teval*1e6,tcursor*1e6)
@@ -0,0 +1,40 @@
+#!/usr/bin/python
+
+import sys
+import time
+from klampt import *
+from klampt.sim import batch
+
+if __name__ == "__main__":
+    print "rolloutbenchmark.py: compares rollouts/sec of batch.doSim against"
+    print "batch.SimRollout, which reuses one simulator and in-memory snapshots"
+    worldfile = "../../data/tx90blocks.xml"
+    if len(sys.argv) > 1:
+        worldfile = sys.argv[1]
+    world = WorldModel()
+    if not world.readFile(worldfile):
+        raise IOError("Unable to read world file "+worldfile)
+    duration = 0.2
+    N = 50
+    returnItems = ['time','robots[0].actualConfig']
+    q0 = world.robot(0).getConfig()
+    def simStep(sim,joint,delta):
+        q = list(q0)
+        q[joint] += delta
+        sim.controller(0).setPIDCommand(q,[0.0]*len(q))
+
+    t0 = time.time()
+    for i in xrange(N):
+        batch.doSim(world,duration,{'args':(1,0.01*i)},returnItems,simStep=simStep)
+    tdosim = time.time()-t0
+
+    rollouts = batch.SimRollout(world)
+    t0 = time.time()
+    for i in xrange(N):
+        rollouts.rollout(duration,returnItems,simStep=simStep,args=(1,0.01*i))
+    trollout = time.time()-t0
+
+    print
+    print "%d rollouts of %gs:"%(N,duration)
+    print "  doSim:      %.1f rollouts/s"%(N/tdosim,)
+    print "  SimRollout: %.1f rollouts/s"%(N/trollout,)
@@ -0,0 +1,78 @@
+#!/usr/bin/python
+
+import sys
+import time
+from klampt import *
+from klampt.sim.simulation import SimpleSimulator
+
+def make_world(worldfile,numObjects):
+    """Loads worldfile and drops numObjects small blocks on a grid above it"""
+    world = WorldModel()
+    if not world.readFile(worldfile):
+        raise IOError("Unable to read world file "+worldfile)
+    for i in xrange(numObjects):
+        obj = world.loadRigidObject("../../data/objects/block_small.obj")
+        R,t = obj.getTransform()
+        obj.setTransform(R,[(i%10)*0.2-1.0,(i/10)%10*0.2-1.0,1.0+(i/100)*0.2])
+    return world
+
+def time_simulate(sim,simulate,dt,iters):
+    t0 = time.time()
+    for i in xrange(iters):
+        simulate(sim,dt)
+    return (time.time()-t0)/iters
+
+def benchmark_substeps(worldfile,numObjects,iters=10):
+    """Compares the substep rate of SimpleSimulator with one hook per object
+    against a single batched hook that touches every object"""
+    world = make_world(worldfile,numObjects)
+    sim = SimpleSimulator(world)
+    sim.substep_dt = 0.001
+    bodies = [sim.body(world.rigidObject(i)) for i in xrange(world.numRigidObjects())]
+    tnone = time_simulate(sim,SimpleSimulator.simulate,0.1,iters)
+    for i in xrange(world.numRigidObjects()):
+        sim.addHook([world.rigidObject(i),'time','dt'],lambda body,t,dt:body.applyWrench([0,0,0.1],[0,0,0]))
+    thooks = time_simulate(sim,SimpleSimulator.simulate,0.1,iters)
+    sim.hooks = []
+    sim.hook_args = []
+    def batch(t,dt):
+        for b in bodies:
+            b.applyWrench([0,0,0.1],[0,0,0])
+    sim.addBatchHook(batch)
+    tbatch = time_simulate(sim,SimpleSimulator.simulate,0.1,iters)
+    nsubsteps = 100
+    print "%d objects, substep rate (substeps/s):"%(numObjects,)
+    print "  No hooks:              %.1f"%(nsubsteps/tnone,)
+    print "  One hook per object:   %.1f"%(nsubsteps/thooks,)
+    print "  Single batched hook:   %.1f"%(nsubsteps/tbatch,)
+
+if __name__ == "__main__":
+    print "simbenchmark.py: measures the per-step overhead of SimpleSimulator.simulate"
+    print "over raw Simulator.simulate for worlds with many rigid objects, and the"
+    print "substep rate of hooks"
+    worldfile = "../../data/tx90blocks.xml"
+    if len(sys.argv) > 1:
+        worldfile = sys.argv[1]
+    dt = 0.01
+    iters = 100
+    for numObjects in [0,10,100,300]:
+        world = make_world(worldfile,numObjects)
+        sim = Simulator(world)
+        sim.setSetting("rigidObjectCollisions","0")
+        traw = time_simulate(sim,Simulator.simulate,dt,iters)
+        world = make_world(worldfile,numObjects)
+        sim = SimpleSimulator(world)
+        sim.setSetting("rigidObjectCollisions","0")
+        sim.substep_dt = dt
+        tsimple = time_simulate(sim,SimpleSimulator.simulate,dt,iters)
+        sim.setController(0,lambda controller:None)
+        tcontrolled = time_simulate(sim,SimpleSimulator.simulate,dt,iters)
+        sim.isolateObjects = False
+        tnoobjects = time_simulate(sim,SimpleSimulator.simulate,dt,iters)
+        print "%d objects:"%(numObjects,)
+        print "  Simulator.simulate:                       %.3fms"%(traw*1000,)
+        print "  SimpleSimulator.simulate, no controller:  %.3fms"%(tsimple*1000,)
+        print "  SimpleSimulator.simulate, controller:     %.3fms"%(tcontrolled*1000,)
+        print "  ... with isolateObjects=False:            %.3fms"%(tnoobjects*1000,)
+    for numObjects in [10,100]:
+        benchmark_substeps(worldfile,numObjects)
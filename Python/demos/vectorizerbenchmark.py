@@ -0,0 +1,62 @@
+#!/usr/bin/python
+
+import sys
+import time
+from klampt import *
+from klampt.model import map
+
+class NaiveVectorizer:
+    """The original Vectorizer implementation: re-evaluates every item path
+    with map.get_item / map.set_item on every call."""
+    def __init__(self,world,items):
+        self.world = world
+        self.ref = map.get_dict(world,items)
+        self.keys = self.ref.keys()
+        self.lengths = [len(map.flatten(self.ref[k])) for k in self.keys]
+
+    def getVector(self):
+        v = [map.get_item(self.world,k) for k in self.keys]
+        return sum([map.flatten(vi) for vi in v],[])
+
+    def setVector(self,v):
+        suml = 0
+        for l,k in zip(self.lengths,self.keys):
+            vk = v[suml:suml+l]
+            vk_val = map._match_hierarchy(vk,self.ref[k])
+            map.set_item(self.world,k,vk_val)
+            suml += l
+
+def time_vectorizer(v,iters):
+    t0 = time.time()
+    for i in xrange(iters):
+        x = v.getVector()
+    tget = (time.time()-t0)/iters
+    t0 = time.time()
+    for i in xrange(iters):
+        v.setVector(x)
+    tset = (time.time()-t0)/iters
+    return tget,tset
+
+if __name__ == "__main__":
+    print "vectorizerbenchmark.py: compares map.Vectorizer against re-evaluating"
+    print "item paths on every call"
+    worldfile = "../../data/tx90blocks.xml"
+    if len(sys.argv) > 1:
+        worldfile = sys.argv[1]
+    world = WorldModel()
+    if not world.readFile(worldfile):
+        raise IOError("Unable to read world file "+worldfile)
+    items = ['robots[0].config']
+    for i in xrange(world.numRigidObjects()):
+        items.append('rigidObjects['+str(i)+'].transform')
+    iters = 1000
+    tget,tset = time_vectorizer(NaiveVectorizer(world,items),iters)
+    print "Naive:      getVector %.3fms, setVector %.3fms"%(tget*1000,tset*1000)
+    v = map.Vectorizer(world,items)
+    tget,tset = time_vectorizer(v,iters)
+    print "Vectorizer: getVector %.3fms, setVector %.3fms"%(tget*1000,tset*1000)
+    buf = [0.0]*v.size
+    t0 = time.time()
+    for i in xrange(iters):
+        v.getVector(buf)
+    print "Vectorizer: getVector into preallocated buffer %.3fms"%((time.time()-t0)/iters*1000,)
@@ -0,0 +1,67 @@
+#!/usr/bin/python
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+import multiprocessing
+from klampt import *
+
+def make_large_world(dirname,numObjects,datadir="../../data"):
+    """Writes a world XML file to dirname with numObjects rigid objects, each
+    with its own copy of one of the meshes in data/objects and data/terrains,
+    and returns its file name"""
+    meshes = []
+    for sub in ['objects','terrains']:
+        for fn in sorted(os.listdir(os.path.join(datadir,sub))):
+            if os.path.splitext(fn)[1] in ['.off','.stl']:
+                meshes.append(os.path.join(datadir,sub,fn))
+    if len(meshes) == 0:
+        raise IOError("No meshes found in "+datadir)
+    f = open(os.path.join(dirname,'world.xml'),'w')
+    f.write('<?xml version="1.0"?>\n<world>\n')
+    f.write('  <terrain file="%s" />\n'%(os.path.abspath(os.path.join(datadir,'terrains','plane.env')),))
+    for i in xrange(numObjects):
+        src = meshes[i%len(meshes)]
+        meshfn = 'mesh%d%s'%(i,os.path.splitext(src)[1])
+        shutil.copyfile(src,os.path.join(dirname,meshfn))
+        f.write('  <rigidObject name="object%d" position="%g %g 0">\n'%(i,(i%20)*2.0,(i/20)*2.0))
+        f.write('    <geometry mesh="%s" />\n'%(meshfn,))
+        f.write('  </rigidObject>\n')
+    f.write('</world>\n')
+    f.close()
+    return os.path.join(dirname,'world.xml')
+
+def time_load(worldfile,numThreads,initCollisions):
+    """Returns the time to read the world and the time for the first collision
+    queries between all objects and the terrain"""
+    world = WorldModel()
+    world.enableInitCollisions(initCollisions)
+    world.setNumLoadingThreads(numThreads)
+    t0 = time.time()
+    if not world.readFile(worldfile):
+        raise IOError("Unable to read world file "+worldfile)
+    tload = time.time()-t0
+    t0 = time.time()
+    tgeom = world.terrain(0).geometry()
+    for i in xrange(world.numRigidObjects()):
+        world.rigidObject(i).geometry().collides(tgeom)
+    tquery = time.time()-t0
+    return tload,tquery
+
+if __name__ == "__main__":
+    print "worldloadbenchmark.py: compares serial, parallel, and deferred-collision"
+    print "loading of a world with many rigid objects"
+    numObjects = 200
+    if len(sys.argv) > 1:
+        numObjects = int(sys.argv[1])
+    numThreads = multiprocessing.cpu_count()
+    dirname = tempfile.mkdtemp()
+    try:
+        worldfile = make_large_world(dirname,numObjects)
+        for (threads,init) in [(1,True),(1,False),(numThreads,True),(numThreads,False)]:
+            tload,tquery = time_load(worldfile,threads,init)
+            print "%d threads, %s collision init: readFile %.3fs, first queries %.3fs"%(threads,("eager" if init else "deferred"),tload,tquery)
+    finally:
+        shutil.rmtree(dirname)
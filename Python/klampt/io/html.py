@@ -52,6 +52,7 @@ class HTMLSharePath:
 		self.fn = filename
 		self.scene = []
 		self.transforms = {}
+		self.last_transforms = {}
 		self.rpc = []
 		self.dt = 0
 		self.last_t = 0
@@ -87,13 +88,9 @@ class HTMLSharePath:
 				mat = make_fixed_precision(update['matrix'],4)
 				matpath = self.transforms.setdefault(n,[])
 				assert len(matpath) == len(self.rpc)
-				lastmat = None
-				for m in matpath[::-1]:
-					if m != None:
-						lastmat = m
-						break
-				if lastmat != mat:
+				if self.last_transforms.get(n,None) != mat:
 					matpath.append(mat)
+					self.last_transforms[n] = mat
 				else:
 					matpath.append(None)
 			self.rpc.append('null')
@@ -113,6 +110,96 @@ class HTMLSharePath:
 		f.write(data)
 		f.close()
 
+class HTMLSharePathStream(HTMLSharePath):
+	"""Same as HTMLSharePath, but writes the animation to the HTML file as it
+	goes rather than keeping it in memory, which is suitable for long
+	animations.  Only the last transform of each object is kept.  Each frame
+	stores only the objects that moved, as integer deltas of their quantized
+	transform matrices (with the given number of digits after the decimal
+	point).  The page decodes the frames when it is loaded.
+
+	Usage is the same as HTMLSharePath, and end() must be called to finish the
+	file.  The boilerplate file must list the scene before the path.
+	"""
+	def __init__(self,filename="path.html",name="Klamp't Three.js app",boilerplate='auto',digits=4):
+		HTMLSharePath.__init__(self,filename,name,boilerplate)
+		head,sep,tail = self.boilerplate_file.partition(_path_id)
+		if any(v in head for v in [_rpc_id,_compressed_id,_dt_id]):
+			raise RuntimeError("Boilerplate file must give the path before the RPC calls, compression, and time step")
+		self.scale = 10**digits
+		self.names = []
+		self.name_index = {}
+		self.numframes = 0
+		self.f = None
+	def start(self,world):
+		"""Begins the path saving with the given WorldModel or Simulator, and
+		writes the start of the file"""
+		HTMLSharePath.start(self,world)
+		head = self.boilerplate_file[:self.boilerplate_file.index(_path_id)]
+		self.f = open(self.fn,'w')
+		self.f.write(head.replace(_title_id,self.name).replace(_scene_id,self.scene))
+		self.f.write('{"frames":[')
+	def _writeFrame(self,transforms):
+		scale = self.scale
+		frame = []
+		for update in transforms['object']:
+			n = update['name']
+			mat = [int(round(v*scale)) for v in update['matrix']]
+			assert len(mat) == 16,"Three.js transforms must be 4x4 matrices"
+			last = self.last_transforms.get(n,None)
+			if last == mat:
+				continue
+			if n not in self.name_index:
+				self.name_index[n] = len(self.names)
+				self.names.append(n)
+			frame.append(self.name_index[n])
+			if last is None:
+				frame += mat
+			else:
+				frame += [a-b for (a,b) in zip(mat,last)]
+			self.last_transforms[n] = mat
+		if self.numframes > 0:
+			self.f.write(',')
+		self.f.write('['+','.join([str(v) for v in frame])+']')
+		self.numframes += 1
+	def animate(self,time=None):
+		"""Updates the path from the world.  If the world wasn't a simulator, the time
+		argument needs to be provided"""
+		if self.sim != None and time == None:
+			time = self.sim.getTime()
+			self.sim.updateWorld()
+		dt = time - self.last_t
+		if self.dt == 0:
+			self.dt = dt
+		if self.dt == 0:
+			return
+		if abs(dt - self.dt) <= 1e-6:
+			dt = self.dt
+		numadd = 0
+		while dt >= self.dt:
+			numadd += 1
+			if numadd == 1:
+				self._writeFrame(json.loads(robotsim.ThreeJSGetTransforms(self.world)))
+			else:
+				#duplicated frame, nothing moved
+				self.f.write(',[]')
+				self.numframes += 1
+			dt -= self.dt
+			self.last_t += self.dt
+		if numadd > 1:
+			print "Uneven time spacing, duplicating frame",numadd,"times"
+	def end(self):
+		tail = self.boilerplate_file[self.boilerplate_file.index(_path_id)+len(_path_id):]
+		self.f.write('],"names":'+json.dumps(self.names)+',"scale":'+str(self.scale)+'}')
+		tail = tail.replace(_title_id,self.name)
+		tail = tail.replace(_rpc_id,'['+','.join(['null']*self.numframes)+']')
+		tail = tail.replace(_compressed_id,'2')
+		tail = tail.replace(_dt_id,str(self.dt))
+		self.f.write(tail)
+		self.f.close()
+		self.f = None
+		print "Path with",self.numframes,"frames saved to",self.fn
+
 if __name__ == '__main__':
 	import sys
 	import os
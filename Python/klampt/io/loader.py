@@ -15,28 +15,68 @@ from ..math import so3,vectorops
 from ..model.contact import ContactPoint, Hold
 from ..model.trajectory import Trajectory
 
+_has_numpy = False
+_tried_numpy_import = False
+np = None
+
+#texts at least this long are parsed with numpy, if available
+NUMPY_PARSE_THRESHOLD = 2048
+
+def _try_numpy_import():
+    global _has_numpy,_tried_numpy_import
+    global np
+    if _tried_numpy_import:
+        return _has_numpy
+    _tried_numpy_import = True
+    try:
+        import numpy as np
+        _has_numpy = True
+    except ImportError:
+        #numpy only speeds up parsing of large texts, so don't warn
+        _has_numpy = False
+    return _has_numpy
+
+def _parseFloats(text):
+    """Parses all whitespace-separated numbers in text into a list of floats.
+    Long texts are converted in one pass by numpy, if available."""
+    items = text.split()
+    if len(text) >= NUMPY_PARSE_THRESHOLD and _try_numpy_import():
+        values = np.fromstring(text,dtype=float,sep=' ')
+        #fromstring stops at the first malformed item, in which case
+        #map(float) below raises the usual error
+        if len(values) == len(items):
+            return values.tolist()
+    return map(float,items)
+
+def _toInt(v):
+    """Converts a count parsed as a float back to an int"""
+    n = int(v)
+    if n != v or n < 0:
+        raise ValueError("Invalid count "+str(v))
+    return n
+
 
 def writeVector(q):
     """Writes a vector to a string in the length-prepended format 'n v1 ... vn'"""
-    return str(len(q))+'\t'+' '.join(str(v) for v in q)
+    return str(len(q))+'\t'+' '.join(map(str,q))
 
 def readVector(text):
     """Reads a length-prepended vector from a string 'n v1 ... vn'"""
-    items = text.split()
-    if len(items) == 0:
+    values = _parseFloats(text)
+    if len(values) == 0:
         raise ValueError("Empty text")
-    if int(items[0])+1 != len(items):
+    if _toInt(values[0])+1 != len(values):
         raise ValueError("Invalid number of items")
-    return [float(v) for v in items[1:]]
+    del values[0]
+    return values
 
 def writeVectorRaw(x):
     """Writes a vector to a string in the raw format 'v1 ... vn'"""
-    return ' '.join(str(xi) for xi in x)
+    return ' '.join(map(str,x))
 
 def readVectorRaw(text):
     """Reads a vector from a raw string 'v1 ... vn'"""
-    items = text.split()
-    return [float(v) for v in items]
+    return _parseFloats(text)
 
 
 def writeVectorList(x):
@@ -45,13 +85,26 @@ def writeVectorList(x):
 
 
 def readVectorList(text):
-    """Reads a list of endline-separated vectors from a string"""
-    items = text.split()
+    """Reads a list of endline-separated vectors from a string.
+    
+    All numbers are converted in one bulk pass, and the common case where
+    all vectors have the same length is split without per-vector count
+    parsing.
+    """
+    values = _parseFloats(text)
+    if len(values) == 0:
+        return []
+    n = _toInt(values[0])
+    if len(values) % (n+1) == 0 and values[::n+1].count(n) == len(values)//(n+1):
+        #uniform length
+        return [values[pos+1:pos+1+n] for pos in xrange(0,len(values),n+1)]
     vectors = []
     pos = 0
-    while pos < len(items):
-        n = int(items[pos])
-        vectors.append([float(v) for v in items[pos+1:pos+1+n]])
+    while pos < len(values):
+        n = _toInt(values[pos])
+        if pos+1+n > len(values):
+            raise ValueError("Invalid number of items in vector %d"%(len(vectors),))
+        vectors.append(values[pos+1:pos+1+n])
         pos += 1+n
     return vectors
 
@@ -63,7 +116,7 @@ def writeMatrix(x):
     ...
     xm1 xm2 ... xmn
     """
-    return '\n'.join([str(len(x))+' '+str(len(x[0]))]+[writeVectorRaw(xi) for xi in x])
+    return '\n'.join([str(len(x))+' '+str(len(x[0]))]+[' '.join(map(str,xi)) for xi in x])
 
 def readMatrix(text):
     """Reads a matrix from a string in the format
@@ -72,17 +125,14 @@ def readMatrix(text):
     ...
     xm1 xm2 ... xmn
     """
-    items = text.split()
-    if len(items) < 2: raise ValueError("Invalid matrix string")
-    m,n = int(items[0]),int(items[1])
-    if len(items) != 2 + m*n:
-        raise ValueError("Invalid number of matrix elements, should be %d, instead got %d"%(m*n,len(items)-2))
-    k = 2
-    x = []
-    for i in xrange(m):
-        x.append([float(v) for v in items[k:k+n]])
-        k += n
-    return x
+    values = _parseFloats(text)
+    if len(values) < 2: raise ValueError("Invalid matrix string")
+    m,n = _toInt(values[0]),_toInt(values[1])
+    if len(values) != 2 + m*n:
+        raise ValueError("Invalid number of matrix elements, should be %d, instead got %d"%(m*n,len(values)-2))
+    if n == 0:
+        return [[] for i in xrange(m)]
+    return [values[k:k+n] for k in xrange(2,2+m*n,n)]
 
 def writeSo3(x):
     """Writes an so3 element, i.e., rotation matrix, to string in the same
@@ -114,7 +164,7 @@ def readSe3(text):
 
 def writeMatrix3(x):
     """Writes a 3x3 matrix to a string"""
-    return writeSo3(so3.from_matrix(text))
+    return writeSo3(so3.from_matrix(x))
 
 def readMatrix3(text):
     """Reads a 3x3 matrix from a string"""
@@ -126,10 +176,10 @@ def writeContactPoint(cp):
 
 def readContactPoint(text):
     """Reads a contact point from a string 'x1 x2 x3 n1 n2 n3 kFriction'"""
-    items = text.split()
-    if len(items)!=7:
+    values = map(float,text.split())
+    if len(values)!=7:
         raise ValueError("Invalid number of items, should be 7")
-    return ContactPoint([float(v) for v in items[0:3]],[float(v) for v in items[3:6]],float(items[6]))
+    return ContactPoint(values[0:3],values[3:6],values[6])
 
 def writeContactPoint(cp):
     """Writes a contact point to a string 'x1 x2 x3 n1 n2 n3 kFriction'"""
@@ -169,81 +219,9 @@ def readIKObjective(text):
     - F: the world rotation matrix, in moment (aka exponential map) form
       mx my mz (see so3.from_moment()
     """
-    items = text.split()
-    if len(items) < 4:
-        raise ValueError("Not enough items to unpack")
-    link = int(items[0])
-    destlink = int(items[1])
-    ind = 2
-    posType = None
-    posLocal = None
-    posWorld = None
-    posDirection = None
-    rotType = None
-    rotWorld = None
-    rotAxis = None
-    #read pos constraint
-    posType = items[ind]
-    ind += 1
-    if posType=='N':
-        #no constraint
-        pass
-    elif posType=='P' or posType=='L':
-        posLocal = items[ind:ind+3]
-        ind += 3
-        posWorld = items[ind:ind+3]
-        ind += 3
-        posDirection = items[ind:ind+3]
-        ind += 3
-    elif posType=='F':
-        posLocal = items[ind:ind+3]
-        ind += 3
-        posWorld = items[ind:ind+3]
-        ind += 3
-    else:
-        raise ValueError("Invalid pos type "+posType+", must be N,P,L or F")
-    rotType = items[ind]
-    ind += 1
-    if rotType=='N':
-        #no constraint
-        pass
-    elif rotType=='T' or rotType=='A':
-        rotAxis = items[ind:ind+3]
-        ind += 3
-        rotWorld = items[ind:ind+3]
-        ind += 3
-    elif rotType=='F':
-        rotWorld = items[ind:ind+3]
-        ind += 3
-    else:
-        raise ValueError("Invalid rot type "+rotType+", must be N,T,A or F")
-
-    if posLocal: posLocal = [float(v) for v in posLocal]
-    if posWorld: posWorld = [float(v) for v in posWorld]
-    if posDirection: posDirection = [float(v) for v in posDirection]
-    if rotLocal: rotLocal = [float(v) for v in rotLocal]
-    if rotWorld: rotWorld = [float(v) for v in rotWorld]
-    
     obj = IKObjective()
-    obj.setLinks(link,destLink);
-    if posType=='N':
-        obj.setFreePosConstraint()
-    elif posType=='F':
-        obj.setFixedPosConstraint(posLocal,posWorld)
-    elif posType=='P':
-        obj.setPlanePosConstraint(posLocal,posDirection,vectorops.dot(posDirection,posWorld))
-    else:
-        obj.setLinearPosConstraint(posLocal,posWorld,posDirection)
-    if rotType == 'N':
-        obj.setFreeRotConstraint()
-    elif rotType == 'F':
-        #fixed constraint
-        R = so3.from_moment(rotWorld)
-        obj.setFixedRotConstraint(R)
-    elif rotType == 'A':
-        obj.setAxialRotConstraint(rotLocal,rotWorld)
-    else:
-        raise NotImplementedError("Two-axis rotational constraints not supported")
+    if not obj.loadString(text):
+        raise ValueError("Error reading IKObjective from string")
     return obj
 
 def writeIKObjective(obj):
@@ -270,10 +248,11 @@ def readHold(text):
         if items[0] == 'link':
             h.link = int(items[2])
         elif items[0] == 'contacts':
-            ind = 2
-            while ind < len(items):
-                h.contacts.append(readContactPoint(' '.join(items[ind:ind+7])))
-                ind += 7
+            values = map(float,items[2:])
+            if len(values) % 7 != 0:
+                raise ValueError("Invalid number of contact items, should be a multiple of 7")
+            for ind in xrange(0,len(values),7):
+                h.contacts.append(ContactPoint(values[ind:ind+3],values[ind+3:ind+6],values[ind+6]))
         elif items[0] == "position":
             posLocal = [float(v) for v in items[2:5]]
             posWorld = [float(v) for v in items[5:8]]
@@ -471,26 +450,42 @@ def load(type,fn):
 
 
 
+_scalarTypes = (bool,int,long,float)
+_scalarTypeSet = frozenset(_scalarTypes)
+_passthroughTypes = frozenset(['Config','Configs','Vector','Matrix','Matrix3','RotationMatrix','Value','IntArray','StringArray','RigidTransform'])
+
+def _isScalarList(x):
+    """Returns True if all elements of x are numbers.  The exact-type test
+    runs at C speed and covers plain lists; subclasses of the number types
+    (e.g., numpy.float64) fall back to isinstance."""
+    try:
+        if _scalarTypeSet.issuperset(map(type,x)):
+            return True
+    except TypeError:
+        #not iterable
+        return False
+    return all(isinstance(v,_scalarTypes) for v in x)
+
 def toJson(obj,type='auto'):
     """Converts from a Klamp't object to a structure that can be converted
     to a JSON string (e.g., from json.dumps()).  If 'type' is not provided,
-    this attempts  to infer the object type automatically.
+    this attempts  to infer the object type automatically.  Passing the type
+    skips inference, which otherwise examines every element of vectors and
+    lists of vectors.
     
     Not all objects are supported yet.
     """
+    if type in _passthroughTypes:
+        return obj
     if type == 'auto':
         if isinstance(obj,(list,tuple)):
-            if all([isinstance(v,(bool,int,float)) for v in obj]):
+            if _isScalarList(obj):
                 type = 'Vector'
             else:
                 if len(obj)==2 and len(obj[0])==9 and len(obj[1])==3:
                     type = 'RigidTransform'
                 else:
-                    isconfigs = True
-                    for item in obj:
-                        if not all([isinstance(v,(bool,int,float)) for v in item]):
-                            isconfigs = False
-                    if isconfigs:
+                    if all(_isScalarList(item) for item in obj):
                         type = 'Configs'
                     else:
                         raise RuntimeError("Could not parse object "+str(obj))
@@ -505,9 +500,7 @@ def toJson(obj,type='auto'):
         else:
             raise RuntimeError("Unknown object of type "+obj.__class__.__name)
 
-    if type in ['Config','Configs','Vector','Matrix','Matrix3','RotationMatrix','Value','IntArray','StringArray']:
-        return obj
-    elif type == 'RigidTransform':
+    if type in _passthroughTypes:
         return obj
     elif type == 'ContactPoint':
         return {'x':obj.x,'n':obj.n,'kFriction':kFriction}
@@ -570,9 +563,7 @@ def fromJson(jsonobj,type='auto'):
         else:
             raise RuntimeError("Unknown JSON object of type "+jsonobj.__class__.__name)
 
-    if type in ['Config','Configs','Vector','Matrix','Matrix3','RotationMatrix','Value','IntArray','StringArray']:
-        return jsonobj
-    elif type == 'RigidTransform':
+    if type in _passthroughTypes:
         return jsonobj
     elif type == 'ContactPoint':
         return ContactPoint(jsonobj['x'],jsonobj['n'],jsonobj['kFriction'])
@@ -7,6 +7,10 @@ Use getDirectory() and setDirectory() to set the directory under which
 resources are stored.  Alternatively, the directory=[DIRNAME] keyword
 argument can be provided to get, set, and edit.
 
+Resources read by get() are cached in memory and re-read only when their
+files change.  Use cacheStats(), clearCache(), and setCacheSize() to
+inspect and configure the cache.
+
 Example usage can be seen in demos/resourcetest.py.
 """
 
@@ -18,7 +22,9 @@ from .. import robotsim
 from ..math import vectorops,se3,so3
 import os
 import time
-from ..robotsim import WorldModel,RobotModel,RobotModelLink,RigidObjectModel,IKObjective
+import copy
+import threading
+from ..robotsim import WorldModel,RobotModel,RobotModelLink,RigidObjectModel,IKObjective,Geometry3D,GeometricPrimitive
 from ..model.contact import ContactPoint
 from ..model.contact import Hold
 from .. import vis
@@ -54,6 +60,161 @@ class LRUCache:
         self.cache[key] = value
 _editTemporaryWorlds = LRUCache(10)
 
+_immutableTypes = frozenset([type(None),bool,int,long,float,str,unicode])
+
+def _copy_value(value):
+    """Returns a copy of a loaded resource that shares no mutable state with
+    the original."""
+    if isinstance(value,list):
+        if _immutableTypes.issuperset(map(type,value)):
+            return value[:]
+        return [_copy_value(v) for v in value]
+    elif isinstance(value,tuple):
+        return tuple(_copy_value(v) for v in value)
+    elif isinstance(value,dict):
+        return dict((k,_copy_value(v)) for (k,v) in value.iteritems())
+    elif type(value) in _immutableTypes:
+        return value
+    elif isinstance(value,(IKObjective,Geometry3D,GeometricPrimitive)):
+        if isinstance(value,IKObjective):
+            res = value.copy()
+        elif isinstance(value,Geometry3D):
+            res = value.clone()
+        else:
+            res = GeometricPrimitive()
+            res.loadString(value.saveString())
+        #keep Python-side attributes, e.g., the text that MultiPath.load
+        #attaches to its IK objectives
+        for (k,v) in value.__dict__.iteritems():
+            if k != 'this':
+                setattr(res,k,_copy_value(v))
+        return res
+    elif hasattr(value,'this'):
+        #other SWIG proxies, e.g., a RobotModel, can't be copied and are
+        #shared
+        return value
+    elif hasattr(value,'__dict__'):
+        #Python objects, e.g., Trajectory, MultiPath, Hold.  These may hold
+        #native objects, so copy their members with _copy_value
+        res = copy.copy(value)
+        res.__dict__ = _copy_value(value.__dict__)
+        return res
+    return copy.deepcopy(value)
+
+class ResourceCache:
+    """A process-wide cache of resources loaded from disk, used by get().
+
+    Entries are keyed by (path,type,mtime,size) of the file, so a file that
+    changes on disk is re-read on the next lookup.  (A rewrite within the
+    file system's mtime resolution that keeps the size is not detected; set()
+    invalidates its file explicitly.)  The memory budget is measured in file
+    bytes, and least recently used entries are evicted first.
+
+    Lookups return copies so callers may freely modify the result.
+
+    Attributes:
+    - maxBytes: the memory budget, in bytes of cached files.
+    - hits, misses, evictions: statistics since the last resetStats().
+    """
+    def __init__(self,maxBytes=64*1024*1024):
+        self.maxBytes = maxBytes
+        self.entries = collections.OrderedDict()
+        self.pathKeys = dict()
+        self.numBytes = 0
+        self.lock = threading.Lock()
+        self.resetStats()
+
+    def resetStats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """Returns a dict of hit/miss statistics and current usage"""
+        with self.lock:
+            return {'hits':self.hits,'misses':self.misses,'evictions':self.evictions,
+                    'entries':len(self.entries),'bytes':self.numBytes,'maxBytes':self.maxBytes}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.pathKeys.clear()
+            self.numBytes = 0
+
+    def setMaxBytes(self,maxBytes):
+        with self.lock:
+            self.maxBytes = maxBytes
+            self._evict()
+
+    def get(self,fn,type,loadfunc):
+        """Returns a copy of the resource of the given type stored in file fn.
+        If it is not cached, loadfunc(type,fn) is called to load it."""
+        path = os.path.abspath(fn)
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            raise IOError(str(e))
+        key = (path,type,st.st_mtime,st.st_size)
+        with self.lock:
+            value = self.entries.pop(key,None)
+            if value is not None:
+                self.entries[key] = value
+                self.hits += 1
+            else:
+                self.misses += 1
+        if value is not None:
+            return _copy_value(value)
+        value = loadfunc(type,fn)
+        if value is None or st.st_size > self.maxBytes:
+            return value
+        with self.lock:
+            self._remove((path,type))
+            self.entries[key] = value
+            self.pathKeys[(path,type)] = key
+            self.numBytes += st.st_size
+            self._evict()
+        return _copy_value(value)
+
+    def invalidate(self,fn):
+        """Drops all cached resources read from file fn"""
+        path = os.path.abspath(fn)
+        with self.lock:
+            for pathtype in [k for k in self.pathKeys if k[0] == path]:
+                self._remove(pathtype)
+
+    def _remove(self,pathtype):
+        key = self.pathKeys.pop(pathtype,None)
+        if key is not None:
+            del self.entries[key]
+            self.numBytes -= key[3]
+
+    def _evict(self):
+        while self.numBytes > self.maxBytes and len(self.entries) > 0:
+            key,value = self.entries.popitem(last=False)
+            del self.pathKeys[key[:2]]
+            self.numBytes -= key[3]
+            self.evictions += 1
+
+_resourceCache = ResourceCache()
+
+def getCache():
+    """Returns the ResourceCache used by get()."""
+    return _resourceCache
+
+def cacheStats():
+    """Returns a dict of resource cache statistics: hits, misses, evictions,
+    entries, bytes, and maxBytes."""
+    return _resourceCache.stats()
+
+def clearCache():
+    """Empties the resource cache."""
+    _resourceCache.clear()
+
+def setCacheSize(maxBytes):
+    """Sets the resource cache's memory budget, in bytes of cached files.
+    0 disables caching."""
+    _resourceCache.setMaxBytes(maxBytes)
+
 
 def getDirectory():
     """Returns the current resource directory."""
@@ -72,15 +233,21 @@ def _ensure_dir(f):
 
 def _get_world(world):
     if isinstance(world,str):
-        #a single argument, e.g., a robot file
+        #a single argument, e.g., a robot file.  Keyed by modification time
+        #and size so that changed files are reloaded
         global _editTemporaryWorlds
         try:
-            return _editTemporaryWorlds[world]
+            st = os.stat(world)
+            key = (os.path.abspath(world),st.st_mtime,st.st_size)
+        except OSError:
+            key = world
+        try:
+            return _editTemporaryWorlds[key]
         except KeyError:
             w = WorldModel()
             if not w.readFile(world):
                 raise RuntimeError("Error loading world file "+world)
-            _editTemporaryWorlds[world] = w
+            _editTemporaryWorlds[key] = w
             return w
     return world
 
@@ -118,7 +285,7 @@ def filenameToType(name):
         raise RuntimeError("Cannot determine type of resource from name "+name)
 
 
-def get(name,type='auto',directory=None,default=None,doedit='auto',description=None,editor='visual',world=None,referenceObject=None,frame=None):
+def get(name,type='auto',directory=None,default=None,doedit='auto',description=None,editor='visual',world=None,referenceObject=None,frame=None,cache=True):
     """Retrieve a resource of the given name from the current resources
     directory.  Resources may be of type Config, Configs, IKGoal, Hold,
     Stance, MultiPath, Trajectory/LinearPath, etc. (see Klampt/Modeling/Resources.h for
@@ -159,6 +326,9 @@ def get(name,type='auto',directory=None,default=None,doedit='auto',description=N
           frame in which the quantity is represented.  This is an element of
           se3, or an ObjectModel, or a RobotModelLink, or a string indicating a
           named rigid element of the world.
+        - cache: if True, files are read through the resource cache (see
+          ResourceCache), so repeated gets of an unchanged file are not
+          re-parsed.
           """
     if name==None:
         if doedit==False:
@@ -185,6 +355,8 @@ def get(name,type='auto',directory=None,default=None,doedit='auto',description=N
                 text = ''.join(f.readlines())
                 f.close()
                 value = loader.fromJson(text,type=type)
+            elif cache:
+                value = _resourceCache.get(fn,type,loader.load)
             else:
                 value = loader.load(type,fn)
         except IOError:
@@ -234,6 +406,7 @@ def set(name,value,type='auto',directory=None):
         directory = getDirectory()    
     fn = os.path.join(directory,name)
     _ensure_dir(fn)
+    _resourceCache.invalidate(fn)
     if type == 'xml':
         raise NotImplementedError("TODO: save xml files from Python API")
     elif type == 'json':
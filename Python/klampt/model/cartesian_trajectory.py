@@ -4,21 +4,26 @@ import config
 from collections import deque
 import math
 
-def set_cartesian_constraints(x,constraints,solver):
+def set_cartesian_constraints(x,constraints,solver,layout=None):
 	"""For x a workspace parameter setting (achieved via config.getConfig(constraints)),
 	a set of constraints, and a IKSolver object, modifies the constraints
 	and the solver so that the solver is setup to match the workspace parameter
-	setting x."""
-	config.setConfig(constraints,x)
+	setting x.  If layout, a config.ConfigLayout of constraints, is given, it
+	is used to set the constraints."""
+	if layout is not None:
+		layout.setConfig(x)
+	else:
+		config.setConfig(constraints,x)
 	solver.clear()
 	for c in constraints:
 		solver.add(c)
 
-def solve_cartesian(x,constraints,solver):
+def solve_cartesian(x,constraints,solver,layout=None):
 	"""For x a workspace parameter setting (achieved via config.getConfig(constraints)),
 	a set of constraints, and a IKSolver object, returns True if the solver can find
-	a solution (from the robot's current configuration). Returns True if successful."""
-	set_cartesian_constraints(x,constraints,solver)
+	a solution (from the robot's current configuration). Returns True if successful.
+	layout is an optional config.ConfigLayout of constraints."""
+	set_cartesian_constraints(x,constraints,solver,layout)
 	return  solver.solve()
 
 def _make_canonical(robot,constraints,startConfig,endConfig,solver):
@@ -80,10 +85,11 @@ def cartesian_interpolate_linear(robot,a,b,constraints,
 	"""
 	assert delta > 0,"Spatial resolution must be positive"
 	constraints,startConfig,endConfig,solver = _make_canonical(robot,constraints,startConfig,endConfig,solver)
+	layout = config.ConfigLayout(constraints)
 
 	assert startConfig is not None,"Unable to cartesian interpolate without a start configuration"
 	robot.setConfig(startConfig)
-	set_cartesian_constraints(a,constraints,solver)
+	set_cartesian_constraints(a,constraints,solver,layout)
 	if not solver.isSolved():
 		if not solver.solve():
 			print "cartesian_interpolate_linear(): Error, initial configuration cannot be solved to match initial Cartesian coordinates, residual",solver.getResidual()
@@ -95,7 +101,7 @@ def cartesian_interpolate_linear(robot,a,b,constraints,
 		return None
 	if endConfig is not None:
 		#doing endpoint-constrained cartesian interpolation
-		set_cartesian_constraints(b,constraints,solver)
+		set_cartesian_constraints(b,constraints,solver,layout)
 		robot.setConfig(endConfig)
 		if not solver.isSolved():
 			print "cartesian_interpolate_linear(): Error, end configuration does not match final Cartesian coordinates, residual",solver.getResidual()
@@ -111,25 +117,25 @@ def cartesian_interpolate_linear(robot,a,b,constraints,
 	qmin0,qmax0 = solver.getJointLimits()
 	tol0 = solver.getTolerance()
 	solver.setTolerance(tol0*0.1)
-	set_cartesian_constraints(a,constraints,solver)
+	set_cartesian_constraints(a,constraints,solver,layout)
 	if not solver.isSolved():
 		solver.solve()
 		res.times.append(t+1e-7)
 		res.milestones.append(robot.getConfig())
 		t = res.times[-1]
-	paramStallTolerance = 0.01*solver.getTolerance() / config.distance(constraints,a,b)
+	paramStallTolerance = 0.01*solver.getTolerance() / layout.distance(a,b)
 	stepsize = 0.1
 	while t < 1:
 		tookstep = False
 		tend = min(t+stepsize,1)
-		x = config.interpolate(constraints,a,b,tend)
+		x = layout.interpolate(a,b,tend)
 		if endConfig is not None:
 			robot.setConfig(robot.interpolate(startConfig,endConfig,tend))
 			solver.setBiasConfig(robot.getConfig())
 		q = res.milestones[-1]
 		solver.setJointLimits([max(vmin,v-delta) for v,vmin in zip(q,qmin0)],[min(vmax,v+delta) for v,vmax in zip(q,qmax0)])
 		#print "Trying step",tend-t,"time t=",tend
-		if solve_cartesian(x,constraints,solver):
+		if solve_cartesian(x,constraints,solver,layout):
 			#valid step, increasing step size
 			#print "Accept and increase step"
 			tookstep = True
@@ -139,14 +145,14 @@ def cartesian_interpolate_linear(robot,a,b,constraints,
 			while stepsize > paramStallTolerance:
 				stepsize *= 0.5
 				tend = min(t+stepsize,1)
-				x = config.interpolate(constraints,a,b,tend)
+				x = layout.interpolate(a,b,tend)
 				if endConfig is not None:
 					robot.setConfig(robot.interpolate(startConfig,endConfig,tend))
 					solver.setBiasConfig(robot.getConfig())
 				else:
 					robot.setConfig(q)
 				#print "Trying step",tend-t,"time t=",tend
-				if solve_cartesian(x,constraints,solver):
+				if solve_cartesian(x,constraints,solver,layout):
 					#print "Accept"
 					tookstep = True
 					break
@@ -159,11 +165,11 @@ def cartesian_interpolate_linear(robot,a,b,constraints,
 					solver.setTolerance(tol0*0.1)
 		if not tookstep:
 			print "cartesian_interpolate_linear(): Failed to take a valid step along straight line path at time",res.times[-1],"residual",solver.getResidual()
-			#x = config.interpolate(constraints,a,b,res.times[-1])
+			#x = layout.interpolate(a,b,res.times[-1])
 			#set_cartesian_constraints(x,constraints,solver)
 			#robot.setConfig(res.milestones[-1])
 			#print "Last residual",solver.getResidual()
-			#x = config.interpolate(constraints,a,b,tend)
+			#x = layout.interpolate(a,b,tend)
 			#set_cartesian_constraints(x,constraints,solver)
 			#print "Residual from last config",solver.getResidual()
 			solver.setJointLimits(qmin0,qmax0)
@@ -199,6 +205,148 @@ def cartesian_interpolate_linear(robot,a,b,constraints,
 			res.milestones[-1] = endConfig
 	return res
 
+def cartesian_interpolate_resolved_rate(robot,a,b,constraints,
+	startConfig='robot',endConfig=None,
+	delta=1e-2,
+	solver=None,
+	feasibilityTest=None,
+	maximize=False):
+	"""Same as cartesian_interpolate_linear, but resolves the path by
+	integrating the IK Jacobian (resolved-rate control) rather than running a
+	full IK solve at every trial step.  Each step takes a Gauss-Newton
+	predictor step toward the next Cartesian target and a corrector step if
+	needed, and only falls back to IKSolver.solve() when the residual still
+	exceeds the solver's tolerance.  This takes far fewer solver invocations
+	on long straight-line moves.
+
+	If endConfig is given, the nullspace of the Jacobian is used to track
+	the joint-space interpolation between startConfig and endConfig.
+
+	Requires numpy; if it is not available, cartesian_interpolate_linear is
+	called instead.
+
+	Arguments and return value are the same as cartesian_interpolate_linear.
+	"""
+	try:
+		import numpy as np
+	except ImportError:
+		return cartesian_interpolate_linear(robot,a,b,constraints,startConfig,endConfig,delta,solver,feasibilityTest,maximize)
+	assert delta > 0,"Spatial resolution must be positive"
+	constraints,startConfig,endConfig,solver = _make_canonical(robot,constraints,startConfig,endConfig,solver)
+	layout = config.ConfigLayout(constraints)
+
+	assert startConfig is not None,"Unable to cartesian interpolate without a start configuration"
+	robot.setConfig(startConfig)
+	set_cartesian_constraints(a,constraints,solver,layout)
+	if not solver.isSolved():
+		if not solver.solve():
+			print "cartesian_interpolate_resolved_rate(): Error, initial configuration cannot be solved to match initial Cartesian coordinates, residual",solver.getResidual()
+			return None
+		print "cartesian_interpolate_resolved_rate(): Warning, initial configuration does not match initial Cartesian coordinates, solving"
+		startConfig = robot.getConfig()
+	if feasibilityTest is not None and not feasibilityTest(startConfig):
+		print "cartesian_interpolate_resolved_rate(): Error: initial configuration is infeasible"
+		return None
+	if endConfig is not None:
+		set_cartesian_constraints(b,constraints,solver,layout)
+		robot.setConfig(endConfig)
+		if not solver.isSolved():
+			print "cartesian_interpolate_resolved_rate(): Error, end configuration does not match final Cartesian coordinates, residual",solver.getResidual()
+			return None
+		if feasibilityTest is not None and not feasibilityTest(endConfig):
+			print "cartesian_interpolate_resolved_rate(): Error: final configuration is infeasible"
+			return None
+
+	res = RobotTrajectory(robot)
+	res.times.append(0)
+	res.milestones.append(startConfig)
+	qmin0,qmax0 = solver.getJointLimits()
+	tol = solver.getTolerance()
+	dofs = solver.getActiveDofs()
+	qmin = np.array([qmin0[d] for d in dofs])
+	qmax = np.array([qmax0[d] for d in dofs])
+
+	def newton_step(q,qbias):
+		#one Gauss-Newton step on the active DOFs from q, with an optional
+		#nullspace step toward qbias.  Returns the new configuration and
+		#the residual norm there.
+		robot.setConfig(q)
+		r = np.array(solver.getResidual())
+		J = np.array(solver.getJacobian())
+		Jpinv = np.linalg.pinv(J)
+		x = np.array([q[d] for d in dofs])
+		dx = -np.dot(Jpinv,r)
+		if qbias is not None:
+			xbias = np.array([qbias[d] for d in dofs])
+			dx += np.dot(np.eye(len(dofs)) - np.dot(Jpinv,J),xbias - x)
+		x = np.clip(x + dx,qmin,qmax)
+		qnew = q[:]
+		for d,v in zip(dofs,x):
+			qnew[d] = float(v)
+		robot.setConfig(qnew)
+		return qnew,np.linalg.norm(solver.getResidual())
+
+	paramStallTolerance = 0.01*tol / max(layout.distance(a,b),1e-8)
+	t = 0
+	stepsize = 0.1
+	failed = False
+	while t < 1:
+		q = res.milestones[-1]
+		tookstep = False
+		while stepsize > paramStallTolerance:
+			tend = min(t+stepsize,1)
+			set_cartesian_constraints(layout.interpolate(a,b,tend),constraints,solver,layout)
+			qbias = (robot.interpolate(startConfig,endConfig,tend) if endConfig is not None else None)
+			#predictor
+			qnext,err = newton_step(q,qbias)
+			if robot.distance(q,qnext) > delta:
+				#too far in configuration space, shorten the step
+				stepsize *= 0.5
+				continue
+			#corrector
+			if err > tol:
+				qnext,err = newton_step(qnext,None)
+			if err > tol:
+				#fall back to a full solve in the neighborhood of q
+				robot.setConfig(qnext)
+				solver.setJointLimits([max(vmin,v-delta) for v,vmin in zip(q,qmin0)],[min(vmax,v+delta) for v,vmax in zip(q,qmax0)])
+				ok = solver.solve()
+				solver.setJointLimits(qmin0,qmax0)
+				if not ok:
+					stepsize *= 0.5
+					continue
+				qnext = robot.getConfig()
+			else:
+				stepsize *= 1.5
+			tookstep = True
+			break
+		if not tookstep:
+			print "cartesian_interpolate_resolved_rate(): Failed to take a valid step along straight line path at time",res.times[-1],"residual",solver.getResidual()
+			failed = True
+			break
+		if feasibilityTest is not None and not feasibilityTest(qnext):
+			print "cartesian_interpolate_resolved_rate(): Infeasibility at time",tend
+			failed = True
+			break
+		res.times.append(tend)
+		res.milestones.append(qnext)
+		t = tend
+	solver.setJointLimits(qmin0,qmax0)
+	if failed:
+		if maximize:
+			return res
+		return None
+	if endConfig is not None:
+		if robot.distance(res.milestones[-1],endConfig) > delta:
+			#hit a local minimum, couldn't reach the goal
+			if maximize:
+				return res
+			return None
+		else:
+			#clean up the end configuration
+			res.milestones[-1] = endConfig
+	return res
+
 class BisectNode:
 	def __init__(self,a,b,ua,ub,qa,qb):
 		self.a,self.b = a,b
@@ -238,17 +386,18 @@ def cartesian_interpolate_bisect(robot,a,b,constraints,
 	assert delta > 0,"Spatial resolution must be positive"
 	assert growthTol > 1,"Growth parameter must be in range [1,infty]"
 	constraints,startConfig,endConfig,solver = _make_canonical(robot,constraints,startConfig,endConfig,solver)
+	layout = config.ConfigLayout(constraints)
 
 	assert startConfig is not None,"Unable to cartesian bisection interpolate without a start configuration"
 	if endConfig is None:
 		#find an end point
 		robot.setConfig(startConfig)
-		if not solve_cartesian(b,constraints,solver):
+		if not solve_cartesian(b,constraints,solver,layout):
 			print "cartesian_interpolate_bisect(): Error, could not find an end configuration to match final Cartesian coordinates"
 			return None
 		endConfig = robot.getConfig()
 	robot.setConfig(startConfig)
-	set_cartesian_constraints(a,constraints,solver)
+	set_cartesian_constraints(a,constraints,solver,layout)
 	if not solver.isSolved():
 		if not solver.solve():
 			print "Error, initial configuration cannot be solved to match initial Cartesian coordinates, residual",solver.getResidual()
@@ -256,7 +405,7 @@ def cartesian_interpolate_bisect(robot,a,b,constraints,
 		print "Warning, initial configuration does not match initial Cartesian coordinates, solving"
 		startConfig = robot.getConfig()	
 	robot.setConfig(endConfig)
-	set_cartesian_constraints(b,constraints,solver)
+	set_cartesian_constraints(b,constraints,solver,layout)
 	if not solver.isSolved():
 		if not solver.solve():
 			print "cartesian_interpolate_bisect(): Error, final configuration cannot be solved to match final Cartesian coordinates, residual",solver.getResidual()
@@ -281,12 +430,12 @@ def cartesian_interpolate_bisect(robot,a,b,constraints,
 		d0 = n.d
 		if d0 <= delta:
 			continue
-		m = config.interpolate(constraints,n.a,n.b,0.5)
+		m = layout.interpolate(n.a,n.b,0.5)
 		qm = robot.interpolate(n.qa,n.qb,0.5)
 		um = (n.ua+n.ub)*0.5
 		robot.setConfig(qm)
 		solver.setBiasConfig(qm)
-		if not solve_cartesian(m,constraints,solver):
+		if not solve_cartesian(m,constraints,solver,layout):
 			solver.setBiasConfig([])
 			print "cartesian_interpolate_bisect(): Failed to solve at point",um
 			return None
@@ -332,6 +481,142 @@ def cartesian_interpolate_bisect(robot,a,b,constraints,
 			q.append(n.left)
 	return res
 
+class CartesianRoadmapCache:
+	"""Stores the IK samples ("layers", one per path division) and edges of the
+	roadmap built by the 'roadmap' method of cartesian_path_interpolate, so that
+	repeated resolutions of the same or a slightly modified path don't start
+	from scratch.  Pass the same cache as the roadmapCache argument of each call.
+
+	On each call, each cached layer is re-validated against the new path:
+	- If the layer's Cartesian milestone is unchanged, its configurations are
+	  kept as long as they still satisfy the constraints.
+	- Otherwise, its configurations are used as warm starts for IK, which is far
+	  cheaper than random restarts when the change is small.
+	Edges are reused only if both endpoints were kept unchanged and the path is
+	unchanged between them.  Unchanged configurations are not passed to the
+	feasibility test again, so call clear() if the environment changes.
+
+	If the whole path is rigidly moved, call transform() so that the cached
+	milestones follow it.  (Configurations cannot be moved rigidly for a
+	fixed-base robot, so all layers are then re-solved from warm starts.)
+
+	Attributes:
+	- tol: tolerance under which a milestone is considered unchanged
+	- milestones: the cached Cartesian milestones
+	- layers: for each milestone, a list of cached configurations
+	- edges: a list of ((i,k),(j,l),traj) tuples, connecting configuration k of
+	  layer i to configuration l of layer j with the RobotTrajectory traj.
+	- numReused, numResolved, numDropped: statistics on the configurations
+	  re-validated so far.
+	"""
+	def __init__(self,tol=1e-6):
+		self.tol = tol
+		self.clear()
+
+	def clear(self):
+		"""Erases all cached layers and edges"""
+		self.milestones = []
+		self.layers = []
+		self.edges = []
+		self.valid = []
+		self.numReused = 0
+		self.numResolved = 0
+		self.numDropped = 0
+		self._unchangedLayers = []
+		self._unchangedNodes = set()
+
+	def transform(self,constraints,T):
+		"""Transforms the cached milestones by the se3 transform T, given in
+		world coordinates.  constraints is the list of IKObjectives defining the
+		Cartesian space.  The cached configurations are then re-solved on the next
+		call, and the cached edges are discarded."""
+		if not hasattr(constraints,'__iter__'):
+			constraints = [constraints]
+		R,t = T
+		for i,m in enumerate(self.milestones):
+			config.setConfig(constraints,m)
+			for c in constraints:
+				c.transform(R,t)
+			self.milestones[i] = config.getConfig(constraints)
+		self.valid = [False]*len(self.milestones)
+		self.edges = []
+
+	def record(self,milestones,nodes,configs,edges):
+		"""Called by cartesian_path_interpolate to store its roadmap.  The first
+		two nodes (the start and end configurations) are not stored."""
+		self.milestones = [list(m) for m in milestones]
+		self.layers = [[] for m in milestones]
+		self.valid = [True]*len(milestones)
+		keys = {}
+		for n,(i,k) in enumerate(nodes):
+			if n < 2:
+				continue
+			keys[n] = (i,len(self.layers[i]))
+			self.layers[i].append(configs[n])
+		self.edges = [(keys[i],keys[j],t) for (i,j,t) in edges if i in keys and j in keys]
+
+	def revalidate(self,robot,milestones,constraints,solver,feasibilityTest=None):
+		"""Called by cartesian_path_interpolate to re-validate the cache against
+		a new path.  Returns a list of ((i,k),q) pairs giving the configurations
+		q that are valid for layer i, where k is the configuration's index in the
+		cached layer.  The robot's configuration is modified."""
+		self._unchangedLayers = [False]*len(milestones)
+		self._unchangedNodes = set()
+		if len(milestones) != len(self.milestones):
+			return []
+		res = []
+		for i,(m,layer) in enumerate(zip(milestones,self.layers)):
+			same = self.valid[i] and vectorops.distance(m,self.milestones[i]) <= self.tol
+			self._unchangedLayers[i] = same
+			if len(layer) == 0:
+				continue
+			set_cartesian_constraints(m,constraints,solver)
+			for k,q in enumerate(layer):
+				robot.setConfig(q)
+				if same and solver.isSolved():
+					self.numReused += 1
+					self._unchangedNodes.add((i,k))
+					res.append(((i,k),q))
+				elif solver.solve() and (feasibilityTest is None or feasibilityTest(robot.getConfig())):
+					self.numResolved += 1
+					res.append(((i,k),robot.getConfig()))
+				else:
+					self.numDropped += 1
+		return res
+
+	def reusableEdges(self):
+		"""Returns the cached edges that are still valid after the last call to
+		revalidate()"""
+		res = []
+		for (a,b,t) in self.edges:
+			if a in self._unchangedNodes and b in self._unchangedNodes:
+				if all(self._unchangedLayers[a[0]:b[0]+1]):
+					res.append((a,b,t))
+		return res
+
+	def save(self,fn):
+		"""Saves the cache to a JSON file"""
+		import json
+		jsonobj = {'tol':self.tol,'milestones':self.milestones,'layers':self.layers,'valid':self.valid,
+			'edges':[(a,b,t.times,t.milestones) for (a,b,t) in self.edges]}
+		f = open(fn,'w')
+		json.dump(jsonobj,f)
+		f.close()
+
+	@staticmethod
+	def load(fn,robot):
+		"""Loads a cache saved with save() for the given robot"""
+		import json
+		f = open(fn,'r')
+		jsonobj = json.load(f)
+		f.close()
+		res = CartesianRoadmapCache(jsonobj['tol'])
+		res.milestones = jsonobj['milestones']
+		res.layers = jsonobj['layers']
+		res.valid = jsonobj['valid']
+		res.edges = [(tuple(a),tuple(b),RobotTrajectory(robot,times,milestones)) for (a,b,times,milestones) in jsonobj['edges']]
+		return res
+
 def cartesian_path_interpolate(robot,path,constraints,
 	startConfig='robot',endConfig=None,
 	delta=1e-2,
@@ -339,7 +624,9 @@ def cartesian_path_interpolate(robot,path,constraints,
 	solver=None,
 	feasibilityTest=None,
 	numSamples=1000,
-	maximize=False):
+	maximize=False,
+	numProcesses=None,
+	roadmapCache=None):
 	"""Resolves a continuous robot trajectory that follows a cartesian path for a single
 	link of a robot.  Note that the output path is only a kinematic resolution, and may not
 	respect the robot's velocity / acceleration limits.
@@ -356,12 +643,21 @@ def cartesian_path_interpolate(robot,path,constraints,
 	- startConfig: either 'robot' (configuration taken from the robot), a configuration, or None (any configuration)
 	- endConfig: same type as startConfig.
 	- delta: the maximum configuration-space resolution of the output path
-	- method: method used: 'any', 'pointwise', or 'roadmap'.
+	- method: method used: 'any', 'pointwise', 'roadmap', or 'parallel'.  'parallel' first
+	  solves for the configurations at all milestones of the path in sequence, and then
+	  resolves the segments between them independently in worker processes.  It is
+	  best suited to long paths with many milestones.
 	- solver: if provided, this must be an IKSolver configured with the desired parameters for IK constraint solving.
 	- feasibilityTest: None, or a function f(q) that returns false when a configuration q is infeasible
 	- numSamples: if 'roadmap' or 'any' method is used, the # of configuration space samples that are used.
 	- maximize: if not resolved and this is True, the function returns the robot trajectory leading
 	  to the furthest point along the path
+	- numProcesses: for the 'parallel' method, the number of worker processes.  If None, uses
+	  the number of CPUs.
+	- roadmapCache: for the 'roadmap' or 'any' methods, an optional CartesianRoadmapCache.
+	  The IK samples and edges of the roadmap are reused from the cache, and the cache is
+	  updated with the roadmap that was built.  Useful when the same path (or a slightly
+	  offset one) is resolved many times.
 
 	Out: a RobotTrajectory that interpolates the Cartesian path, or None if none can be found
 	"""
@@ -369,10 +665,11 @@ def cartesian_path_interpolate(robot,path,constraints,
 	if hasattr(path,'__iter__'):
 		path = Trajectory(range(len(path)),path)
 	constraints,startConfig,endConfig,solver = _make_canonical(robot,constraints,startConfig,endConfig,solver)
+	layout = config.ConfigLayout(constraints)
 	#correct start and goal configurations, if specified
 	if startConfig:
 		robot.setConfig(startConfig)
-		set_cartesian_constraints(path.milestones[0],constraints,solver)
+		set_cartesian_constraints(path.milestones[0],constraints,solver,layout)
 		if not solver.isSolved():
 			if not solver.solve():
 				print "cartesian_path_interpolate(): Error, initial configuration cannot be solved to match initial Cartesian coordinates"
@@ -381,7 +678,7 @@ def cartesian_path_interpolate(robot,path,constraints,
 			startConfig = robot.getConfig()	
 	if endConfig:
 		robot.setConfig(endConfig)
-		set_cartesian_constraints(path.milestones[-1],constraints,solver)
+		set_cartesian_constraints(path.milestones[-1],constraints,solver,layout)
 		if not solver.isSolved():
 			if not solver.solve():
 				print "cartesian_path_interpolate(): Error, final configuration cannot be solved to match final Cartesian coordinates"
@@ -390,6 +687,9 @@ def cartesian_path_interpolate(robot,path,constraints,
 			endConfig = robot.getConfig()	
 
 	#now we're at a canonical setup
+	if method == 'parallel':
+		return _cartesian_path_interpolate_parallel(robot,path,constraints,startConfig,endConfig,
+			delta,solver,feasibilityTest,numSamples,maximize,numProcesses)
 	if method == 'any' or method == 'pointwise':
 		#try pointwise resolution first
 		if startConfig is None:
@@ -409,7 +709,7 @@ def cartesian_path_interpolate(robot,path,constraints,
 				u = (path.times[i+1] - path.times[i])/(path.times[-1] - path.times[i])
 				segEnd = robot.interpolate(res.milestones[-1],endConfig,u)
 				robot.setConfig(segEnd)
-				if solve_cartesian(path.milestones[i+1],constraints,solver):
+				if solve_cartesian(path.milestones[i+1],constraints,solver,layout):
 					segEnd = robot.getConfig()
 			if segEnd is None:
 				seg = cartesian_interpolate_linear(robot,path.milestones[i],path.milestones[i+1],constraints,
@@ -448,14 +748,14 @@ def cartesian_path_interpolate(robot,path,constraints,
 				if s == oldseg:
 					if u != oldu:
 						times.append(t)
-						milestones.append(config.interpolate(constraints,path.milestones[s],path.milestones[s+1],u))
+						milestones.append(layout.interpolate(path.milestones[s],path.milestones[s+1],u))
 				else:
 					for i in range(oldseg+1,s+1):
 						times.append(path.times[i])
 						milestones.append(path.milestones[i])
 					times.append(t)
 					print s,u
-					milestones.append(config.interpolate(constraints,path.milestones[s],path.milestones[s+1],u))
+					milestones.append(layout.interpolate(path.milestones[s],path.milestones[s+1],u))
 				oldseg,oldu = s,u
 			path = path.constructor()(times,milestones)
 		import random
@@ -471,7 +771,7 @@ def cartesian_path_interpolate(robot,path,constraints,
 			while samp < numSamples:
 				samp += 1
 				solver.sampleInitial()
-				if solve_cartesian(path.milestones[0],constraints,solver):
+				if solve_cartesian(path.milestones[0],constraints,solver,layout):
 					if feasibilityTest is None or feasibilityTest(robot.getConfig()):
 						startConfig = robot.getConfig()
 						break
@@ -484,7 +784,7 @@ def cartesian_path_interpolate(robot,path,constraints,
 					solver.sampleInitial()
 				else:
 					robot.setConfig(startConfig)
-				if solve_cartesian(path.milestones[-1],constraints,solver):
+				if solve_cartesian(path.milestones[-1],constraints,solver,layout):
 					if feasibilityTest is None or feasibilityTest(robot.getConfig()):
 						endConfig = robot.getConfig()
 						break
@@ -552,15 +852,7 @@ def cartesian_path_interpolate(robot,path,constraints,
 		configs.append(endConfig)
 		nodes.append((len(path.milestones)-1,0))
 		ccs.append(1)
-		for samp in xrange(samp,numSamples):
-			irand = random.choice(pathIndices)
-			solver.sampleInitial()
-			#check for successful sample on self motion manifold, test feasibility
-			if not solve_cartesian(path.milestones[irand],constraints,solver):
-				continue
-			x = robot.getConfig()
-			if feasibilityTest is not None and not feasibilityTest(x):
-				continue
+		def addnode(irand,x):
 			#add to data structure
 			nx = len(nodes)
 			nodes.append((irand,len(selfMotionManifolds[irand])))
@@ -568,14 +860,44 @@ def cartesian_path_interpolate(robot,path,constraints,
 			assert len(ccs) == nx+1
 			selfMotionManifolds[irand].append(nx)
 			configs.append(x)
-			#try connecting to other nodes
+			return nx
+		def addedge(ni,nj,t):
+			#adds an edge and merges connected components.  Returns the
+			#resolved path if the start and goal become connected.
+			edges.append((ni,nj,t))
+			if ccs[ni] != ccs[nj]:
+				#not in same connected component, collapse ccs
+				src,tgt = ccs[ni],ccs[nj]
+				if src < tgt: src,tgt = tgt,src
+				checkgoal = False
+				for i,cc in enumerate(ccs):
+					if ccs[i] == src:
+						ccs[i] = tgt
+						if nodes[i][0] == 0 or nodes[i][0] == len(path.milestones)-1:
+							checkgoal=True
+				if checkgoal:
+					checkgoal = False
+					for c in selfMotionManifolds[0]:
+						for d in selfMotionManifolds[-1]:
+							if ccs[c] == ccs[d]:
+								checkgoal = True
+								break
+						if checkgoal:
+							break
+				if checkgoal:
+					return findpath(len(path.milestones)-1)
+			return None
+		def connect(nx,samp):
+			#try connecting node nx to other nodes.  Returns the resolved
+			#path if the start and goal become connected.
+			irand = nodes[nx][0]
+			x = configs[nx]
 			k = int(math.log(samp+2)) + 2
 			#brute force k-nearest neighbor
 			d = []
-			for i,n in enumerate(nodes[:-1]):
+			for i,n in enumerate(nodes):
 				if n[0] == irand:
 					continue
-				dist = config.distance(constraints,path.milestones[n[0]],path.milestones[irand])
 				dist = robot.distance(x,configs[i])
 				d.append((dist,i))
 			k = min(k,len(d))
@@ -605,28 +927,44 @@ def cartesian_path_interpolate(robot,path,constraints,
 					continue
 				#t.times = [path.times[i] + v*(path.times[j]-path.times[i]) for v in t.times]
 				print "  Added edge",nodes[ni],"->",nodes[nj]
-				edges.append((ni,nj,t))
-				if ccs[ni] != ccs[nj]:
-					#not in same connected component, collapse ccs
-					src,tgt = ccs[ni],ccs[nj]
-					if src < tgt: src,tgt = tgt,src
-					checkgoal = False
-					for i,cc in enumerate(ccs):
-						if ccs[i] == src:
-							ccs[i] = tgt
-							if nodes[i][0] == 0 or nodes[i][0] == len(path.milestones)-1:
-								checkgoal=True
-					if checkgoal:
-						checkgoal = False
-						for c in selfMotionManifolds[0]:
-							for d in selfMotionManifolds[-1]:
-								if ccs[c] == ccs[d]:
-									checkgoal = True
-									break
-							if checkgoal:
-								break
-					if checkgoal:
-						return findpath(len(path.milestones)-1)
+				res = addedge(ni,nj,t)
+				if res is not None:
+					return res
+			return None
+		def cacheresult(res):
+			if roadmapCache is not None:
+				roadmapCache.record(path.milestones,nodes,configs,edges)
+			return res
+		if roadmapCache is not None:
+			#re-validate the cached layers on the new path, reuse the edges
+			#between unchanged layers, then connect the remaining nodes
+			cached = roadmapCache.revalidate(robot,path.milestones,constraints,solver,feasibilityTest)
+			cachednodes = {}
+			for (key,x) in cached:
+				if key[0] in pathIndices:
+					cachednodes[key] = addnode(key[0],x)
+			for (a,b,t) in roadmapCache.reusableEdges():
+				if a in cachednodes and b in cachednodes:
+					res = addedge(cachednodes[a],cachednodes[b],t)
+					if res is not None:
+						return cacheresult(res)
+			for nx in sorted(cachednodes.values()):
+				res = connect(nx,samp)
+				if res is not None:
+					return cacheresult(res)
+		for samp in xrange(samp,numSamples):
+			irand = random.choice(pathIndices)
+			solver.sampleInitial()
+			#check for successful sample on self motion manifold, test feasibility
+			if not solve_cartesian(path.milestones[irand],constraints,solver,layout):
+				continue
+			x = robot.getConfig()
+			if feasibilityTest is not None and not feasibilityTest(x):
+				continue
+			nx = addnode(irand,x)
+			res = connect(nx,samp)
+			if res is not None:
+				return cacheresult(res)
 			if ccs[-1] != 0 and ccs[-1] != 1 and False:
 				#didn't connect to either start or goal... delete isolated points?
 				print "cartesian_path_interpolate(): Isolated node, removing..."
@@ -651,13 +989,86 @@ def cartesian_path_interpolate(robot,path,constraints,
 			for n,cc in zip(nodes,ccs):
 				print "  ",n,":",cc
 			print "cartesian_path_interpolate(): Got to depth",maxdepth
-			return findpath(maxdepth)
+			return cacheresult(findpath(maxdepth))
 		print "cartesian_path_interpolate(): Unable to find a feasible path within",numSamples,"iterations"
 		print "cartesian_path_interpolate(): Number of feasible samples per time instance:"
-		return None
+		return cacheresult(None)
 	return None
 
 
+#the problem being solved by _cartesian_path_interpolate_parallel's workers.
+#It is set before the process pool is forked, so the workers inherit it.
+_parallelSegmentProblem = None
+
+def _resolve_segment_worker(args):
+	robot,constraints,solver,delta,feasibilityTest = _parallelSegmentProblem
+	a,b,qa,qb = args
+	seg = cartesian_interpolate_bisect(robot,a,b,constraints,
+		startConfig=qa,endConfig=qb,delta=delta,solver=solver,feasibilityTest=feasibilityTest)
+	if seg is None:
+		return None
+	return seg.times,seg.milestones
+
+def _cartesian_path_interpolate_parallel(robot,path,constraints,startConfig,endConfig,
+	delta,solver,feasibilityTest,numSamples,maximize,numProcesses):
+	"""Implements the 'parallel' method of cartesian_path_interpolate"""
+	global _parallelSegmentProblem
+	import multiprocessing
+	n = len(path.milestones)
+	if startConfig is None:
+		if ik.solve_global(constraints,solver.getMaxIters(),solver.getTolerance(),solver.getActiveDofs(),max(100,numSamples),feasibilityTest):
+			startConfig = robot.getConfig()
+		else:
+			print "cartesian_path_interpolate(): Error: could not solve for start configuration"
+			return None
+	#solve for the configurations at each milestone, warm-starting from the previous one
+	qs = [startConfig]
+	for i in xrange(1,n):
+		if i+1 == n and endConfig is not None:
+			qs.append(endConfig)
+			break
+		if endConfig is not None:
+			u = (path.times[i] - path.times[i-1])/(path.times[-1] - path.times[i-1])
+			robot.setConfig(robot.interpolate(qs[-1],endConfig,u))
+		else:
+			robot.setConfig(qs[-1])
+		if not solve_cartesian(path.milestones[i],constraints,solver) or (feasibilityTest is not None and not feasibilityTest(robot.getConfig())):
+			print "cartesian_path_interpolate(): Could not solve for configuration at milestone",i
+			break
+		qs.append(robot.getConfig())
+	if len(qs) < n and not maximize:
+		return None
+	#resolve the segments in parallel
+	tasks = [(path.milestones[i],path.milestones[i+1],qs[i],qs[i+1]) for i in xrange(len(qs)-1)]
+	_parallelSegmentProblem = (robot,constraints,solver,delta,feasibilityTest)
+	if numProcesses == 1 or len(tasks) <= 1:
+		segs = map(_resolve_segment_worker,tasks)
+	else:
+		pool = multiprocessing.Pool(numProcesses)
+		try:
+			segs = pool.map(_resolve_segment_worker,tasks)
+		finally:
+			pool.close()
+			pool.join()
+	_parallelSegmentProblem = None
+	#stitch the segments together in linear time
+	res = RobotTrajectory(robot)
+	res.times.append(path.times[0])
+	res.milestones.append(startConfig)
+	for i,seg in enumerate(segs):
+		if seg is None:
+			print "cartesian_path_interpolate(): Found infeasible cartesian interpolation segment at time",path.times[i+1]
+			if maximize:
+				return res
+			return None
+		times,milestones = seg
+		t0 = path.times[i]
+		dt = path.times[i+1] - path.times[i]
+		res.times += [t0 + t*dt for t in times[1:]]
+		res.milestones += milestones[1:]
+	return res
+
+
 def cartesian_bump(robot,js_path,constraints,bump_paths,
 	delta=1e-2,
 	solver=None,
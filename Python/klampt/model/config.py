@@ -29,7 +29,10 @@ def components(item):
     elif hasattr(item,'__iter__'):
         if all(isinstance(v,(bool,int,float,str)) for v in item):
             return [item]
-        return sum([components(v) for v in item],[])
+        res = []
+        for v in item:
+            res.extend(components(v))
+        return res
     return [item]
 
 def componentNames(item):
@@ -136,12 +139,18 @@ def getConfig(item):
             x += loc + wor
         return x
     elif isCompound(item):
-        return sum([getConfig(v) for v in components(item)],[])
+        res = []
+        for v in components(item):
+            res.extend(getConfig(v))
+        return res
     elif hasattr(item,'__iter__'):
         if isinstance(item[0],(bool,int,float,str)):
             return item[:]
         else:
-            return sum([getConfig(v) for v in item],[])
+            res = []
+            for v in item:
+                res.extend(getConfig(v))
+            return res
     else:
         return []
 
@@ -288,16 +297,7 @@ def distance(item,a,b):
             return se3.distance((a[:9],a[9:]),(b[:9],b[9:]))
         #TODO: geodesic non-fixed orientation distances?
     elif isCompound(item):
-        subitems = components(item)
-        lengths = []
-        for s in subitems:
-            lengths.append(numConfigParams(s))
-        d = 0
-        k = 0
-        for (s,l) in zip(subitems,lengths):
-            d += distance(s,a[k:k+l],b[k:k+l])
-            k += l
-        return d
+        return ConfigLayout(item).distance(a,b)
     return vectorops.distance(a,b)
 
 def interpolate(item,a,b,u):
@@ -315,16 +315,124 @@ def interpolate(item,a,b,u):
             return T[0]+T[1]
         #TODO: geodesic non-fixed orientation distances?
     elif isCompound(item):
-        subitems = components(item)
-        lengths = []
-        for s in subitems:
-            lengths.append(numConfigParams(s))
+        return ConfigLayout(item).interpolate(a,b,u)
+    return vectorops.interpolate(a,b,u)
+
+
+def _se3_distance(a,b):
+    return se3.distance((a[:9],a[9:]),(b[:9],b[9:]))
+
+def _se3_interpolate(a,b,u):
+    T = se3.interpolate((a[:9],a[9:]),(b[:9],b[9:]),u)
+    return T[0]+T[1]
+
+def _metric(item):
+    """Returns the (distance,interpolate) functions used by distance() and
+    interpolate() for the non-compound item, or None if the item's
+    configuration is Euclidean."""
+    if hasattr(item,'distance') and hasattr(item,'interpolate'):
+        return (item.distance,item.interpolate)
+    elif isinstance(item,RigidObjectModel) or isinstance(item,coordinates.Frame):
+        return (_se3_distance,_se3_interpolate)
+    elif isinstance(item,IKObjective):
+        if item.numPosDims() == 3 and item.numRotDims() == 3:
+            return (_se3_distance,_se3_interpolate)
+    return None
+
+class ConfigLayout:
+    """A precomputed layout of the flattened configuration of an item, which
+    speeds up repeated getConfig, setConfig, distance, and interpolate calls
+    on compound items.  The item's components, their offsets in the
+    flattened vector, and their metrics are determined once, so each call is
+    a single pass over the components.
+
+    The layout must be rebuilt if the structure of the item changes, e.g.,
+    if a robot is added to a world or an IKObjective's constraint type
+    changes.
+
+    Attributes:
+    - item: the item
+    - components: the list of non-compound components of the item
+    - offsets: the start index of each component in the flattened vector.
+      offsets[-1] is the total number of parameters.
+    - metrics: for each component, its (distance,interpolate) functions, or
+      None if it is Euclidean.
+    - spans: a list of (start,end,metric) triples, in which consecutive
+      Euclidean components are merged, used for interpolation.
+    """
+    def __init__(self,item):
+        self.item = item
+        self.components = []
+        stack = [item]
+        while len(stack) > 0:
+            c = stack.pop()
+            if isCompound(c):
+                stack += reversed(components(c))
+            else:
+                self.components.append(c)
+        self.offsets = [0]
+        self.metrics = []
+        for c in self.components:
+            self.offsets.append(self.offsets[-1]+numConfigParams(c))
+            self.metrics.append(_metric(c))
+        self.spans = []
+        for i,m in enumerate(self.metrics):
+            start,end = self.offsets[i],self.offsets[i+1]
+            if m is None and len(self.spans) > 0 and self.spans[-1][2] is None:
+                self.spans[-1] = (self.spans[-1][0],end,None)
+            else:
+                self.spans.append((start,end,m))
+
+    def numConfigParams(self):
+        return self.offsets[-1]
+
+    def getConfig(self):
+        if len(self.components) == 1:
+            return getConfig(self.components[0])
         res = []
-        k = 0
-        for (s,l) in zip(subitems,lengths):
-            x = interpolate(s,a[k:k+l],b[k:k+l],u)
-            assert len(x) == l
-            res += x
-            k += l
+        for c in self.components:
+            res.extend(getConfig(c))
+        return res
+
+    def setConfig(self,vector):
+        assert len(vector) == self.offsets[-1],"Config has %d DOFs, got %d"%(self.offsets[-1],len(vector))
+        if len(self.components) == 1:
+            setConfig(self.components[0],vector)
+            return
+        offsets = self.offsets
+        for i,c in enumerate(self.components):
+            setConfig(c,vector[offsets[i]:offsets[i+1]])
+
+    def distance(self,a,b):
+        """Same as distance(item,a,b), the sum of component distances"""
+        if len(self.components) == 1:
+            m = self.metrics[0]
+            if m is None:
+                return vectorops.distance(a,b)
+            return m[0](a,b)
+        d = 0
+        offsets = self.offsets
+        for i,m in enumerate(self.metrics):
+            k,l = offsets[i],offsets[i+1]
+            if m is None:
+                d += vectorops.distance(a[k:l],b[k:l])
+            else:
+                d += m[0](a[k:l],b[k:l])
+        return d
+
+    def interpolate(self,a,b,u):
+        """Same as interpolate(item,a,b,u)"""
+        if len(self.spans) == 1:
+            m = self.spans[0][2]
+            if m is None:
+                return vectorops.interpolate(a,b,u)
+            return m[1](a,b,u)
+        res = []
+        for (k,l,m) in self.spans:
+            if m is None:
+                res.extend(vectorops.interpolate(a[k:l],b[k:l],u))
+            else:
+                x = m[1](a[k:l],b[k:l],u)
+                assert len(x) == l-k
+                res.extend(x)
         return res
-    return vectorops.interpolate(a,b,u)
\ No newline at end of file
@@ -234,17 +234,21 @@ def simContactMap(sim):
     current contacts (among bodies with collision feedback enabled)."""
     cmap = dict()
     w = sim.world
-    for a in xrange(w.numIDs()):
-        for b in xrange(a):
-            c = sim.getContacts(a,b)
-            if len(c) > 0:
-                for ci in c:
-                    assert len(ci) == 7,"Internal error in Simulation.getContacts()?"
-                #figure out the objects corresponding to a and b
-                oa = idToObject(w,a)
-                ob = idToObject(w,b)
-                clist = [ContactPoint(ci[0:3],ci[3:6],ci[6]) for ci in c]
-                cmap[(oa,ob)] = clist
+    for row in sim.getActiveContacts():
+        n = int(row[8])
+        if n == 0:
+            continue
+        assert len(row) == 9+n*10,"Internal error in Simulation.getActiveContacts()?"
+        a,b = int(row[0]),int(row[1])
+        #figure out the objects corresponding to a and b.  Keys list the
+        #object with the larger ID first, so normals are flipped to point
+        #into it
+        oa = idToObject(w,b)
+        ob = idToObject(w,a)
+        clist = []
+        for k in xrange(9,len(row),10):
+            clist.append(ContactPoint(row[k:k+3],[-v for v in row[k+3:k+6]],row[k+6]))
+        cmap[(oa,ob)] = clist
     return cmap
 
 def contactMapIKObjectives(contactmap):
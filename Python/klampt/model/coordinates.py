@@ -13,7 +13,7 @@ in/out using setManager().
 from ..math import so3,se3,vectorops
 from ..robotsim import RobotModelLink,RigidObjectModel
 import ik
-from collections import defaultdict
+from collections import defaultdict,deque
 
 
 class Frame:
@@ -213,6 +213,10 @@ class Group:
     Subgroup items can be accessed using the syntax [group]:[itemname].
     Subgroups can also be nested.
 
+    updateFromWorld() only recomputes frames whose world elements moved
+    since the last call, and their descendants.  Frames attached to robot
+    links are re-read only when the robot's configuration changes.
+
     Attributes:
     - frames: a map from frame names to Frame objects
     - childLists: a map from frame names to lists of children
@@ -233,6 +237,10 @@ class Group:
         self.points = {}
         self.directions = {}
         self.subgroups = {}
+        self._updateOrder = None
+        self._updateRobots = {}
+        self._lastTransforms = {}
+        self._lastConfigs = {}
     def setWorldModel(self,worldModel):
         """Sets this group to contain all entities of a world model"""
         for i in xrange(worldModel.numRobots()):
@@ -292,35 +300,91 @@ class Group:
         f = self.addFrame(name,worldCoordinates=simBody.getTransform())
         f._data = simBody
         return
-    def updateFromWorld(self):
-        """For any frames with associated world elements, updates the
-        transforms from the world elements."""
-        for (n,f) in self.frames.iteritems():
-            if f._data == None:
+    def _buildUpdateOrder(self):
+        """Lists the frames with associated world elements so that parents
+        come before their children.  Each entry is a tuple (frame,robotKey,
+        parentSource), where robotKey identifies the robot of a link frame
+        (or is None) and parentSource gives the parent link's transform: a
+        Frame updated earlier in the list, a RobotModelLink, or None if the
+        relative coordinates are the world coordinates."""
+        frames = []
+        visited = set()
+        queue = deque([self.frames['root']])
+        visited.add(id(self.frames['root']))
+        while len(queue) > 0:
+            f = queue.popleft()
+            frames.append(f)
+            for c in self.childLists[f._name]:
+                if id(c) not in visited:
+                    visited.add(id(c))
+                    queue.append(c)
+        for f in self.frames.itervalues():
+            if id(f) not in visited:
+                visited.add(id(f))
+                frames.append(f)
+        self._updateOrder = []
+        self._updateRobots = {}
+        for f in frames:
+            if f._data is None or not hasattr(f._data,'getTransform'):
                 continue
-            if hasattr(f._data,'getTransform'):
-                worldCoordinates = f._data.getTransform()
-                if hasattr(f._data,'getParent'):
-                    p = f._data.getParent()
-                    if p >= 0:
-                        plink = f._data.robot().link(p)
-                        parentCoordinates = plink.getTransform()
-                        f._relativeCoordinates = se3.mul(se3.inv(parentCoordinates),worldCoordinates)
+            robotKey = None
+            parentSource = None
+            if isinstance(f._data,RobotModelLink):
+                robotKey = (f._data.world,f._data.robotIndex)
+                robot = f._data.robot()
+                self._updateRobots[robotKey] = robot
+                p = f._data.getParent()
+                if p >= 0:
+                    plink = robot.link(p)
+                    pdata = (f._parent._data if f._parent is not None else None)
+                    if isinstance(pdata,RobotModelLink) and (pdata.world,pdata.robotIndex,pdata.index) == (plink.world,plink.robotIndex,plink.index):
+                        parentSource = f._parent
                     else:
-                        f._relativeCoordinates = worldCoordinates
-                else:
+                        parentSource = plink
+            self._updateOrder.append((f,robotKey,parentSource))
+    def updateFromWorld(self,force=False):
+        """For any frames with associated world elements, updates the
+        transforms from the world elements.
+
+        Only frames whose world elements moved since the last call, and the
+        frames that depend on them, are recomputed.  Robot link frames are
+        re-read only if the robot's configuration changed, so if link
+        transforms are set directly (e.g., RobotModelLink.setTransform), pass
+        force=True to recompute everything."""
+        if self._updateOrder is None:
+            self._buildUpdateOrder()
+        robotChanged = {}
+        for (key,robot) in self._updateRobots.iteritems():
+            q = robot.getConfig()
+            robotChanged[key] = (force or q != self._lastConfigs.get(key))
+            self._lastConfigs[key] = q
+        lastTransforms = self._lastTransforms
+        for (f,robotKey,parentSource) in self._updateOrder:
+            if robotKey is not None:
+                if not robotChanged[robotKey] and f._name in lastTransforms:
+                    continue
+                worldCoordinates = f._data.getTransform()
+                if parentSource is None:
                     f._relativeCoordinates = worldCoordinates
-                f._worldCoordinates = worldCoordinates
-                #update downstream non-link items
-                for c in self.childLists[f._name]:
-                    if c._data == None or not hasattr(c._data,'getTransform'):
-                        c._worldCoordinates = se3.mul(f._worldCoordinates,c._relativeCoordinates)
-                        self.updateDependentFrames(c)
-            if isinstance(f._data,tuple) and isinstance(f._data[0],SimRobotController):
-                controller,index,itemtype = f._data
-                #TODO: update the frame from the controller data
+                elif isinstance(parentSource,Frame):
+                    f._relativeCoordinates = se3.mul(se3.inv(parentSource._worldCoordinates),worldCoordinates)
+                else:
+                    f._relativeCoordinates = se3.mul(se3.inv(parentSource.getTransform()),worldCoordinates)
+            else:
+                worldCoordinates = f._data.getTransform()
+                if not force and lastTransforms.get(f._name) == worldCoordinates:
+                    continue
+                f._relativeCoordinates = worldCoordinates
+            lastTransforms[f._name] = worldCoordinates
+            f._worldCoordinates = worldCoordinates
+            #update downstream non-link items
+            for c in self.childLists[f._name]:
+                if c._data == None or not hasattr(c._data,'getTransform'):
+                    c._worldCoordinates = se3.mul(f._worldCoordinates,c._relativeCoordinates)
+                    self.updateDependentFrames(c)
+        #TODO: update the frames of setController from the controller data
         for (n,g) in self.subgroups.iteritems():
-            g.updateFromWorld()
+            g.updateFromWorld(force)
     def updateToWorld(self):
         """For any frames with associated world elements, updates the
         transforms of the world elements.  Note: this does NOT perform inverse
@@ -350,6 +414,7 @@ class Group:
             relativeCoordinates = se3.identity()
         self.frames[name] = Frame(name,worldCoordinates=worldCoordinates,parent=parent,relativeCoordinates=relativeCoordinates)
         self.childLists[parent._name].append(self.frames[name])
+        self._updateOrder = None
         return self.frames[name]
     def addPoint(self,name,coordinates=[0,0,0],frame='root'):
         if name in self.points:
@@ -401,6 +466,8 @@ class Group:
             p._parent = self.frames['root']
         del self.frames[name]
         del self.childLists[name]
+        self._updateOrder = None
+        self._lastTransforms.pop(name,None)
     def deletePoint(self,name):
         del self.points[name]
     def deleteDirection(self,name):
@@ -434,6 +501,8 @@ class Group:
         else:
             f._relativeCoordinates = se3.mul(se3.inv(f._parent._worldCoordinates),worldCoordinates)
         f._worldCoordinates = worldCoordinates
+        #the next updateFromWorld re-reads this frame's world element
+        self._lastTransforms.pop(f._name,None)
         self.updateDependentFrames(f)
     def updateDependentFrames(self,frame):
         """Whenever Frame's world coordinates are updated, call this to update
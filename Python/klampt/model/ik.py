@@ -60,9 +60,11 @@ is not yet implemented and will result in a thrown exception.
 """
 
 from ..robotsim import *
-from ..math import so3,se3
+from ..math import so3,se3,vectorops
 from subrobot import SubRobotModel
 from coordinates import Point,Direction,Frame,Transform
+import math
+import collections
 
 def objective(body,ref=None,local=None,world=None,R=None,t=None):
     """Returns an IKObjective or GeneralizedIKObjective for a given body.
@@ -297,7 +299,7 @@ def solver(objectives,iters=None,tol=None):
         else:
             raise TypeError("Objective is of wrong type")
 
-def solve(objectives,iters=1000,tol=1e-3,activeDofs=None):
+def solve(objectives,iters=1000,tol=1e-3,activeDofs=None,cache=None):
     """Attempts to solve the given objective(s). Either a single objective
     or a list of simultaneous objectives can be provided.
 
@@ -308,6 +310,10 @@ def solve(objectives,iters=1000,tol=1e-3,activeDofs=None):
         - activeDofs: a list of link indices or names to use for IK solving.
           Note: cannot use sub-robots and activeDofs at the same time.  Undefined
           behavior will result.
+        - cache: an optional IKSolutionCache.  If the objectives' targets
+          are near a previously solved target, the solve starts from its
+          solution, and successful solutions are added to the cache.
+          Only supported for single-robot objectives.
 
     Returns True if a solution is successfully found to the given tolerance,
     within the provided number of iterations.  The robot(s) are then set
@@ -334,6 +340,14 @@ def solve(objectives,iters=1000,tol=1e-3,activeDofs=None):
     if hasattr(s,'__iter__'):
         res = [si.solve()[0] for si in s]
         return all(res)
+    elif cache is not None:
+        qseed = cache.lookup(objectives)
+        if qseed is not None:
+            s.robot.setConfig(qseed)
+        res = s.solve()
+        if res:
+            cache.add(objectives,s.robot.getConfig())
+        return res
     else:
         return s.solve()
 
@@ -399,7 +413,202 @@ def solve_global(objectives,iters=1000,tol=1e-3,activeDofs=None,numRestarts=100,
                     return True
         return False
 
-def solve_nearby(objectives,maxDeviation,iters=1000,tol=1e-3,activeDofs=None,numRestarts=0,feasibilityCheck=None):
+def _solve_global_worker(s,robot,numRestarts,startRandom,feasibilityCheck,seed,done,results):
+    """Runs in a forked process: performs random restarts until done is set
+    or numRestarts is exhausted, putting feasible configurations into the
+    results queue.  Puts None when finished."""
+    setRandomSeed(seed)
+    q0 = robot.getConfig()
+    for i in xrange(numRestarts):
+        if done.is_set():
+            break
+        if i > 0 or startRandom:
+            s.sampleInitial()
+        else:
+            robot.setConfig(q0)
+        if s.solve():
+            if feasibilityCheck():
+                results.put(robot.getConfig())
+    results.put(None)
+
+def solve_global_parallel(objectives,iters=1000,tol=1e-3,activeDofs=None,numRestarts=100,feasibilityCheck=None,startRandom=False,
+                          numProcesses=None,k=None,distinctTol=1e-2):
+    """Same as :func:`solve_global`, but the random restarts are divided among
+    numProcesses worker processes.  Each worker holds its own copy of the
+    robot and solver and returns as soon as the requested number of feasible
+    solutions is found, at which point the remaining workers are cancelled.
+
+    Note: currently only supports single-robot objectives.  Workers are
+    started by forking the current process, so this is only available on
+    platforms where multiprocessing uses fork (e.g., Linux, Mac OS X).
+
+    Arguments: same as :func:`solve_global` except for...
+    - numProcesses: the number of worker processes.  If None, uses the number
+      of CPUs.
+    - k: if provided, up to k distinct feasible solutions are gathered, and
+      a list of them is returned, sorted by distance to the robot's initial
+      configuration.
+    - distinctTol: solutions closer than this (as measured by
+      robot.distance) to an already found solution are discarded.
+
+    Returns True if a feasible solution was found (or the list of solutions,
+    if k is provided).  The robot is set to the solution closest to its
+    initial configuration.
+    """
+    import multiprocessing
+    import random
+    import Queue
+    if feasibilityCheck is None: feasibilityCheck=lambda : True
+    s = solver(objectives,iters,tol)
+    if not isinstance(s,IKSolver):
+        raise NotImplementedError("solve_global_parallel: currently only supports single-robot objectives")
+    robot = s.robot
+    if activeDofs is not None:
+        links = activeDofs[:]
+        for i,l in enumerate(links):
+            if isinstance(l,str):
+                links[i] = robot.link(l).getIndex()
+        s.setActiveDofs(links)
+    if numProcesses is None:
+        numProcesses = multiprocessing.cpu_count()
+    numProcesses = max(1,min(numProcesses,numRestarts+1))
+    q0 = robot.getConfig()
+    done = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    workers = []
+    for i in xrange(numProcesses):
+        #the first worker also tries the initial configuration, like solve_global
+        n = (numRestarts+1)/numProcesses + (1 if i < (numRestarts+1)%numProcesses else 0)
+        p = multiprocessing.Process(target=_solve_global_worker,
+                                    args=(s,robot,n,startRandom or i > 0,feasibilityCheck,random.randint(0,0x7fffffff),done,results))
+        p.daemon = True
+        p.start()
+        workers.append(p)
+    ksought = (1 if k is None else k)
+    solutions = []
+    numFinished = 0
+    try:
+        while numFinished < numProcesses and len(solutions) < ksought:
+            try:
+                q = results.get(timeout=0.1)
+            except Queue.Empty:
+                #a worker that died (e.g., from an exception) never sends
+                #its None, so stop once no workers are left running
+                if not any(p.is_alive() for p in workers):
+                    break
+                continue
+            if q is None:
+                numFinished += 1
+                continue
+            if all(robot.distance(q,qs) > distinctTol for qs in solutions):
+                solutions.append(q)
+    finally:
+        done.set()
+        for p in workers:
+            p.terminate()
+            p.join()
+    solutions = sorted(solutions,key=lambda q:robot.distance(q0,q))
+    if len(solutions) > 0:
+        robot.setConfig(solutions[0])
+    else:
+        robot.setConfig(q0)
+    if k is None:
+        return len(solutions) > 0
+    return solutions
+
+class _SeedGrid:
+    """A grid-hashed set of points with associated configurations, used to
+    look up the configuration of the nearest previously solved target."""
+    def __init__(self,cellSize):
+        self.cellSize = cellSize
+        self.cells = dict()
+        self.last = None
+    def _cell(self,p):
+        return tuple(int(math.floor(v/self.cellSize)) for v in p)
+    def add(self,p,q):
+        self.cells.setdefault(self._cell(p),[]).append((p,q))
+        self.last = q
+    def nearest(self,p):
+        """Returns the configuration stored with the nearest point in the
+        neighboring cells of p, or the most recently added one if there is
+        none nearby."""
+        c = self._cell(p)
+        best = None
+        dbest = float('inf')
+        for i in xrange(-1,2):
+            for j in xrange(-1,2):
+                for k in xrange(-1,2):
+                    for (pi,qi) in self.cells.get((c[0]+i,c[1]+j,c[2]+k),[]):
+                        d = vectorops.distanceSquared(p,pi)
+                        if d < dbest:
+                            dbest = d
+                            best = qi
+        if best is None:
+            return self.last
+        return best
+
+def solve_many(objective,targets,iters=1000,tol=1e-3,activeDofs=None,seedRadius=0.1):
+    """Solves IK for many targets of the same objective, e.g., for building
+    reachability maps or grasp databases.  A single IKSolver is reused for
+    all targets, and each solve starts from the solution of the nearest
+    previously solved target.
+
+    Note: currently only supports a single objective on a single robot,
+    fixed to the world.
+
+    Arguments:
+    - objective: the IKObjective template, e.g., from :func:`objective`.
+    - targets: a list of targets.  Each is either a 3D point (the world
+      position of the objective's local point) or an se3 transform (R,t).
+    - iters, tol, activeDofs: same as for :func:`solve`.
+    - seedRadius: targets within roughly this distance of an already solved
+      target are seeded from its solution.  Otherwise the most recent
+      solution is used.
+
+    Returns a tuple (solutions,success,residuals) of lists, each the same
+    length as targets, giving the final configuration of each solve, whether
+    it succeeded, and the norm of the final residual.  The robot is restored
+    to its initial configuration.
+    """
+    s = solver(objective,iters,tol)
+    if not isinstance(s,IKSolver):
+        raise NotImplementedError("solve_many: currently only supports single-robot objectives")
+    robot = s.robot
+    if activeDofs is not None:
+        links = activeDofs[:]
+        for i,l in enumerate(links):
+            if isinstance(l,str):
+                links[i] = robot.link(l).getIndex()
+        s.setActiveDofs(links)
+    link = objective.link()
+    localpt = objective.getPosition()[0]
+    obj = objective.copy()
+    q0 = robot.getConfig()
+    seeds = _SeedGrid(seedRadius)
+    solutions = []
+    success = []
+    residuals = []
+    for target in targets:
+        if len(target) == 2:
+            R,t = target
+            obj.setFixedTransform(link,R,t)
+        else:
+            t = target
+            obj.setFixedPoint(link,localpt,t)
+        s.set(0,obj)
+        qseed = seeds.nearest(t)
+        robot.setConfig(q0 if qseed is None else qseed)
+        res = s.solve()
+        q = robot.getConfig()
+        if res:
+            seeds.add(t,q)
+        solutions.append(q)
+        success.append(res)
+        residuals.append(vectorops.norm(s.getResidual()))
+    robot.setConfig(q0)
+    return solutions,success,residuals
+
+def solve_nearby(objectives,maxDeviation,iters=1000,tol=1e-3,activeDofs=None,numRestarts=0,feasibilityCheck=None,cache=None):
     """Solves for an IK solution that does not deviate too far from the
     initial configuration.
 
@@ -409,7 +618,11 @@ def solve_nearby(objectives,maxDeviation,iters=1000,tol=1e-3,activeDofs=None,num
     - maxDeviation: the maximum absolute amount in configuration space that
       each configuration element is allowed to change.
     - numRestarts: same as in solve_global, but is by default set to zero.
+    - cache: an optional IKSolutionCache, as in :func:`solve`.  A cached
+      solution is only used as a starting point after clamping it to within
+      maxDeviation of the initial configuration.
     """
+    if feasibilityCheck is None: feasibilityCheck=lambda : True
     s = solver(objectives,iters,tol)
     if not isinstance(s,IKSolver):
         raise NotImplementedError("solve_nearby: currently only supports single-robot objectives")
@@ -432,13 +645,139 @@ def solve_nearby(objectives,maxDeviation,iters=1000,tol=1e-3,activeDofs=None,num
         qmax[d] = min(qmax[d],q[d]+maxDeviation)
     s.setJointLimits(qmin,qmax)
     s.setBiasConfig(q)
+    if cache is not None:
+        qseed = cache.lookup(objectives)
+        if qseed is not None:
+            qseed = qseed[:]
+            for d in dofs:
+                qseed[d] = min(max(qseed[d],qmin[d]),qmax[d])
+            robot.setConfig(qseed)
     #start solving
     if s.solve():
         if feasibilityCheck():
+            if cache is not None: cache.add(objectives,robot.getConfig())
             return True
     for i in xrange(numRestarts):
         s.sampleInitial()
         if s.solve():
             if feasibilityCheck():
+                if cache is not None: cache.add(objectives,robot.getConfig())
                 return True
     return False
+
+
+class IKSolutionCache:
+    """A cache of previously found IK solutions, keyed by the objectives'
+    targets, for warm-starting solves of targets that move only slightly or
+    are revisited (e.g., teleoperation and tracking).  Pass it as the cache
+    argument of :func:`solve` or :func:`solve_nearby`; objectives from
+    :func:`objective` and coordinates.ik_objective are both supported.
+
+    Solutions are indexed on a grid over the first target position, and the
+    least recently used solutions are evicted once capacity is reached.  A
+    solution whose target nearly coincides with a cached one replaces it, so
+    a target that holds still doesn't fill up the cache.
+
+    Attributes:
+    - capacity: the maximum number of cached solutions.
+    - cellSize: the grid cell size.  A lookup only returns solutions whose
+      targets are within roughly this distance.
+    - rotationWeight: the weight of rotation differences (in radians,
+      roughly) relative to position differences (in m).
+    - mergeFraction: a new solution replaces a cached one in the same cell
+      whose target is within mergeFraction*cellSize.
+    - hits, misses: lookup statistics.
+    """
+    def __init__(self,capacity=10000,cellSize=0.05,rotationWeight=0.1,mergeFraction=0.1):
+        self.capacity = capacity
+        self.cellSize = cellSize
+        self.rotationWeight = rotationWeight
+        self.mergeFraction = mergeFraction
+        self.clear()
+
+    def clear(self):
+        """Removes all cached solutions and resets the statistics"""
+        self.entries = collections.OrderedDict()
+        self.cells = dict()
+        self.nextID = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self,objectives):
+        #returns a (structure,features) pair identifying the objectives' targets
+        if not hasattr(objectives,'__iter__'):
+            objectives = [objectives]
+        structure = []
+        features = []
+        for o in objectives:
+            if not isinstance(o,IKObjective):
+                raise NotImplementedError("IKSolutionCache: only IKObjectives are supported")
+            npos = o.numPosDims()
+            nrot = o.numRotDims()
+            structure.append((o.link(),o.destLink(),npos,nrot))
+            if npos > 0:
+                features += o.getPosition()[1]
+            if nrot == 3:
+                features += vectorops.mul(o.getRotation(),self.rotationWeight)
+            elif nrot == 2:
+                features += vectorops.mul(o.getRotationAxis()[1],self.rotationWeight)
+        return tuple(structure),features
+
+    def _cell(self,structure,features):
+        return (structure,tuple(int(math.floor(v/self.cellSize)) for v in features[:3]))
+
+    def lookup(self,objectives):
+        """Returns the cached solution whose target is nearest to the
+        objectives' target, or None if there is none nearby."""
+        structure,features = self._key(objectives)
+        cell = self._cell(structure,features)
+        best = None
+        dbest = float('inf')
+        neighbors = [()]
+        for c in cell[1]:
+            neighbors = [n+(c+i,) for n in neighbors for i in (-1,0,1)]
+        for n in neighbors:
+            for id in self.cells.get((structure,n),()):
+                d = vectorops.distanceSquared(features,self.entries[id][1])
+                if d < dbest:
+                    dbest = d
+                    best = id
+        if best is None or dbest > self.cellSize**2:
+            self.misses += 1
+            return None
+        self.hits += 1
+        #mark as recently used
+        entry = self.entries.pop(best)
+        self.entries[best] = entry
+        return entry[2]
+
+    def add(self,objectives,q):
+        """Adds a solution q for the given objectives"""
+        structure,features = self._key(objectives)
+        cell = self._cell(structure,features)
+        #replace a nearly identical entry, and mark it as recently used
+        tol = (self.mergeFraction*self.cellSize)**2
+        for id in self.cells.get(cell,()):
+            if vectorops.distanceSquared(features,self.entries[id][1]) <= tol:
+                del self.entries[id]
+                self.entries[id] = (cell,features,q)
+                return
+        if len(self.entries) >= self.capacity:
+            id,(oldcell,oldfeatures,oldq) = self.entries.popitem(last=False)
+            self.cells[oldcell].remove(id)
+            if len(self.cells[oldcell]) == 0:
+                del self.cells[oldcell]
+        id = self.nextID
+        self.nextID += 1
+        self.entries[id] = (cell,features,q)
+        self.cells.setdefault(cell,set()).add(id)
+
+    def hitRate(self):
+        """Returns the fraction of lookups that returned a solution"""
+        if self.hits + self.misses == 0:
+            return 0.0
+        return float(self.hits)/(self.hits+self.misses)
+
+    def stats(self):
+        """Returns a dict of statistics: size, hits, misses, and hitRate"""
+        return {'size':len(self.entries),'hits':self.hits,'misses':self.misses,'hitRate':self.hitRate()}
@@ -129,15 +129,15 @@ class map:
             if name == 'robots':
                 return _index_name_map([self.obj.robot(i) for i in xrange(self.obj.numRobots())])
             elif name == 'rigidObjects':
-                return _index_name_map([self.obj.rigidObject(i) for r in xrange(self.obj.numRigidObjects())])
+                return _index_name_map([self.obj.rigidObject(i) for i in xrange(self.obj.numRigidObjects())])
             elif name == 'terrains':
-                return _index_name_map([self.obj.terrain(i) for r in xrange(self.obj.numTerrains())])
+                return _index_name_map([self.obj.terrain(i) for i in xrange(self.obj.numTerrains())])
             elif name == 'elements':
-                elements = [self.obj.terrain(i) for r in xrange(self.obj.numTerrains())]+[self.obj.rigidObjects(i) for r in xrange(self.obj.numRigidObjects())]
+                elements = [self.obj.terrain(i) for i in xrange(self.obj.numTerrains())]+[self.obj.rigidObject(i) for i in xrange(self.obj.numRigidObjects())]
                 for i in xrange(self.obj.numRobots()):
                     elements.append(self.obj.robot(i))
-                    for j in self.obj.robot(i).numLinks():
-                        elements.append(self.obj.robotModelLink(i,j))
+                    for j in xrange(self.obj.robot(i).numLinks()):
+                        elements.append(self.obj.robotLink(i,j))
                 return _index_name_map(elements)
             else:
                 for i in xrange(self.obj.numRobots()):
@@ -455,53 +455,131 @@ def set_dict(world,config):
 
 
 def flatten(value):
+    """Flattens a nested hierarchy of lists / tuples into a single list"""
+    res = []
+    _flatten_into(value,res)
+    return res
+
+def _unwrap(value):
+    """Returns value with any map wrappers replaced by the wrapped lists /
+    tuples / values"""
+    if isinstance(value,map):
+        value = value.obj
+    if isinstance(value,list):
+        return [_unwrap(v) for v in value]
+    elif isinstance(value,tuple):
+        return tuple(_unwrap(v) for v in value)
+    return value
+
+def _flatten_into(value,res):
+    if isinstance(value,map):
+        value = value.obj
     if isinstance(value, (list,tuple)):
-        return sum([flatten(vi) for vi in value],[])
+        for vi in value:
+            _flatten_into(vi,res)
     else:
-        return [value]
+        res.append(value)
 
-def _match_hierarchy_iter(flattened,ref):
+def _match_hierarchy_iter(flattened,ref,index=0):
     if isinstance(ref,(list,tuple)):
         res = []
         for v in ref:
-            resv,partial = _match_hierarchy_iter(flattened,v)
+            resv,index = _match_hierarchy_iter(flattened,v,index)
             res.append(resv)
-            flattened = partial
-        return res,flattened
+        return res,index
     else:
-        return flattened[0],flattened[1:]
+        return flattened[index],index+1
 
 
 def _match_hierarchy(flattened,ref):
-    result,flattened = _match_hierarchy_iter(flattened,ref)
-    if len(flattened) != 0:
+    result,index = _match_hierarchy_iter(flattened,ref)
+    if index != len(flattened):
         raise ValueError("Vector too large for hierarchy")
     return result
 
+def _split_item(name):
+    """Splits an item name like 'robots[0].links[4].transform' into the
+    prefix 'robots[0].links[4]' and the suffix 'transform' at the last
+    attribute access.  Returns ('',name) if there is no attribute access."""
+    depth = 0
+    for i in xrange(len(name)-1,-1,-1):
+        c = name[i]
+        if c == ']':
+            depth += 1
+        elif c == '[':
+            depth -= 1
+        elif c == '.' and depth == 0:
+            return name[:i],name[i+1:]
+    return '',name
+
 
 class Vectorizer:
     """A class that retrieves named items in a world and places them into
     a flattened vector.  Useful for planning.
+
+    The flattened layout (keys, lengths, and offsets) is computed once on
+    construction, and the items' paths are resolved and compiled once, so
+    getVector / setVector only evaluate the last attribute of each item.
+    This assumes the structure of the world (number of robots, objects,
+    etc) does not change over the Vectorizer's lifetime.
     """
     def __init__(self,world,items):
         self.world = world
-        self.ref = get_dict(world,items)
+        #get_dict returns map wrappers, e.g., for configs and transforms
+        self.ref = dict((k,_unwrap(v)) for (k,v) in get_dict(world,items).iteritems())
         self.keys = self.ref.keys()
         self.lengths = [len(flatten(self.ref[k])) for k in self.keys]
-
-    def getVector(self):
-        """Flattens the selected items in the world into a vector"""
-        v = [get_item(self.world,k) for k in self.keys]
-        return flatten(v)
+        self.offsets = []
+        self.size = 0
+        for l in self.lengths:
+            self.offsets.append(self.size)
+            self.size += l
+        #compile the accessors
+        self._getters = []
+        self._setters = []
+        self._locals = []
+        wmap = map(world)
+        for k in self.keys:
+            prefix,suffix = _split_item(k)
+            loc = {'_w':wmap}
+            if prefix != '':
+                parent = eval('_w.'+prefix,globals(),loc)
+                if isinstance(parent,map) and parent.setter == None:
+                    loc = {'_w':parent}
+                else:
+                    suffix = k
+            self._locals.append(loc)
+            self._getters.append(compile('_w.'+suffix,k,'eval'))
+            self._setters.append(compile('_w.'+suffix+'=_v',k,'exec'))
+
+    def getVector(self,out=None):
+        """Flattens the selected items in the world into a vector.  If out is
+        given (a list or numpy array of length self.size) it is filled in
+        place and returned, otherwise a new list is returned."""
+        if out is None:
+            res = []
+            for getter,loc in zip(self._getters,self._locals):
+                _flatten_into(eval(getter,globals(),loc),res)
+            return res
+        for getter,loc,ofs,l in zip(self._getters,self._locals,self.offsets,self.lengths):
+            val = eval(getter,globals(),loc)
+            if isinstance(val,map):
+                val = val.obj
+            if l == 1 and not isinstance(val,(list,tuple)):
+                out[ofs] = val
+            else:
+                out[ofs:ofs+l] = flatten(val)
+        return out
 
     def setVector(self,v):
         """Un-flattens the selected elements in the world from a vector"""
-        suml = 0
-        for l,k in zip(self.lengths,self.keys):
-            vk = v[suml:suml+l]
-            vk_val = _match_hierarchy(vk,self.ref[k])
-            set_item(self.world,k,vk_val)
-            suml += l
+        if len(v) != self.size:
+            raise ValueError("Vector has length %d, but the hierarchy has size %d"%(len(v),self.size))
+        for setter,loc,ofs,k in zip(self._setters,self._locals,self.offsets,self.keys):
+            vk_val,index = _match_hierarchy_iter(v,self.ref[k],ofs)
+            loc['_v'] = vk_val
+            exec setter in globals(),loc
+            del loc['_v']
 
 if __name__ == '__main__':
     w = WorldModel()
@@ -8,6 +8,10 @@ or reverse a path, and concatenate multiple MultiPaths together.
 from ..model.contact import Hold
 from ..io.loader import *
 from ..math import vectorops
+import math
+import bisect
+import array
+import sys
 import xml.etree.ElementTree as ET
 from xml.sax.saxutils import escape
 from xml.dom import minidom
@@ -43,10 +47,52 @@ class MultiPath:
             self.holdIndices = []
             self.ikObjectives = []
 
+    class Cursor:
+        """Evaluates a MultiPath at a sequence of times.  When the query times
+        are monotonically increasing, as in playback at a fixed control rate, each
+        query takes amortized constant time, since the search for the active
+        section and milestone starts from the previous result.  Queries that go
+        backwards in time fall back to binary search.
+
+        The MultiPath must not be modified while the cursor is in use.
+        """
+        def __init__(self,path):
+            self.path = path
+            self.section = 0
+            self.index = 0
+
+        def timeToSegment(self,t):
+            """Same as MultiPath.timeToSegment"""
+            path = self.path
+            ends = path._timeIndex()
+            n = len(ends)
+            if n == 0 or t < path.startTime():
+                return (-1,0,0)
+            s = self.section
+            if s >= n or t < path._sectionStart(s):
+                s = path.timeToSection(t)
+                self.index = 0
+            else:
+                while s < n and t >= ends[s]:
+                    s += 1
+                    self.index = 0
+            self.section = s
+            if s >= n:
+                return (s,0,0)
+            i,u = path._sectionSegment(s,t,self.index)
+            self.index = i
+            return (s,i,u)
+
+        def eval(self,t):
+            """Same as MultiPath.eval"""
+            return self.path._evalSegment(self.timeToSegment(t))
+
     def __init__(self):
         self.sections = []
         self.settings = {}
         self.holdSet = dict()
+        self._sectionEnds = None
+        self._sectionEndsKey = None
 
     def numSections(self):
         return len(self.sections)
@@ -107,12 +153,43 @@ class MultiPath:
     def getSectionTiming(self,section):
         """Returns a pair (tstart,tend) giving the timing of the section"""
         assert section >= 0 and section < len(self.sections)
-        if self.hasTiming():
-            return self.sections[section].times[0],self.sections[section].times[-1]
-        t0 = 0
-        for i in range(section):
-            t0 += len(self.sections[i].configs)-1
-        return (t0,t0+len(self.sections[section].configs))
+        return (self._sectionStart(section),self._timeIndex()[section])
+
+    def updateTimeIndex(self):
+        """Rebuilds the index of section end times used by timeToSection,
+        timeToSegment, and eval.  The index is rebuilt automatically when
+        sections are added or removed, or when the last section's end time
+        changes, but this must be called if the times or configs of other sections
+        are modified in place."""
+        if len(self.sections) == 0:
+            self._sectionEnds = []
+        elif self.hasTiming():
+            self._sectionEnds = [s.times[-1] for s in self.sections]
+        else:
+            self._sectionEnds = []
+            t = 0
+            for s in self.sections:
+                t += len(s.configs)-1
+                self._sectionEnds.append(t)
+        self._sectionEndsKey = self._timeIndexKey()
+
+    def _timeIndexKey(self):
+        if len(self.sections) == 0:
+            return None
+        last = self.sections[-1]
+        return (len(self.sections),id(last),last.times[-1] if last.times is not None else len(last.configs))
+
+    def _timeIndex(self):
+        if self._sectionEnds is None or self._sectionEndsKey != self._timeIndexKey():
+            self.updateTimeIndex()
+        return self._sectionEnds
+
+    def _sectionStart(self,section):
+        if self.sections[section].times is not None:
+            return self.sections[section].times[0]
+        if section == 0:
+            return 0
+        return self._timeIndex()[section-1]
 
     def getStance(self,section):
         """Returns the list of Holds that the section should satisfy"""
@@ -198,6 +275,7 @@ class MultiPath:
         if t is not None:
             assert self.sections[section].times is not None
             self.sections[section].times[configIndex] = t
+            self._sectionEnds = None
         if maintainContinuity:
             section0 = section
             configIndex0 = configIndex
@@ -249,19 +327,149 @@ class MultiPath:
         self.sections += newSections
         self.holdSet.update(newholds)
 
-    def save(self,fn):
-        """Saves this  multipath to an xml file."""
-        tree = self.saveXML()
+    def save(self,fn,binary=False):
+        """Saves this multipath to an xml file.  The file is written
+        incrementally, without building an ElementTree.
+
+        If binary=True, the milestone configs, times, and velocities are
+        written to a compact binary sidecar file fn+'.bin', which is much faster
+        to read and write for long paths and stores values at full precision.
+        The xml file then references the sidecar, so it can only be read by
+        MultiPath.load()."""
         f = open(fn,'w')
-        f.write('<?xml version="1.0"?>\n')
-        f.write(_prettify(tree.getroot()))
-        #tree.write(fn,pretty_print=True)
+        if binary:
+            import os
+            binfn = fn+'.bin'
+            fbin = open(binfn,'wb')
+            self._writeStream(f,fbin,os.path.basename(binfn))
+            fbin.close()
+        else:
+            self._writeStream(f)
         f.close()
 
     def load(self,fn):
-        """Loads this  multipath from a multipath xml file."""
-        tree = ET.parse(fn)
-        return self.loadXML(tree)
+        """Loads this multipath from a multipath xml file.  The file is parsed
+        incrementally, so that the whole document is never held in memory.
+        Binary sidecar files written by save(fn,binary=True) are read as well."""
+        self.sections = []
+        self.holdSet = dict()
+        self.settings = dict()
+        root = None
+        depth = 0
+        s = None
+        fbin = None
+        for event,elem in ET.iterparse(fn,events=('start','end')):
+            if event == 'start':
+                depth += 1
+                if depth == 1:
+                    root = elem
+                    for k,v in elem.attrib.iteritems():
+                        self.settings[k]=v
+                elif depth == 2 and elem.tag == 'section':
+                    s = MultiPath.Section()
+                    for k,v in elem.attrib.iteritems():
+                        s.settings[k]=v
+                continue
+            depth -= 1
+            tag = elem.tag
+            if depth == 2 and s is not None:
+                if tag == 'milestone':
+                    if 'config' not in elem.attrib:
+                        raise ValueError("Milestone does not contain config attribute")
+                    s.configs.append(readVector(elem.attrib['config']))
+                    if 'time' in elem.attrib:
+                        if s.times==None: s.times = []
+                        s.times.append(float(elem.attrib['time']))
+                    if 'velocity' in elem.attrib:
+                        if s.velocities==None: s.velocities = []
+                        s.velocities.append(readVector(elem.attrib['velocity']))
+                elif tag == 'ikgoal':
+                    s.ikObjectives.append(readIKObjective(elem.text))
+                    s.ikObjectives[-1].text = elem.text
+                elif tag == 'hold':
+                    if 'index' in elem.attrib:
+                        s.holdIndices.append(int(elem.attrib['index']))
+                    elif 'name' in elem.attrib:
+                        s.holdIndices.append(elem.attrib['name'])
+                    else:
+                        s.holds.append(readHold(elem.text))
+                elif tag == 'binarymilestones':
+                    if fbin is None:
+                        raise ValueError("Binary milestones given without a binary sidecar file")
+                    _read_binary_milestones(s,elem.attrib,fbin)
+                elem.clear()
+            elif depth == 1:
+                if tag == 'section':
+                    self.sections.append(s)
+                    s = None
+                elif tag == 'hold':
+                    hold = readHold(elem.text)
+                    if 'name' in elem.attrib:
+                        self.holdSet[elem.attrib['name']] = hold
+                    else:
+                        self.holdSet[len(self.holdSet)] = hold
+                elif tag == 'binary':
+                    import os
+                    fbin = open(os.path.join(os.path.dirname(fn),elem.attrib['file']),'rb')
+                #free the memory used by processed elements
+                root.clear()
+        if fbin is not None:
+            fbin.close()
+        return
+
+    def _writeStream(self,f,fbin=None,binfn=None):
+        """Writes the xml file incrementally to the file object f, in the
+        same layout as _prettify(self.saveXML().getroot()).  If fbin is
+        given, milestones are written to it in binary format, and binfn is the
+        name of the sidecar file to reference."""
+        f.write('<?xml version="1.0"?>\n')
+        f.write('<multipath'+_xml_attribs(self.settings))
+        if len(self.sections)==0 and len(self.holdSet)==0 and fbin is None:
+            f.write(' />')
+            return
+        f.write('>')
+        if fbin is not None:
+            f.write('\n  <binary file="'+_escape_attr(binfn)+'" />')
+        offset = 0
+        for sec in self.sections:
+            lines = []
+            for ikgoal in sec.ikObjectives:
+                lines.append('    <ikgoal>'+_escape_nl(ikgoal.text)+'</ikgoal>')
+            for h in sec.holds:
+                lines.append('    <hold>'+_escape_nl(writeHold(h))+'</hold>')
+            for h in sec.holdIndices:
+                if isinstance(h,int):
+                    lines.append('    <hold index="'+str(h)+'" />')
+                else:
+                    lines.append('    <hold name="'+_escape_attr(str(h))+'" />')
+            if fbin is not None:
+                if len(sec.configs) > 0:
+                    attribs,offset = _write_binary_milestones(sec,fbin,offset)
+                    lines.append('    <binarymilestones'+_xml_attribs(attribs)+' />')
+            else:
+                times = sec.times
+                velocities = sec.velocities
+                for i in xrange(len(sec.configs)):
+                    line = '    <milestone config="'+writeVector(sec.configs[i])+'"'
+                    if times != None:
+                        line += ' time="'+str(times[i])+'"'
+                    if velocities != None:
+                        line += ' velocity="'+writeVector(velocities[i])+'"'
+                    lines.append(line+' />')
+            f.write('\n  <section'+_xml_attribs(sec.settings))
+            if len(lines)==0:
+                f.write(' />')
+            else:
+                f.write('>\n')
+                f.write('\n'.join(lines))
+                f.write('\n  </section>')
+        for hkey,h in self.holdSet.iteritems():
+            if not isinstance(hkey,int):
+                f.write('\n  <hold name="'+_escape_attr(str(hkey))+'">')
+            else:
+                f.write('\n  <hold>')
+            f.write(_escape_nl(writeHold(h))+'</hold>')
+        f.write('\n</multipath>')
 
     def saveXML(self):
         """Saves this multipath to a multipath xml tree (ElementTree)"""
@@ -344,15 +552,12 @@ class MultiPath:
         return
 
     def timeToSection(self,t):
-        """Returns the section corresponding to the time parameter t"""
-        if not self.hasTiming():
-            return int(math.floor(t*len(self.sections)))
-        else:
-            if t < self.startTime(): return -1
-            for i,s in enumerate(self.sections):
-                if t < s.times[-1]:
-                    return i
-            return len(self.sections)
+        """Returns the section corresponding to the time parameter t.  Returns -1
+        if t is before the start time, and numSections() if t is at or after the
+        end time.  Runs in O(log n) time for n sections."""
+        ends = self._timeIndex()
+        if len(ends) == 0 or t < self.startTime(): return -1
+        return bisect.bisect_right(ends,t)
 
     def timeToSegment(self,t):
         """ Returns a (section index,milestone index,param) tuple such that
@@ -361,36 +566,57 @@ class MultiPath:
         s = self.timeToSection(t)
         if s < 0: return (-1,0,0)
         elif s >= len(self.sections): return (s,0,0)
-        sec = self.sections[s]
-        if len(sec.times)==0:
-            usec = t*len(self.sections)-s
-            tsec = (len(sec.milestones)-1)*usec
-            i = int(math.floor(tseg))
-            u = tseg - i
-            return (s,i,u)
-        else:
-            i = bisect.bisect_left(sec.times,t)
-            p = i-1
-            u=(t-sec.times[p])/(sec.times[i]-sec.times[p])
-            if i==0:
-                return (s,0,0)
-            return (s,p,u)
+        i,u = self._sectionSegment(s,t)
+        return (s,i,u)
 
-    def eval(self,t):
-        """Evaluates the MultiPath at time t."""
-        (s,i,u) = self.getSegment(t)
+    def _sectionSegment(self,s,t,start=0):
+        #returns the (milestone index,param) of time t in section s, searching
+        #the section's times from the milestone index start onward
+        sec = self.sections[s]
+        if sec.times is None:
+            tsec = t - self._sectionStart(s)
+            i = max(0,min(int(math.floor(tsec)),len(sec.configs)-2))
+            return (i,tsec-i)
+        times = sec.times
+        if start >= len(times) or t < times[start]:
+            start = 0
+        i = bisect.bisect_right(times,t,start)
+        if i == 0:
+            return (0,0)
+        if i >= len(times):
+            return (len(times)-1,0)
+        p = i-1
+        if times[i] == times[p]:
+            return (p,0)
+        return (p,(t-times[p])/(times[i]-times[p]))
+
+    def _evalSegment(self,seg):
+        (s,i,u) = seg
         if s < 0: return self.startConfig()
         elif s >= len(self.sections): return self.endConfig()
-        if u==0: return self.sections[s].milestones[i]
-        return vectorops.interpolate(self.sections[s].milestones[i],self.sections[s].milestones[i+1],u)
+        configs = self.sections[s].configs
+        if u==0 or i+1 >= len(configs): return configs[i]
+        return vectorops.interpolate(configs[i],configs[i+1],u)
+
+    def eval(self,t):
+        """Evaluates the MultiPath at time t.  To evaluate at many increasing
+        times, a MultiPath.Cursor is faster."""
+        return self._evalSegment(self.timeToSegment(t))
+
+    def cursor(self):
+        """Returns a MultiPath.Cursor for fast evaluation of monotonically
+        increasing times."""
+        return MultiPath.Cursor(self)
 
-    def getTrajectory(self,robot=None,eps=None):
+    def getTrajectory(self,robot=None,eps=None,numProcesses=1):
         """Returns a trajectory representation of this MultiPath.  If robot is provided, then a RobotTrajectory
         is returned.  Otherwise, if velocity information is given, then a HermiteTrajectory is returned.
         Otherwise, a Trajectory is returned.
 
         If robot and eps is given, then the IK constraints along the trajectory are solved and the path is
-        discretized at resolution eps.
+        discretized at resolution eps.  The sections are discretized independently, so if numProcesses
+        is not 1, they are processed by that many worker processes (None uses the number of CPUs).  The
+        result is the same as for numProcesses=1.
         """
         import trajectory
         res = trajectory.Trajectory()
@@ -402,16 +628,17 @@ class MultiPath:
             res = trajectory.HermiteTrajectory()
 
         if robot is not None and eps is not None:
-            from ..plan.robotcspace import ClosedLoopRobotCSpace
-            for i,s in enumerate(self.sections):
-                space = ClosedLoopRobotCSpace(robot,self.getIKProblem(i))
-                for j in xrange(len(s.configs)-1):
-                    ikpath = space.interpolationPath(s.configs[j],s.configs[j+1],eps)
+            if numProcesses == 1 or len(self.sections) <= 1:
+                ikpaths = [_discretize_section(self,robot,i,eps) for i in xrange(len(self.sections))]
+            else:
+                ikpaths = _discretize_sections_parallel(self,robot,eps,numProcesses)
+            for sectionpaths in ikpaths:
+                for ikpath in sectionpaths:
                     t0 = len(res.milestones)
                     t1 = t0 + 1
                     iktimes = [t0 + float(k)/float(len(ikpath)-1)*(t1-t0) for k in xrange(len(ikpath))]
-                    res.milestones += ikpath[:-1]
-                    res.times += iktimes[:-1]
+                    res.milestones.extend(ikpath[:-1])
+                    res.times.extend(iktimes[:-1])
             res.milestones.append(self.sections[-1].configs[-1])
         else:
             for s in self.sections:
@@ -434,16 +661,98 @@ class MultiPath:
                 res.times.append(self.sections[-1].times[-1])
         return res
 
+#the problem being solved by _discretize_section_worker.  It is set before the
+#process pool is forked, so the workers inherit it.
+_discretizeProblem = None
+
+def _discretize_section(path,robot,section,eps):
+    """Returns the list of IK-constrained interpolation paths between
+    consecutive configs of the given section of the MultiPath path."""
+    from ..plan.robotcspace import ClosedLoopRobotCSpace
+    s = path.sections[section]
+    space = ClosedLoopRobotCSpace(robot,path.getIKProblem(section))
+    return [space.interpolationPath(s.configs[j],s.configs[j+1],eps) for j in xrange(len(s.configs)-1)]
+
+def _discretize_section_worker(section):
+    path,robot,eps = _discretizeProblem
+    return _discretize_section(path,robot,section,eps)
+
+def _discretize_sections_parallel(path,robot,eps,numProcesses):
+    """Runs _discretize_section on all sections of path in a pool of
+    numProcesses worker processes."""
+    global _discretizeProblem
+    import multiprocessing
+    _discretizeProblem = (path,robot,eps)
+    pool = multiprocessing.Pool(numProcesses)
+    try:
+        return pool.map(_discretize_section_worker,range(len(path.sections)),1)
+    finally:
+        pool.close()
+        pool.join()
+        _discretizeProblem = None
+
 def _escape_nl(text):
     return escape(text).replace('\n','&#x0A;')
 
+def _escape_attr(text):
+    return _escape_nl(text).replace('"','&quot;')
+
+def _xml_attribs(attrib):
+    res = ''
+    for k,v in attrib.iteritems():
+        res += ' '+k.encode('utf-8')+'="'+_escape_attr(unicode(v)).encode('utf-8')+'"'
+    return res
+
+def _write_binary_milestones(sec,fbin,offset):
+    """Writes a section's configs, times, and velocities to the binary file
+    fbin as little-endian doubles, starting at the given offset (in doubles).
+    Returns the attributes of the binarymilestones element and the new
+    offset."""
+    n = len(sec.configs)
+    data = array.array('d')
+    for q in sec.configs:
+        data.extend(q)
+    if sec.times != None:
+        data.extend(sec.times)
+    if sec.velocities != None:
+        for v in sec.velocities:
+            data.extend(v)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    data.tofile(fbin)
+    attribs = {'offset':str(offset),'count':str(n),'config':str(len(sec.configs[0])),
+               'time':str(int(sec.times != None)),
+               'velocity':str(len(sec.velocities[0]) if sec.velocities != None else 0)}
+    return attribs,offset+len(data)
+
+def _read_binary_milestones(sec,attribs,fbin):
+    """Reads the configs, times, and velocities of a binarymilestones element
+    from the binary file fbin into the section sec."""
+    offset = int(attribs['offset'])
+    n = int(attribs['count'])
+    dconfig = int(attribs['config'])
+    hastimes = int(attribs['time'])
+    dvel = int(attribs['velocity'])
+    fbin.seek(offset*8)
+    data = array.array('d')
+    data.fromfile(fbin,n*(dconfig+hastimes+dvel))
+    if sys.byteorder == 'big':
+        data.byteswap()
+    sec.configs = [data[i:i+dconfig].tolist() for i in xrange(0,n*dconfig,dconfig)]
+    ofs = n*dconfig
+    if hastimes:
+        sec.times = data[ofs:ofs+n].tolist()
+        ofs += n
+    if dvel > 0:
+        sec.velocities = [data[i:i+dvel].tolist() for i in xrange(ofs,ofs+n*dvel,dvel)]
+
 def _prettify(elem,indent_level=0):
     """Return a pretty-printed XML string for the Element.
     """
     indent = "  "
     res = indent_level*indent + '<'+elem.tag.encode('utf-8')
     for k in elem.keys():
-        res += " "+k.encode('utf-8')+'="'+_escape_nl(elem.get(k)).encode('utf-8')+'"'
+        res += " "+k.encode('utf-8')+'="'+_escape_attr(elem.get(k)).encode('utf-8')+'"'
     children  = elem.getchildren()
     if len(children)==0 and not elem.text:
         res += ' />'
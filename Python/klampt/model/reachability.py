@@ -0,0 +1,343 @@
+"""Precomputed reachability maps for a robot link.
+
+A ReachabilityMap voxelizes the workspace around a robot's base, and for each
+voxel stores a reachability score (the fraction of sampled end effector
+orientations for which IK succeeded) and the IK solutions that were found.
+After the map is built offline (which can take a while) and saved, the
+questions "can the link reach this pose?" and "what is a good IK seed for this
+pose?" are answered in constant time, and the seeds warm-start ik.solve.
+
+    rmap = ReachabilityMap(robot,robot.link(6),bmin=[-1,-1,0],bmax=[1,1,1.5],resolution=0.05)
+    rmap.build()
+    rmap.save("tx90.rmap")
+    ...
+    rmap = ReachabilityMap.load("tx90.rmap",robot)
+    if rmap.score(T) > 0:
+        rmap.solve(T)
+
+The map is stored relative to the robot's base link, i.e., the parent of the
+chain of non-floating joints that move the link, and seeds only store the
+DOFs of that chain.  So the map stays valid when a floating base moves, and it
+can also be used for inverse reachability, i.e., to rank candidate base placements for a given
+target (see ReachabilityMap.rankBases).
+"""
+
+from ..robotsim import *
+from ..math import vectorops,so3,se3
+import ik
+import array
+import struct
+import math
+
+_MAGIC = 'KRMAP'
+_VERSION = 2
+
+class ReachabilityMap:
+    """A voxel grid over the workspace of a robot link, storing per-voxel
+    reachability scores and IK seed configurations.
+
+    Attributes:
+    - robot: the RobotModel
+    - link: the index of the link
+    - localpt: the point on the link, in local coordinates, that is placed at
+      the voxel centers
+    - activeDofs: the DOFs that move the link relative to the base link,
+      i.e., its ancestors that aren't part of a floating joint.
+    - baseLink: the index of the base link, the parent of activeDofs[0], or
+      -1 if activeDofs[0] is a root link.
+    - bmin, bmax: the bounds of the grid, relative to the robot's base link
+    - resolution: the voxel size
+    - dims: the number of voxels along each axis
+    - rotations: a list of so3 rotations sampled in each voxel (relative to
+      the base link), or [] if only positions are considered.
+    - scores: an array('B') of per-voxel scores, in the range 0-255
+    - seeds: an array('f') holding the values of activeDofs per voxel and
+      rotation, with NaN entries where no solution was found.
+    """
+    #the number of cells per axis of the table used to look up the nearest
+    #rotation, over rotation vectors in [-pi,pi]^3
+    rotationTableDivisions = 16
+
+    def __init__(self,robot,link,localpt=(0,0,0),bmin=(-1,-1,-1),bmax=(1,1,1),resolution=0.05,rotations=None):
+        self.robot = robot
+        self.link = (link if isinstance(link,int) else link.index)
+        self.localpt = list(localpt)
+        self.bmin = list(bmin)
+        self.bmax = list(bmax)
+        self.resolution = resolution
+        self.dims = [max(1,int(math.ceil((b-a)/resolution))) for (a,b) in zip(bmin,bmax)]
+        self.rotations = (rotations if rotations is not None else [])
+        self.activeDofs = self._chainDofs()
+        if len(self.activeDofs) == 0:
+            raise ValueError("Link "+str(self.link)+" is not moved by any non-floating joint")
+        self.baseLink = robot.link(self.activeDofs[0]).getParent()
+        self.numConfigs = len(self.activeDofs)
+        self._rotationTable = None
+        n = self.numVoxels()
+        self.scores = array.array('B',[0]*n)
+        self.seeds = array.array('f',[float('nan')])*(n*self._numSlots()*self.numConfigs)
+
+    def _numSlots(self):
+        return max(1,len(self.rotations))
+
+    def numVoxels(self):
+        return self.dims[0]*self.dims[1]*self.dims[2]
+
+    def _chainDofs(self):
+        #ancestors of the link up to the first floating joint (e.g., a
+        #floating base), skipping welded links
+        res = []
+        i = self.link
+        while i >= 0:
+            jtype = self.robot.getJointType(i)
+            if jtype in ['floating','floatingplanar']:
+                break
+            if jtype != 'weld':
+                res.append(i)
+            i = self.robot.link(i).getParent()
+        return sorted(res)
+
+    def baseTransform(self):
+        """Returns the current transform of the robot's base link"""
+        if self.baseLink >= 0:
+            return self.robot.link(self.baseLink).getTransform()
+        return self.robot.link(self.activeDofs[0]).getParentTransform()
+
+    def voxelIndex(self,p):
+        """Returns the index of the voxel containing the point p, given
+        relative to the base link, or -1 if p is out of bounds"""
+        res = 0
+        for i in xrange(3):
+            k = int(math.floor((p[i]-self.bmin[i])/self.resolution))
+            if k < 0 or k >= self.dims[i]:
+                return -1
+            res = res*self.dims[i] + k
+        return res
+
+    def voxelCenter(self,index):
+        """Returns the center of the voxel with the given index, relative to
+        the base link"""
+        k = index % self.dims[2]
+        index /= self.dims[2]
+        j = index % self.dims[1]
+        i = index / self.dims[1]
+        return [self.bmin[0]+(i+0.5)*self.resolution,self.bmin[1]+(j+0.5)*self.resolution,self.bmin[2]+(k+0.5)*self.resolution]
+
+    def _toBase(self,target,base):
+        #converts a world target (point or transform) to base link coordinates
+        Tbase = (base if base is not None else self.baseTransform())
+        Tinv = se3.inv(Tbase)
+        if len(target) == 2:
+            return se3.mul(Tinv,target)
+        return se3.apply(Tinv,target)
+
+    def _rotationCell(self,R):
+        #index of the rotation table cell containing R's rotation vector
+        n = self.rotationTableDivisions
+        res = 0
+        for w in so3.moment(R):
+            k = int((w+math.pi)*n/(2*math.pi))
+            res = res*n + min(n-1,max(0,k))
+        return res
+
+    def _buildRotationTable(self):
+        #for each cell, the rotation nearest to the cell center, measured by
+        #the absolute dot product of their quaternions
+        n = self.rotationTableDivisions
+        quats = [so3.quaternion(R) for R in self.rotations]
+        h = 2*math.pi/n
+        centers = [-math.pi+(i+0.5)*h for i in xrange(n)]
+        self._rotationTable = array.array('i',[0]*(n*n*n))
+        for i,wx in enumerate(centers):
+            for j,wy in enumerate(centers):
+                for k,wz in enumerate(centers):
+                    q = so3.quaternion(so3.from_moment([wx,wy,wz]))
+                    best = max(xrange(len(quats)),key=lambda r:abs(vectorops.dot(q,quats[r])))
+                    self._rotationTable[(i*n+j)*n+k] = best
+
+    def _rotationSlot(self,R):
+        #constant time lookup of the (approximately) nearest rotation
+        if len(self.rotations) == 0 or R is None:
+            return 0
+        if self._rotationTable is None:
+            self._buildRotationTable()
+        return self._rotationTable[self._rotationCell(R)]
+
+    def _getSeed(self,voxel,slot):
+        #returns the values of activeDofs, or None
+        ofs = (voxel*self._numSlots()+slot)*self.numConfigs
+        q = self.seeds[ofs:ofs+self.numConfigs].tolist()
+        if len(q) == 0 or q[0] != q[0]:
+            return None
+        return q
+
+    def _setSeed(self,voxel,slot,q):
+        #stores the values of activeDofs from the full configuration q
+        ofs = (voxel*self._numSlots()+slot)*self.numConfigs
+        self.seeds[ofs:ofs+self.numConfigs] = array.array('f',[q[d] for d in self.activeDofs])
+
+    def _applySeed(self,qseed):
+        #sets the robot's active DOFs to the seed values
+        q = self.robot.getConfig()
+        for d,v in zip(self.activeDofs,qseed):
+            q[d] = v
+        self.robot.setConfig(q)
+
+    def _linkOrigin(self,target):
+        #the link transform's translation that places localpt at target[1]
+        R,t = target
+        return vectorops.sub(t,so3.apply(R,self.localpt))
+
+    def build(self,iters=100,tol=1e-3,numRestarts=5,feasibilityCheck=None):
+        """Computes the scores and seeds of all voxels by solving IK at each
+        voxel center (and each rotation), moving only activeDofs.  Each
+        voxel is first seeded from the solution of its neighbor along the
+        sweep, then from random restarts.  The robot's configuration is
+        restored afterwards.
+
+        This is meant to be done offline; see save() and load().
+        """
+        q0 = self.robot.getConfig()
+        Tbase = self.baseTransform()
+        link = self.robot.link(self.link)
+        s = IKSolver(self.robot)
+        s.setMaxIters(iters)
+        s.setTolerance(tol)
+        s.setActiveDofs(self.activeDofs)
+        if len(self.rotations) == 0:
+            s.add(ik.objective(link,local=self.localpt,world=[0,0,0]))
+        else:
+            s.add(ik.objective(link,R=so3.identity(),t=[0,0,0]))
+        obj = IKObjective()
+        numSlots = self._numSlots()
+        lastSolution = [None]*numSlots
+        for v in xrange(self.numVoxels()):
+            pworld = se3.apply(Tbase,self.voxelCenter(v))
+            numSolved = 0
+            for slot in xrange(numSlots):
+                if len(self.rotations) == 0:
+                    obj.setFixedPoint(self.link,self.localpt,pworld)
+                else:
+                    R = so3.mul(Tbase[0],self.rotations[slot])
+                    obj.setFixedTransform(self.link,R,self._linkOrigin((R,pworld)))
+                s.set(0,obj)
+                solved = False
+                for attempt in xrange(numRestarts+1):
+                    if attempt == 0:
+                        self.robot.setConfig(q0)
+                        if lastSolution[slot] is not None:
+                            self._applySeed(lastSolution[slot])
+                    else:
+                        s.sampleInitial()
+                    if s.solve() and (feasibilityCheck is None or feasibilityCheck()):
+                        solved = True
+                        break
+                if solved:
+                    q = self.robot.getConfig()
+                    self._setSeed(v,slot,q)
+                    lastSolution[slot] = [q[d] for d in self.activeDofs]
+                    numSolved += 1
+            self.scores[v] = int(round(255*float(numSolved)/numSlots))
+        self.robot.setConfig(q0)
+
+    def score(self,target,base=None):
+        """Returns the reachability score in [0,1] of a world-space target,
+        which is either a point or an se3 transform.  base is the transform
+        of the robot's base link; by default its current transform is used.
+        Targets outside of the map have score 0."""
+        tlocal = self._toBase(target,base)
+        v = self.voxelIndex(tlocal[1] if len(tlocal) == 2 else tlocal)
+        if v < 0:
+            return 0.0
+        return self.scores[v]/255.0
+
+    def seed(self,target,base=None):
+        """Returns the IK seed stored for the given world-space target (a
+        point or se3 transform), or None if the map doesn't have one.  The
+        seed is a list of values of the DOFs in activeDofs."""
+        tlocal = self._toBase(target,base)
+        if len(tlocal) == 2:
+            R,p = tlocal
+        else:
+            R,p = None,tlocal
+        v = self.voxelIndex(p)
+        if v < 0:
+            return None
+        q = self._getSeed(v,self._rotationSlot(R))
+        if q is None and R is not None:
+            #fall back to any seed in the voxel
+            for slot in xrange(self._numSlots()):
+                q = self._getSeed(v,slot)
+                if q is not None:
+                    break
+        return q
+
+    def solve(self,target,iters=1000,tol=1e-3,activeDofs=None):
+        """Solves IK for the given world-space target (a point or se3
+        transform), warm-started from the map's seed.  Returns True if
+        successful, in which case the robot is set to the solution.  Returns
+        False immediately if the target is unreachable according to the map.
+        If activeDofs is None, only the map's activeDofs are moved.
+        """
+        q = self.seed(target)
+        if q is None:
+            return False
+        self._applySeed(q)
+        if activeDofs is None:
+            activeDofs = self.activeDofs
+        link = self.robot.link(self.link)
+        if len(target) == 2:
+            goal = ik.objective(link,R=target[0],t=self._linkOrigin(target))
+        else:
+            goal = ik.objective(link,local=self.localpt,world=target)
+        return ik.solve(goal,iters,tol,activeDofs)
+
+    def rankBases(self,target,bases):
+        """Inverse reachability: given a world-space target and a list of
+        candidate base link transforms, returns the list of (score,base)
+        pairs sorted by decreasing score."""
+        res = [(self.score(target,base),base) for base in bases]
+        return sorted(res,key=lambda x:-x[0])
+
+    def save(self,fn):
+        """Saves the map to a compact binary file"""
+        f = open(fn,'wb')
+        f.write(_MAGIC)
+        f.write(struct.pack('<iiii',_VERSION,self.link,self.numConfigs,len(self.rotations)))
+        f.write(struct.pack('<iii',*self.dims))
+        f.write(struct.pack('<7d',*(self.bmin+self.bmax+[self.resolution])))
+        f.write(struct.pack('<3d',*self.localpt))
+        f.write(struct.pack('<%di'%(self.numConfigs,),*self.activeDofs))
+        for R in self.rotations:
+            f.write(struct.pack('<9d',*R))
+        self.scores.tofile(f)
+        self.seeds.tofile(f)
+        f.close()
+
+    @staticmethod
+    def load(fn,robot):
+        """Loads a map saved with save() for the given robot"""
+        f = open(fn,'rb')
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise IOError("File "+fn+" is not a reachability map")
+        version,link,numConfigs,numRotations = struct.unpack('<iiii',f.read(16))
+        if version != _VERSION:
+            raise IOError("Unsupported reachability map version "+str(version))
+        if link >= robot.numLinks():
+            raise ValueError("Reachability map was built for a robot with more than "+str(robot.numLinks())+" links")
+        dims = struct.unpack('<iii',f.read(12))
+        vals = struct.unpack('<7d',f.read(56))
+        localpt = struct.unpack('<3d',f.read(24))
+        activeDofs = list(struct.unpack('<%di'%(numConfigs,),f.read(4*numConfigs)))
+        rotations = [list(struct.unpack('<9d',f.read(72))) for i in xrange(numRotations)]
+        res = ReachabilityMap(robot,link,localpt,vals[0:3],vals[3:6],vals[6],rotations)
+        if res.activeDofs != activeDofs:
+            raise ValueError("Reachability map was built for a robot with a different kinematic chain")
+        res.dims = list(dims)
+        n = res.numVoxels()
+        res.scores = array.array('B')
+        res.scores.fromfile(f,n)
+        res.seeds = array.array('f')
+        res.seeds.fromfile(f,n*res._numSlots()*numConfigs)
+        f.close()
+        return res
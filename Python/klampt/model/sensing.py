@@ -83,6 +83,105 @@ def set_sensor_xform(sensor,T,link=None):
 			sensor.setSetting("link",str(link))
 
 
+#number of measurements of each sensor seen so far, used to size the arrays
+#allocated by get_measurements_array
+_measurement_counts = {}
+
+def get_measurements_array(sensor,out=None):
+	"""Returns the measurements of a SimRobotSensor as a 1D float64 numpy array.
+	Unlike sensor.getMeasurements(), no Python float is created per measurement,
+	which makes a big difference for sensors with many measurements, like cameras.
+
+	If out is given, it must be a 1D float64 numpy array.  If it is large enough,
+	the measurements are copied into it and a view of its first n elements is
+	returned, so that the same array can be reused across frames.  Otherwise, a
+	new array is allocated.
+	"""
+	assert isinstance(sensor,SimRobotSensor),"Must provide a SimRobotSensor instance"
+	if not _try_numpy_import():
+		raise RuntimeError("get_measurements_array requires numpy")
+	key = (sensor.type(),sensor.name())
+	if out is None:
+		out = np.empty(_measurement_counts.get(key,0))
+	n = sensor.getMeasurementsBuffer(out)
+	if n > len(out):
+		out = np.empty(n)
+		sensor.getMeasurementsBuffer(out)
+	_measurement_counts[key] = n
+	return out[:n]
+
+class SensorBatch:
+	"""Reads the measurements of all the sensors of a SimRobotController at once,
+	as a single flat vector with a layout that is computed once, rather than
+	walking over controller.sensor(i) and calling getMeasurements() on each
+	sensor.
+
+	Attributes:
+	- controller: the SimRobotController
+	- sensors: the list of sensor names
+	- types: the list of sensor types
+	- measurementNames: for each sensor, the list of its measurement names
+	- offsets: the start index of each sensor's measurements in the flat
+	  vector.  offsets[-1] is the total number of measurements.
+
+	If the number of measurements changes, e.g., if a camera's resolution is
+	changed, the layout is recomputed on the next read().
+	"""
+	def __init__(self,controller):
+		self.controller = controller
+		self.updateLayout()
+
+	def updateLayout(self):
+		"""Recomputes the layout of the flat measurement vector"""
+		self.sensors = []
+		self.types = []
+		self.measurementNames = []
+		self.offsets = [0]
+		for i in xrange(self.controller.numSensors()):
+			s = self.controller.sensor(i)
+			names = s.measurementNames()
+			self.sensors.append(s.name())
+			self.types.append(s.type())
+			self.measurementNames.append(list(names))
+			self.offsets.append(self.offsets[-1]+len(names))
+
+	def size(self):
+		"""Returns the total number of measurements"""
+		return self.offsets[-1]
+
+	def names(self,prefix=''):
+		"""Returns a flat list of the names of all measurements, in the form
+		prefix+sensor+'['+measurement+']'."""
+		res = []
+		for sensor,names in zip(self.sensors,self.measurementNames):
+			res += [prefix+sensor+'['+name+']' for name in names]
+		return res
+
+	def read(self,out=None):
+		"""Returns the measurements of all sensors in one flat vector.  If out is
+		None, the result is a list.  Otherwise, out must be a float64 numpy
+		array of length at least size(), which is filled, and a view of its
+		first size() entries is returned."""
+		if out is None:
+			res = self.controller.getSensorMeasurements()
+			n = len(res)
+		else:
+			res = out
+			n = self.controller.getSensorMeasurementsBuffer(out)
+		if n != self.offsets[-1]:
+			self.updateLayout()
+			if out is not None and n > len(out):
+				raise ValueError("Output array is too small, need "+str(n)+" entries")
+		if out is not None and n < len(out):
+			#don't return stale entries from a previous, longer read
+			return res[:n]
+		return res
+
+	def split(self,values):
+		"""Given a flat vector returned by read(), returns a dictionary mapping
+		each sensor name to its measurements."""
+		return dict((name,values[a:b]) for (name,a,b) in zip(self.sensors,self.offsets[:-1],self.offsets[1:]))
+
 def camera_to_images(camera,image_format='numpy',color_format='channels'):
 	"""Given a SimRobotSensor that is a CameraSensor, returns either the RGB image, the depth image, or both.
 
@@ -104,21 +203,27 @@ def camera_to_images(camera,image_format='numpy',color_format='channels'):
 	h = int(camera.getSetting('yres'))
 	has_rgb = int(camera.getSetting('rgb'))
 	has_depth = int(camera.getSetting('depth'))
-	measurements = camera.getMeasurements()
 	if image_format == 'numpy':
 		if not _try_numpy_import():
 			image_format = 'native'
+	if image_format == 'numpy':
+		measurements = get_measurements_array(camera)
+	else:
+		measurements = camera.getMeasurements()
 	rgb = None
 	depth = None
 	if has_rgb:
 		if image_format == 'numpy':
-			abgr = np.array(measurements[0:w*h]).reshape(h,w).astype(np.uint32)
+			abgr = measurements[0:w*h].reshape(h,w).astype(np.uint32)
 			if color_format == 'bgr':
 				rgb = abgr
 			elif color_format == 'rgb':
 				rgb = np.bitwise_or(np.bitwise_or(np.left_shift(np.bitwise_and(abgr,0x00000ff),16),
 										np.bitwise_and(abgr,0x000ff00)),
 										np.right_shift(np.bitwise_and(abgr,0x0ff0000), 16))
+			elif sys.byteorder == 'little':
+				#the bytes of each pixel are R,G,B,X in memory
+				rgb = abgr.view(np.uint8).reshape(h,w,4)[:,:,0:3].copy()
 			else:
 				rgb = np.zeros((h,w,3),dtype=np.uint8)
 				rgb[:,:,0] =                np.bitwise_and(abgr,0x00000ff)
@@ -147,7 +252,7 @@ def camera_to_images(camera,image_format='numpy',color_format='channels'):
 	if has_depth:
 		start = (w*h if has_rgb else 0)
 		if image_format == 'numpy':
-			depth = np.array(measurements[start:start+w*h]).reshape(h,w)
+			depth = measurements[start:start+w*h].reshape(h,w)
 		else:
 			depth = []
 			for i in xrange(h):
@@ -160,6 +265,80 @@ def camera_to_images(camera,image_format='numpy',color_format='channels'):
 		return depth
 	return None
 
+#per-pixel ray tables computed by _camera_rays, keyed by the intrinsics that
+#they depend on
+_camera_ray_cache = {}
+
+def _camera_rays(w,h,xfov):
+	"""Returns a read-only (h*w)x3 numpy array whose row i*w+j is the viewing
+	ray (x,y,1) of pixel (i,j), scaled so that multiplying by the pixel's depth
+	gives the point in camera coordinates.  The tables are cached, so they are
+	only computed again when the camera resolution or field of view changes."""
+	key = (w,h,xfov)
+	rays = _camera_ray_cache.get(key,None)
+	if rays is not None:
+		return rays
+	xshift = -w*0.5
+	yshift = -h*0.5
+	xscale = math.tan(xfov*0.5)/(w*0.5)
+	#yscale = -1.0/(math.tan(yfov*0.5)*h/2)
+	yscale = xscale #square pixels are assumed
+	rays = np.empty((h,w,3))
+	rays[:,:,0] = ((np.arange(w)+xshift)*xscale)[np.newaxis,:]
+	rays[:,:,1] = ((np.arange(h)+yshift)*yscale)[:,np.newaxis]
+	rays[:,:,2] = 1.0
+	rays = rays.reshape((h*w,3))
+	rays.flags.writeable = False
+	if len(_camera_ray_cache) >= 8:
+		_camera_ray_cache.clear()
+	_camera_ray_cache[key] = rays
+	return rays
+
+def _camera_to_points_numpy(camera,all_points,color_format,T=None):
+	"""Implements camera_to_points for numpy arrays, returning the points
+	and the updated color format.  If T is given, the points are transformed
+	by the se3 element T."""
+	images = camera_to_images(camera,'numpy',color_format)
+	assert images != None
+
+	rgb,depth = None,None
+	if int(camera.getSetting('rgb'))==0:
+		depth = images
+		color_format = None
+	else:
+		rgb,depth = images
+
+	w = int(camera.getSetting('xres'))
+	h = int(camera.getSetting('yres'))
+	xfov = float(camera.getSetting('xfov'))
+	zmax = float(camera.getSetting('zmax'))
+	rays = _camera_rays(w,h,xfov)
+	depth = depth.reshape(w*h)
+	if all_points:
+		depth[depth >= zmax] = 0
+		xyz = rays*depth[:,np.newaxis]
+	else:
+		valid = depth < zmax
+		xyz = rays[valid]
+		xyz *= depth[valid][:,np.newaxis]
+	if T is not None:
+		#move to world coordinates in a single matrix multiply
+		xyz = np.dot(xyz,np.array(so3.matrix(T[0])).T)
+		xyz += T[1]
+	if color_format is None:
+		return xyz,color_format
+	rgb = rgb.reshape((w*h,-1))
+	if not all_points:
+		rgb = rgb[valid]
+	pts = np.empty((xyz.shape[0],3+rgb.shape[1]))
+	pts[:,0:3] = xyz
+	if color_format is 'channels':
+		#scale to range [0,1]
+		np.multiply(rgb,1.0/255.0,out=pts[:,3:])
+	else:
+		pts[:,3:] = rgb
+	return pts,color_format
+
 def camera_to_points(camera,points_format='numpy',all_points=False,color_format='channels'):
 	"""Given a SimRobotSensor that is a CameraSensor, returns a point cloud associated with the current measurements.
 	Points are triangulated with respect to the camera's intrinsic coordinates, and are returned in the camera local frame
@@ -190,52 +369,10 @@ def camera_to_points(camera,points_format='numpy',all_points=False,color_format=
 	if points_format == 'numpy' and not has_numpy:
 		points_format = 'native'
 
-	images = camera_to_images(camera,'numpy',color_format)
-	assert images != None
-
-	rgb,depth = None,None
-	if int(camera.getSetting('rgb'))==0:
-		depth = images
-		color_format = None
-	else:
-		rgb,depth = images
-
 	w = int(camera.getSetting('xres'))
 	h = int(camera.getSetting('yres'))
-	xfov = float(camera.getSetting('xfov'))
-	yfov = float(camera.getSetting('yfov'))
-	zmin = float(camera.getSetting('zmin'))
-	zmax = float(camera.getSetting('zmax'))
-	xshift = -w*0.5
-	yshift = -h*0.5
-	xscale = math.tan(xfov*0.5)/(w*0.5)
-	#yscale = -1.0/(math.tan(yfov*0.5)*h/2)
-	yscale = xscale #square pixels are assumed
-	xs = [(j+xshift)*xscale for j in range(w)]
-	ys = [(i+yshift)*yscale for i in range(h)]
 	if has_numpy:
-		if all_points:
-			depth[depth >= zmax] = 0
-		if color_format is 'channels':
-			#scale to range [0,1]
-			rgb = rgb*(1.0/255.0)
-		xgrid = np.repeat(np.array(xs).reshape((1,w)),h,0)
-		ygrid = np.repeat(np.array(ys).reshape((h,1)),w,1)
-		assert xgrid.shape == (h,w)
-		assert ygrid.shape == (h,w)
-		pts = np.dstack((np.multiply(xgrid,depth),np.multiply(ygrid,depth),depth))
-		assert pts.shape == (h,w,3)
-		if color_format is not None:
-			if len(rgb.shape) == 2:
-				rgb = rgb.reshape(rgb.shape[0],rgb.shape[1],1)
-			pts = np.concatenate((pts,rgb),2)
-		#now have a nice array containing all points, shaped h x w x (3+c)
-		#extract out the valid points from this array
-		if all_points:
-			pts = pts.reshape(w*h,pts.shape[2])
-		else:
-			pts = pts[depth < zmax]
-
+		pts,color_format = _camera_to_points_numpy(camera,all_points,color_format)
 		if points_format == 'native':
 			return pts.tolist()
 		elif points_format == 'numpy':
@@ -270,22 +407,22 @@ def camera_to_points(camera,points_format='numpy',all_points=False,color_format=
 
 def camera_to_points_world(camera,robot,points_format='numpy',color_format='channels'):
 	"""Same as camera_to_points, but converts to the world coordinate system given the robot
-	to which the camera is attached.  Points that have no reading are stripped out. """
+	to which the camera is attached.  Points that have no reading are stripped out.
+
+	For numpy output, the transform is applied to the triangulated points in a single
+	matrix multiply."""
 	assert isinstance(camera,SimRobotSensor),"Must provide a SimRobotSensor instance"
 	assert camera.type() == 'CameraSensor',"Must provide a camera sensor instance"
-	link = int(camera.getSetting('link'))
-	Tsensor = camera.getSetting('Tsensor')
-	#first 9: row major rotation matrix, last 3: translation
-	entries = [float(v) for v in Tsensor.split()]
 	Tworld = get_sensor_xform(camera,robot)
+	if points_format in ['numpy','native'] and _try_numpy_import():
+		assert int(camera.getSetting('depth'))==1,"Camera sensor must have a depth channel"
+		pts,color_format = _camera_to_points_numpy(camera,False,color_format,Tworld)
+		if points_format == 'native':
+			return pts.tolist()
+		return pts
 	#now get the points
 	pts = camera_to_points(camera,points_format,all_points=False,color_format=color_format)
-	if points_format == 'numpy':
-		Rw = np.array(so3.matrix(Tworld[0]))
-		tw = np.array(Tworld[1])
-		pts[:,0:3] = np.dot(pts[:,0:3],Rw.T) + tw
-		return pts
-	elif points_format == 'native':
+	if points_format == 'native':
 		for p in pts:
 			p[0:3] = se3.apply(Tworld,p[0:3])
 		return pts
@@ -2981,6 +2981,16 @@ class WorldModel(_object):
         """
         return _robotsim.WorldModel_enableInitCollisions(self, *args)
 
+    def setNumLoadingThreads(self, *args):
+        """
+        setNumLoadingThreads(WorldModel self, int numThreads)
+
+        Sets the number of threads used to read the geometry files of rigid
+        objects and terrains when a world XML file is read (default 1). Robot
+        geometries are read serially.
+        """
+        return _robotsim.WorldModel_setNumLoadingThreads(self, *args)
+
     __swig_setmethods__["index"] = _robotsim.WorldModel_index_set
     __swig_getmethods__["index"] = _robotsim.WorldModel_index_get
     if _newclass:index = _swig_property(_robotsim.WorldModel_index_get, _robotsim.WorldModel_index_set)
@@ -3753,6 +3763,21 @@ class SimRobotSensor(_object):
         """
         return _robotsim.SimRobotSensor_getMeasurements(self)
 
+    def getMeasurementsBuffer(self, *args):
+        """
+        getMeasurementsBuffer(SimRobotSensor self, PyObject * buffer) -> int
+
+        Copies the measurements from the previous simulation (or
+        kinematicSimulate) timestep into buffer, which must be a writable,
+        contiguous buffer of doubles (e.g., a float64 numpy array). Unlike
+        getMeasurements, no Python object is created per measurement. At most
+        len(buffer) values are written.
+
+        Returns the number of measurements. If this is larger than len(buffer),
+        call again with a larger buffer.
+        """
+        return _robotsim.SimRobotSensor_getMeasurementsBuffer(self, *args)
+
     def getSetting(self, *args):
         """
         getSetting(SimRobotSensor self, std::string const & name) -> std::string
@@ -3924,6 +3949,37 @@ class SimRobotController(_object):
         """
         return _robotsim.SimRobotController_sensor(self, *args)
 
+    def numSensors(self):
+        """
+        numSensors(SimRobotController self) -> int
+
+        Returns the number of sensors.
+        """
+        return _robotsim.SimRobotController_numSensors(self)
+
+    def getSensorMeasurements(self):
+        """
+        getSensorMeasurements(SimRobotController self)
+
+        Returns the measurements of all sensors, concatenated in sensor order,
+        in a single call. The measurements of sensor i start at the sum of the
+        numbers of measurements of sensors 0,...,i-1.
+        """
+        return _robotsim.SimRobotController_getSensorMeasurements(self)
+
+    def getSensorMeasurementsBuffer(self, *args):
+        """
+        getSensorMeasurementsBuffer(SimRobotController self, PyObject * buffer) -> int
+
+        Same as getSensorMeasurements, but copies the measurements into
+        buffer, which must be a writable, contiguous buffer of doubles (e.g., a
+        float64 numpy array). At most len(buffer) values are written.
+
+        Returns the total number of measurements. If this is larger than
+        len(buffer), call again with a larger buffer.
+        """
+        return _robotsim.SimRobotController_getSensorMeasurementsBuffer(self, *args)
+
     def commands(self):
         """
         commands(SimRobotController self) -> stringVector
@@ -4598,6 +4654,20 @@ class Simulator(_object):
         """
         return _robotsim.Simulator_meanContactForce(self, *args)
 
+    def getActiveContacts(self):
+        """
+        getActiveContacts(Simulator self)
+
+        Returns all pairs of objects with contact feedback enabled that had
+        contact over the last simulate() call, in a single call.  Each pair is
+        given as a list [aid,bid,fx,fy,fz,mx,my,mz,n,c1,...,cn] with aid < bid,
+        where (fx,fy,fz) and (mx,my,mz) are the values of contactForce(aid,bid)
+        and contactTorque(aid,bid), n is the number of contacts at the last
+        time step, and each contact ci is a 10-element block
+        (x,n,kFriction,f) as returned by getContacts and getContactForces.
+        """
+        return _robotsim.Simulator_getActiveContacts(self)
+
     def controller(self, *args):
         """
         controller(Simulator self, int robot) -> SimRobotController
@@ -72,21 +72,7 @@ def doSim(world,duration,initialCondition,
     - 'wall_clock_time', which gives the time elapsed while computing the simulation, in s
     """
     if returnItems == None:
-        #set up default return items
-        returnItems = []
-        for i in range(world.numRigidObjects()):
-            returnItems.append('rigidObjects['+str(i)+'].transform')
-            returnItems.append('rigidObjects['+str(i)+'].velocity')
-        for i in range(world.numRobots()):
-            returnItems.append('time')
-            returnItems.append('controllers['+str(i)+'].commandedConfig')
-            returnItems.append('controllers['+str(i)+'].commandedVelocity')
-            returnItems.append('controllers['+str(i)+'].sensedConfig')
-            returnItems.append('controllers['+str(i)+'].sensedVelocity')
-            returnItems.append('controllers['+str(i)+'].sensors')
-            returnItems.append('robots['+str(i)+'].actualConfig')
-            returnItems.append('robots['+str(i)+'].actualVelocity')
-            returnItems.append('robots['+str(i)+'].actualTorques')
+        returnItems = _defaultReturnItems(world)
     initCond = getWorldSimState(world)
     args = ()
     for k,v in initialCondition.iteritems():
@@ -97,13 +83,48 @@ def doSim(world,duration,initialCondition,
     sim = SimpleSimulator(world)
     if simInit: simInit(sim,*args)
     assert simDt > 0,"Time step must be positive"
+    print "klampt.batch.doSim(): Running simulation for",duration,"s"
+    t0 = time.time()
+    res,t = _runSim(sim,duration,returnItems,trace,simDt,simStep,simTerm,args)
+    if t < duration:
+        print "  Termination condition reached at",t,"s"
+    else:
+        print "  Done."
+    print "  Computation time:",time.time()-t0
+    #restore initial world state
+    setWorldSimState(world,initCond)
+    return res
+
+def _defaultReturnItems(world):
+    """Returns everything that is variable in the simulator (simulation time,
+    robot and rigid object configuration / velocity, robot commands, robot
+    sensors)."""
+    returnItems = []
+    for i in range(world.numRigidObjects()):
+        returnItems.append('rigidObjects['+str(i)+'].transform')
+        returnItems.append('rigidObjects['+str(i)+'].velocity')
+    for i in range(world.numRobots()):
+        returnItems.append('time')
+        returnItems.append('controllers['+str(i)+'].commandedConfig')
+        returnItems.append('controllers['+str(i)+'].commandedVelocity')
+        returnItems.append('controllers['+str(i)+'].sensedConfig')
+        returnItems.append('controllers['+str(i)+'].sensedVelocity')
+        returnItems.append('controllers['+str(i)+'].sensors')
+        returnItems.append('robots['+str(i)+'].actualConfig')
+        returnItems.append('robots['+str(i)+'].actualVelocity')
+        returnItems.append('robots['+str(i)+'].actualTorques')
+    return returnItems
+
+def _runSim(sim,duration,returnItems,trace,simDt,simStep,simTerm,args):
+    """The inner loop of doSim() and SimRollout.rollout(). Returns a pair
+    (res,t) giving the result dict and the time at which the simulation
+    terminated."""
+    t0 = time.time()
     res = dict()
     if trace:
         for k in returnItems:
             res[k] = [map.get_item(sim,k)]
         res['status'] = [sim.getStatusString()]
-    print "klampt.batch.doSim(): Running simulation for",duration,"s"
-    t0 = time.time()
     t = 0
     worst_status = 0
     while t < duration:
@@ -114,11 +135,7 @@ def doSim(world,duration,initialCondition,
                 res['status']=sim.getStatusString(worst_status)
                 res['time']=t
                 res['wall_clock_time']=time.time()-t0
-            #restore initial world state
-            setWorldSimState(world,initCond)
-            print "  Termination condition reached at",t,"s"
-            print "  Computation time:",time.time()-t0
-            return res
+            return res,t
         if simStep: simStep(sim,*args)
         sim.simulate(simDt)
         worst_status = max(worst_status,sim.getStatus())
@@ -136,12 +153,69 @@ def doSim(world,duration,initialCondition,
         res['status']=sim.getStatusString(worst_status)
         res['time']=t
         res['wall_clock_time']=time.time()-t0
+    return res,t
 
-    print "  Done."
-    print "  Computation time:",time.time()-t0
-    #restore initial world state
-    setWorldSimState(world,initCond)
-    return res
+
+class SimRollout:
+    """Runs many short simulation rollouts from a common starting state, as
+    needed by sampling-based controllers (e.g., MPC, CEM).  Unlike doSim(),
+    the simulator is created only once, and each rollout starts by restoring
+    an in-memory snapshot taken with Simulator.getState().
+
+    Example:
+        rollouts = SimRollout(world)
+        for u in candidate_controls:
+            res = rollouts.rollout(0.5,simStep=lambda sim:apply(sim,u))
+    """
+    def __init__(self,world,simInit=None,args=()):
+        """Arguments:
+        - world: the world.  Its current state is the initial state of the
+          rollouts.
+        - simInit (optional): a function f(sim,*args) called once on the
+          simulator before the initial snapshot is taken.
+        - args (optional): a tuple passed to simInit.
+        """
+        self.world = world
+        self.sim = SimpleSimulator(world)
+        if simInit: simInit(self.sim,*args)
+        self.initialState = self.sim.getState()
+
+    def saveState(self):
+        """Returns an in-memory snapshot of the current simulation state"""
+        return self.sim.getState()
+
+    def restoreState(self,state=None):
+        """Restores the simulation to a snapshot from saveState(), or to the
+        initial state if state is None."""
+        if state is None:
+            state = self.initialState
+        self.sim.setState(state)
+        self.sim.updateWorld()
+        #clear SimpleSimulator's bookkeeping from the previous rollout
+        self.sim.robotStates = {}
+        self.sim.objectStates = {}
+        self.sim.worst_status = Simulator.STATUS_NORMAL
+
+    def rollout(self,duration,returnItems=None,trace=False,state=None,
+                simDt=0.01,simStep=None,simTerm=None,args=()):
+        """Resets the simulator to state (default: the initial state) and
+        simulates for the given duration.  The arguments and return value
+        are the same as doSim(), except that the initial condition is given
+        as a snapshot from saveState() and args is given directly.
+        """
+        if returnItems == None:
+            returnItems = _defaultReturnItems(self.world)
+        assert simDt > 0,"Time step must be positive"
+        self.restoreState(state)
+        res,t = _runSim(self.sim,duration,returnItems,trace,simDt,simStep,simTerm,args)
+        return res
+
+    def rollouts(self,duration,simSteps,returnItems=None,trace=False,state=None,
+                 simDt=0.01,simTerm=None,args=()):
+        """Runs one rollout for each of the step functions in simSteps, all
+        starting from the same state.  Returns a list of rollout() results.
+        """
+        return [self.rollout(duration,returnItems,trace,state,simDt,simStep,simTerm,args) for simStep in simSteps]
 
 def batchSim(world,duration,initialConditions,returnItems,
           simDt=0.01,simInit=None,simStep=None,simTerm=None):
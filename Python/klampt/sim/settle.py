@@ -272,6 +272,149 @@ def settle(world,obj,
 		tdict[id] = [ContactPoint(ci[0:3],ci[3:6],ci[6]) for ci in cplist]
 	return (body.getObjectTransform(),tdict)
 
+def settle_many(world,objects=None,
+	forcedir=(0,0,-1),
+	settletol=1e-3,maxtime=10.0,dt=0.01,
+	debug=False):
+	"""Settles many rigid objects at once by simulating them together under
+	a uniform acceleration in the direction forcedir.  Each object is checked
+	for rest individually, and once it touches another body and comes to rest
+	it is frozen in place
+	(its dynamics are disabled) so the remaining objects are simulated more
+	cheaply and settle on top of it.  Robots and terrains are static.
+
+	Arguments:
+	- world: a WorldModel containing the objects.  It is not modified.
+	- objects: a list of rigid object indices or RigidObjectModels to settle.
+	  If None, settles all rigid objects in the world.  Other rigid objects
+	  are frozen from the start.
+	- forcedir: the acceleration applied to the objects, in m/s^2.
+	- settletol: an object is at rest when it is in contact and its linear
+	  and angular speeds lie below this tolerance on two subsequent steps.
+	- maxtime: the maximum simulation time, in s.
+	- dt: the simulation time step.
+	- debug: if True, uses the visualization to debug the settling process
+
+	Return value: (transforms,settled)
+	- transforms: a list of the resulting se3 transforms of the objects.
+	- settled: a list of bools indicating whether each object came to rest
+	  before maxtime.
+	"""
+	assert isinstance(world,WorldModel)
+	if objects is None:
+		objects = range(world.numRigidObjects())
+	indices = []
+	for o in objects:
+		if isinstance(o,RigidObjectModel):
+			if world.index != o.world:
+				raise ValueError("Object is not present in the given world")
+			indices.append(o.index)
+		elif isinstance(o,int):
+			assert o >= 0 and o < world.numRigidObjects(),"Object "+str(o)+" does not exist in world"
+			indices.append(o)
+		else:
+			raise ValueError("Invalid object type given, only supports rigid object indices and RigidObjectModels")
+	world = world.copy()
+	sim = Simulator(world)
+	sim.setGravity(forcedir)
+	sim.setSimStep(dt)
+	bodies = [sim.body(world.rigidObject(i)) for i in indices]
+	ids = [world.rigidObject(i).getID() for i in indices]
+	sim.enableContactFeedbackAll()
+	#enableContactFeedbackAll doesn't cover object-object pairs, which are
+	#needed to detect objects resting on one another
+	for i in indices:
+		for j in xrange(world.numRigidObjects()):
+			if j != i:
+				sim.enableContactFeedback(world.rigidObject(i).getID(),world.rigidObject(j).getID())
+	for i in xrange(world.numRigidObjects()):
+		if i not in indices:
+			sim.body(world.rigidObject(i)).enableDynamics(False)
+	#turn off all restitution
+	for b in bodies:
+		s = b.getSurface()
+		s.kRestitution = 0
+		b.setSurface(s)
+		b.setVelocity([0.0]*3,[0.0]*3)
+	if debug:
+		vis.add("world",world)
+		vis.show()
+	active = range(len(bodies))
+	numSettled = [0]*len(bodies)
+	t = 0
+	while t < maxtime and len(active) > 0:
+		if debug:
+			vis.lock()
+			sim.simulate(dt)
+			sim.updateWorld()
+			vis.unlock()
+			time.sleep(0)
+		else:
+			sim.simulate(dt)
+		touching = set()
+		for row in sim.getActiveContacts():
+			touching.add(int(row[0]))
+			touching.add(int(row[1]))
+		stillActive = []
+		for i in active:
+			b = bodies[i]
+			w,v = b.getVelocity()
+			#objects released from rest move slowly at first, so an object
+			#must be touching something before it can be frozen
+			if ids[i] in touching and vectorops.norm(w) < settletol and vectorops.norm(v) < settletol:
+				numSettled[i] += 1
+			else:
+				numSettled[i] = 0
+			if numSettled[i] >= 2:
+				#freeze the settled object in place
+				b.setVelocity([0.0]*3,[0.0]*3)
+				b.enableDynamics(False)
+				continue
+			#apply drag
+			b.setVelocity(vectorops.mul(w,0.8),vectorops.mul(v,0.8))
+			stillActive.append(i)
+		active = stillActive
+		t += dt
+	if len(active) > 0:
+		print "sim.settle_many():",len(active),"objects failed to settle by time",t
+	else:
+		print "sim.settle_many(): Settled at time",t
+	settled = [True]*len(bodies)
+	for i in active:
+		settled[i] = False
+	return ([b.getObjectTransform() for b in bodies],settled)
+
+def _settle_many_worker(args):
+	makeWorld,arg,objects,kwargs = args
+	world = makeWorld(arg)
+	return settle_many(world,objects,**kwargs)
+
+def settle_many_parallel(makeWorld,args,objects=None,processes=None,**kwargs):
+	"""Generates and settles independent scenes in a pool of worker
+	processes, e.g., for generating randomized bin-picking scenes.
+
+	Arguments:
+	- makeWorld: a function makeWorld(arg) returning a WorldModel.  It must
+	  be picklable, i.e., defined at the top level of a module.
+	- args: a list of arguments to makeWorld, one per scene (e.g., random
+	  seeds).
+	- objects: a list of rigid object indices to settle in each world, or
+	  None to settle all rigid objects.
+	- processes: the number of worker processes.  If None, uses the number
+	  of CPUs.
+	- kwargs: other keyword arguments passed to settle_many.
+
+	Returns a list of settle_many() results, one per scene.
+	"""
+	import multiprocessing
+	pool = multiprocessing.Pool(processes)
+	try:
+		res = pool.map(_settle_many_worker,[(makeWorld,arg,objects,kwargs) for arg in args])
+	finally:
+		pool.close()
+		pool.join()
+	return res
+
 def _bboverlap(bb,element):
 	if isinstance(element,RobotModel):
 		return any(_bboverlap(bb,element.link(i)) for i in xrange(element.numLinks()))
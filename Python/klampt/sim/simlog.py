@@ -1,4 +1,5 @@
 from ..math import vectorops,so3,se3
+from ..model.sensing import SensorBatch
 
 
 class SimLogger:
@@ -16,6 +17,7 @@ class SimLogger:
         - saveheader: true if you want a CSV header giving the name of each value
         """
         self.saveSensors = False
+        self.sensorBatches = {}
         self.sim = sim
         self.fn = state_fn
         self.f = None
@@ -41,6 +43,8 @@ class SimLogger:
                     raise NotImplementedError("Lookup id from entity name")
                 else:
                     raise ValueError("Invalid object given in the colliding list")
+        #maps each id in colliding to its position, for filtering contacts
+        self.collidingOrder = dict((id,i) for i,id in reversed(list(enumerate(self.colliding))))
         if saveheader:
             #need to call simulate to get proper sensor readings...
             self.sim.simulate(0)
@@ -70,15 +74,7 @@ class SimLogger:
             for j in xrange(world.robot(i).numDrivers()):
                 elements.append(n+'_t['+str(j)+']')
             if self.saveSensors:
-                j = 0
-                while True:
-                    s = self.sim.controller(i).sensor(j)
-                    if len(s.name())==0:
-                        break
-                    names = s.measurementNames()
-                    for sn in range(len(names)):
-                        elements.append(n+'_'+s.name()+'['+names[sn]+']')
-                    j += 1
+                elements += self._sensorBatch(i).names(n+'_')
         for i in xrange(world.numRigidObjects()):
             n = world.rigidObject(i).getName()
             elements += [n+'_'+suffix for suffix in ['comx','comy','comz','x','y','z','rx','ry','rz','dx','dy','dz','wx','wy','wz']]
@@ -88,6 +84,12 @@ class SimLogger:
         self.f.write('\n')
         return
 
+    def _sensorBatch(self,robotIndex):
+        """Returns the SensorBatch for the given robot's controller"""
+        if robotIndex not in self.sensorBatches:
+            self.sensorBatches[robotIndex] = SensorBatch(self.sim.controller(robotIndex))
+        return self.sensorBatches[robotIndex]
+
     def saveContactHeader(self):
         if self.f_contact is None:
             print "SimLogger: No contact file specified"
@@ -119,15 +121,7 @@ class SimLogger:
             assert len(sim.getActualTorques(i)) == world.robot(i).numDrivers()
             values += sim.getActualTorques(i)
             if self.saveSensors:
-                j = 0
-                while True:
-                    s = self.sim.controller(i).sensor(j)
-                    if len(s.name())==0:
-                        break
-                    meas = s.getMeasurements()
-                    assert len(meas) == len(s.measurementNames())
-                    values += meas
-                    j += 1
+                values += self._sensorBatch(i).read()
         for i in xrange(world.numRigidObjects()):
             obj = world.rigidObject(i)
             T = obj.getTransform()
@@ -138,30 +132,40 @@ class SimLogger:
             values += sim.body(obj).getVelocity()[0]
         
         if self.f_contact:
-            for i,id in enumerate(self.colliding):
-                for j in range(i+1,len(self.colliding)):
-                    id2 = self.colliding[j]
-                    if sim.hadContact(id,id2):
-                        clist = sim.getContacts(id,id2);
-                        f = sim.contactForce(id,id2)
-                        m = sim.contactTorque(id,id2)
-                        pavg = [0.0]*3
-                        navg = [0.0]*3
-                        for c in clist:
-                            pavg = vectorops.add(pavg,c[0:3])
-                            navg = vectorops.add(navg,c[3:6])
-                        if len(clist) > 0:
-                            pavg = vectorops.div(pavg,len(clist))
-                            navg = vectorops.div(navg,len(clist))
-                        body1 = world.getName(id)
-                        body2 = world.getName(id2)
-                        cvalues = [sim.getTime(),body1,body2,len(clist)]
-                        cvalues += pavg
-                        cvalues += navg
-                        cvalues += f
-                        cvalues += m
-                        self.f_contact.write(','.join(str(v) for v in cvalues))
-                        self.f_contact.write('\n')
+            t = sim.getTime()
+            rows = []
+            for row in sim.getActiveContacts():
+                id,id2 = int(row[0]),int(row[1])
+                if id not in self.collidingOrder or id2 not in self.collidingOrder:
+                    continue
+                n = int(row[8])
+                f = row[2:5]
+                m = row[5:8]
+                pavg = [0.0]*3
+                navg = [0.0]*3
+                for k in xrange(9,len(row),10):
+                    pavg = vectorops.add(pavg,row[k:k+3])
+                    navg = vectorops.add(navg,row[k+3:k+6])
+                if n > 0:
+                    pavg = vectorops.div(pavg,n)
+                    navg = vectorops.div(navg,n)
+                if self.collidingOrder[id2] < self.collidingOrder[id]:
+                    #write the pair in the order of the colliding list, with
+                    #normals pointing into the first body
+                    id,id2 = id2,id
+                    navg = vectorops.mul(navg,-1)
+                body1 = world.getName(id)
+                body2 = world.getName(id2)
+                cvalues = [t,body1,body2,n]
+                cvalues += pavg
+                cvalues += navg
+                cvalues += f
+                cvalues += m
+                rows.append(((self.collidingOrder[id],self.collidingOrder[id2]),cvalues))
+            #keep the pairwise order of the colliding list
+            for (order,cvalues) in sorted(rows):
+                self.f_contact.write(','.join(str(v) for v in cvalues))
+                self.f_contact.write('\n')
         if extra:
             values += extra
         if not (self.f is None):
@@ -1,4 +1,5 @@
 from ..robotsim import *
+from ..model.sensing import SensorBatch
 import simlog
 import weakref
 
@@ -24,19 +25,16 @@ class DefaultSensorEmulator(SensorEmulator):
     def __init__(self,sim,controller):
         self.sim = sim
         self.controller = controller
+        self.sensors = None
     def update(self):
         measurements = {}
         mode = self.controller.getControlType()
         if mode == "PID":
             measurements['qcmd'] = self.controller.getCommandedConfig()
             measurements['dqcmd'] = self.controller.getCommandedVelocity()
-        k = 0
-        while True:
-            s = self.controller.sensor(k)
-            if s.type()=='':
-                break;
-            measurements[s.name()] = s.getMeasurements()
-            k+=1
+        if self.sensors is None:
+            self.sensors = SensorBatch(self.controller)
+        measurements.update(self.sensors.split(self.sensors.read()))
         return measurements
     def drawGL(self):
         if self.controller.getControlType() == "PID":
@@ -137,7 +135,12 @@ class SimpleSimulator (Simulator):
         self.sensorEmulators = [[DefaultSensorEmulator(weakref.proxy(self),self.controller(i))] for i in range(world.numRobots())]
         self.actuatorEmulators = [[DefaultActuatorEmulator(weakref.proxy(self),self.controller(i))] for i in range(world.numRobots())]
         self.hooks = []
+        #each entry is a pair (args,slots) where args is the list of arguments
+        #resolved at addHook time and slots is a list of (index,name) pairs
+        #giving the 'time' / 'dt' arguments to fill in at every substep
         self.hook_args = []
+        #these are functions f(t,dt) called once every substep
+        self.batch_hooks = []
         #the rate of applying simulation substeps.  Hooks and actuator emulators are
         #called at this rate.  Note: this should be set at least as large as the simulation time step
         self.substep_dt = 0.001
@@ -149,9 +152,17 @@ class SimpleSimulator (Simulator):
         self.log_state_fn="simulation_state.csv"
         self.log_contact_fn="simulation_contact.csv"
 
-        #save state so controllers don't rely on world state
-        self.robotStates = []
-        self.objectStates = []
+        #save state so controllers don't rely on world state.  Only the items
+        #returned by isolatedRobots() and isolatedObjects() are saved, as
+        #dicts mapping item indices to their states
+        self.robotStates = {}
+        self.objectStates = {}
+        #which rigid objects are read by the controllers: True for all
+        #objects, False for none, or a list of rigid object indices.  The
+        #default, True, keeps the original behavior of syncing every object
+        #whenever a robot is isolated.  Set this to the objects that your
+        #controllers actually read (or False) to skip syncing the others.
+        self.isolateObjects = True
 
     def getStatus(self):
         return self.worst_status
@@ -210,25 +221,57 @@ class SimpleSimulator (Simulator):
         else:
             raise ValueError("Invalid emulator type")
 
+    def isolatedRobots(self):
+        """Returns the indices of the robots whose world state is saved and
+        restored around the control loop.  These are the robots that have a
+        controller or non-default emulators; the others never read the world
+        model during control_loop."""
+        res = []
+        for i in xrange(self.world.numRobots()):
+            if i < len(self.robotControllers) and self.robotControllers[i] is not None:
+                res.append(i)
+            elif len(self.sensorEmulators[i]) > 1 or len(self.actuatorEmulators[i]) > 1:
+                res.append(i)
+        return res
+
+    def isolatedObjects(self,robots=None):
+        """Returns the indices of the rigid objects whose world state is
+        saved and restored around the control loop, according to the
+        isolateObjects attribute.  If no robot is isolated (robots is empty)
+        the controllers can't read any object so [] is returned.
+        """
+        if robots is None:
+            robots = self.isolatedRobots()
+        if len(robots) == 0 or self.isolateObjects is False:
+            return []
+        if self.isolateObjects is True:
+            return range(self.world.numRigidObjects())
+        return self.isolateObjects
+
     def addHook(self,objects,function):
         """For the world object or objects 'objects', applies a hook that gets called every
         simulation loop.  The objects may be certain identifiers, WorldModel items or SimBodies. 
-        - Accepted names are: 'time', or any items in the world
+        - Accepted names are: 'time', 'dt', or any items in the world
         - If they are individual bodies, the corresponding SimBody objects are passed to function. 
         - If they are RobotModel's, the corresponding SimRobotController objects are passed to function.
         - Otherwise they are passed directly to function.
+
+        Arguments are resolved once, here, so that only 'time' and 'dt' need
+        to be filled in on each substep.
         """
         if not hasattr(objects,'__iter__'):
             objects = [objects]
         args = []
+        slots = []
         for o in objects:
             if isinstance(o,(RobotModelLink,RigidObjectModel,TerrainModel)):
                 args.append(self.body(o))
             elif isinstance(o,RobotModel):
                 args.append(self.controller(o))
             elif isinstance(o,str):
-                if o == 'time':
-                    args.append(o)
+                if o == 'time' or o == 'dt':
+                    slots.append((len(args),o))
+                    args.append(None)
                 elif self.world.robot(o).world >= 0:
                     args.append(self.world.robot(o))
                 elif self.world.terrain(o).world >= 0:
@@ -240,7 +283,36 @@ class SimpleSimulator (Simulator):
             else:
                 args.append(o)
         self.hooks.append(function)
-        self.hook_args.append(args)
+        self.hook_args.append((args,slots))
+
+    def addBatchHook(self,function):
+        """Adds a batched hook f(t,dt) that gets called every simulation
+        substep with the simulation time t and the substep duration dt.
+        Unlike addHook, no argument resolution or error reporting is done per
+        call, so a single batched hook that applies forces to many bodies at
+        once is the cheapest way to act on the simulation at the substep rate.
+        """
+        self.batch_hooks.append(function)
+
+    def removeHook(self,function):
+        """Removes a hook previously added by addHook or addBatchHook"""
+        for i,h in enumerate(self.hooks):
+            if h is function:
+                self.hooks.pop(i)
+                self.hook_args.pop(i)
+                return
+        self.batch_hooks.remove(function)
+
+    def substepCallbacks(self):
+        """Returns the bound substep methods of all actuator emulators that
+        override ActuatorEmulator.substep.  Emulators that use the default
+        (empty) substep are skipped, so they add no per-substep overhead."""
+        res = []
+        for elist in self.actuatorEmulators:
+            for e in elist:
+                if getattr(e.substep,'im_func',None) is not ActuatorEmulator.substep.im_func:
+                    res.append(e.substep)
+        return res
 
     def drawGL(self):
         self.updateWorld()
@@ -280,46 +352,55 @@ class SimpleSimulator (Simulator):
         self.worst_status = Simulator.STATUS_NORMAL
 
         #Advance controller, emulators
-        #restore state from previous call -- this is done so that simulation data doesn't leak into controllers
-        for i,(q,dq) in enumerate(self.robotStates):
-            self.world.robot(i).setConfig(q)
-            self.world.robot(i).setVelocity(dq)
-        for i,T in enumerate(self.objectStates):
-            self.world.rigidObject(i).setTransform(*T)
+        #restore state from previous call -- this is done so that simulation data doesn't leak into controllers.
+        #Only robots / objects that the controllers may read are touched.
+        robots = self.isolatedRobots()
+        objects = self.isolatedObjects(robots)
+        for i in robots:
+            if i in self.robotStates:
+                q,dq = self.robotStates[i]
+                r = self.world.robot(i)
+                r.setConfig(q)
+                r.setVelocity(dq)
+        for i in objects:
+            if i in self.objectStates:
+                self.world.rigidObject(i).setTransform(*self.objectStates[i])
         #advance controller
         self.control_loop(dt)
         #save post-controller state
-        self.robotStates = [(self.world.robot(i).getConfig(),self.world.robot(i).getVelocity()) for i in range(self.world.numRobots())]
-        self.objectStates = [self.world.rigidObject(i).getTransform() for i in range(self.world.numRigidObjects())]
+        self.robotStates = {}
+        for i in robots:
+            r = self.world.robot(i)
+            self.robotStates[i] = (r.getConfig(),r.getVelocity())
+        self.objectStates = {}
+        for i in objects:
+            self.objectStates[i] = self.world.rigidObject(i).getTransform()
 
 
         #advance hooks and the physics simulation at the high rate
         assert self.substep_dt > 0
+        substeps = self.substepCallbacks()
+        hooks = zip(self.hooks,self.hook_args)
+        batch_hooks = self.batch_hooks
         t = 0
         while True:
             substep = min(self.substep_dt,dt-t)
-            for i in range(self.world.numRobots()):
-                for e in self.actuatorEmulators[i]:
-                    e.substep(substep)
-            for (hook,args) in zip(self.hooks,self.hook_args):
-                resolvedArgs = []
-                for a in args:
-                    if isinstance(a,str):
-                        if a=='time':
-                            resolvedArgs.append(sim.getTime())
-                        elif a=='dt':
-                            resolvedArgs.append(substep)
-                        else:
-                            raise ValueError("Invalid unresolved argument",a)
-                    else:
-                        resolvedArgs.append(a)
+            for f in substeps:
+                f(substep)
+            for (hook,(args,slots)) in hooks:
+                for (i,name) in slots:
+                    args[i] = (self.getTime() if name == 'time' else substep)
                 try:
-                    hook(*resolvedArgs)
+                    hook(*args)
                 except Exception, e:
                     import traceback
-                    print "Hook encountered error with arguments",resolvedArgs
+                    print "Hook encountered error with arguments",args
                     traceback.print_exc()
                     raise
+            if batch_hooks:
+                simtime = self.getTime()
+                for hook in batch_hooks:
+                    hook(simtime,substep)
             #Finally advance the physics simulation
             Simulator.simulate(self,substep)
             s = Simulator.getStatus(self)
@@ -334,6 +415,9 @@ class SimpleSimulator (Simulator):
     def control_loop(self,dt):
         for i in range(self.world.numRobots()):
             c = self.robotControllers[i]
+            if c is None and len(self.sensorEmulators[i])==1 and len(self.actuatorEmulators[i])==1:
+                #only the default emulators: no controller reads their output
+                continue
             if callable(c):
                 c(self.controller(i))
             else:
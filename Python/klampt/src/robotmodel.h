@@ -520,6 +520,10 @@ class WorldModel
   ///initialized whenever geometry collision, distance, or ray-casting
   ///routines are called.
   void enableInitCollisions(bool enabled);
+  ///Sets the number of threads used to read the geometry files of rigid
+  ///objects and terrains when a world XML file is read (default 1).  Robot
+  ///geometries are read serially.
+  void setNumLoadingThreads(int numThreads);
 
   //WARNING: do not modify this member directly
   int index;
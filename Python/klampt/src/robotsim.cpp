@@ -71,6 +71,7 @@ static vector<WidgetData> widgets;
 static list<int> widgetDeleteList;
 
 static bool gEnableCollisionInitialization = false;
+static int gNumLoadingThreads = 1;
 
 static int gStabilityNumFCEdges = 4;
 
@@ -1607,6 +1608,7 @@ bool WorldModel::saveFile(const char* fn,const char* elementPath)
 bool WorldModel::readFile(const char* fn)
 {
   RobotWorld& world = *worlds[index]->world;
+  ManagedGeometry::deferCollisionInit = !gEnableCollisionInitialization;
 
   const char* ext=FileExtension(fn);
   if(0==strcmp(ext,"rob") || 0==strcmp(ext,"urdf")) {
@@ -1648,9 +1650,17 @@ bool WorldModel::readFile(const char* fn)
     bool result = false;
     //if(worlds[index]->xmlWorld.Load(GetFileName(fn))) {
     if(worlds[index]->xmlWorld.Load(fn)) {
+      if(gNumLoadingThreads > 1) {
+        vector<string> geomfiles;
+        worlds[index]->xmlWorld.GetGeometryFiles(geomfiles);
+        ManagedGeometry::Preload(geomfiles,gNumLoadingThreads);
+      }
       if(worlds[index]->xmlWorld.GetWorld(world)) {
     result = true;
       }
+      int unused = ManagedGeometry::ClearPreloaded();
+      if(unused > 0)
+        fprintf(stderr,"WorldModel::readFile: warning, %d preloaded geometry files were not used\n",unused);
     }
     /*
     chdir(oldwd);
@@ -1965,13 +1975,21 @@ void WorldModel::enableGeometryLoading(bool enabled)
 
 void WorldModel::enableInitCollisions(bool enabled)
 {
-  gEnableCollisionInitialization = !enabled;
+  gEnableCollisionInitialization = enabled;
+  ManagedGeometry::deferCollisionInit = !enabled;
   if(enabled) {
     worlds[index]->world->InitCollisions();
     worlds[index]->world->UpdateGeometry();
   }
 }
 
+void WorldModel::setNumLoadingThreads(int numThreads)
+{
+  if(numThreads < 1) 
+    throw PyException("Number of loading threads must be positive");
+  gNumLoadingThreads = numThreads;
+}
+
 
 std::string WorldModel::getName(int id)
 {
@@ -3324,6 +3342,39 @@ void Simulator::meanContactForce(int aid,int bid,double out[3])
   sim->MeanContactForce(aid,bid).get(out);
 }
 
+void Simulator::getActiveContacts(std::vector<std::vector<double> >& out)
+{
+  out.resize(0);
+  vector<vector<double> > contacts,forces;
+  double f[3],m[3];
+  for(WorldSimulation::ContactFeedbackMap::iterator i=sim->contactFeedback.begin();i!=sim->contactFeedback.end();i++) {
+    if(i->second.contactCount == 0) continue;
+    int aid = sim->ODEToWorldID(i->first.first);
+    int bid = sim->ODEToWorldID(i->first.second);
+    if(bid < aid) std::swap(aid,bid);
+    getContacts(aid,bid,contacts);
+    getContactForces(aid,bid,forces);
+    contactForce(aid,bid,f);
+    contactTorque(aid,bid,m);
+    out.resize(out.size()+1);
+    vector<double>& row = out.back();
+    row.resize(9+contacts.size()*10);
+    row[0] = aid;
+    row[1] = bid;
+    for(int k=0;k<3;k++) {
+      row[2+k] = f[k];
+      row[5+k] = m[k];
+    }
+    row[8] = contacts.size();
+    for(size_t j=0;j<contacts.size();j++) {
+      double* c = &row[9+j*10];
+      std::copy(contacts[j].begin(),contacts[j].end(),c);
+      if(j < forces.size()) std::copy(forces[j].begin(),forces[j].end(),c+7);
+      else std::fill(c+7,c+10,0.0);
+    }
+  }
+}
+
 void Simulator::enableContactFeedback(int obj1,int obj2)
 {
   sim->EnableContactFeedback(obj1,obj2);
@@ -3775,6 +3826,34 @@ void SimRobotSensor::getMeasurements(std::vector<double>& out)
   sensor->GetMeasurements(out);
 }
 
+//Gets a writable, contiguous buffer of doubles from obj.  Throws a PyException
+//if obj doesn't provide one.  view must be released with PyBuffer_Release.
+static void GetDoubleBuffer(PyObject* obj,Py_buffer& view)
+{
+  if(PyObject_GetBuffer(obj,&view,PyBUF_WRITABLE | PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) != 0) {
+    PyErr_Clear();
+    throw PyException("Argument must be a writable, contiguous buffer of doubles",Type);
+  }
+  const char* format = view.format;
+  if(format != NULL && (*format == '@' || *format == '=')) format++;
+  if(view.itemsize != sizeof(double) || (format != NULL && strcmp(format,"d") != 0)) {
+    PyBuffer_Release(&view);
+    throw PyException("Argument must be a buffer of doubles, e.g., a float64 numpy array",Type);
+  }
+}
+
+int SimRobotSensor::getMeasurementsBuffer(PyObject* buffer)
+{
+  vector<double> values;
+  if(sensor) sensor->GetMeasurements(values);
+  Py_buffer view;
+  GetDoubleBuffer(buffer,view);
+  size_t n = std::min(values.size(),size_t(view.len/sizeof(double)));
+  if(n > 0) memcpy(view.buf,&values[0],n*sizeof(double));
+  PyBuffer_Release(&view);
+  return (int)values.size();
+}
+
 std::string SimRobotSensor::getSetting(const std::string& name)
 {
   if(!sensor) return std::string();
@@ -3833,6 +3912,35 @@ SimRobotSensor SimRobotController::sensor(const char* name)
   return SimRobotSensor(controller->robot,sensor);
 }
 
+int SimRobotController::numSensors()
+{
+  return (int)controller->sensors.sensors.size();
+}
+
+void SimRobotController::getSensorMeasurements(std::vector<double>& out)
+{
+  out.resize(0);
+  RobotSensors& sensors = controller->sensors;
+  vector<double> values;
+  for(size_t i=0;i<sensors.sensors.size();i++) {
+    values.resize(0);
+    sensors.sensors[i]->GetMeasurements(values);
+    out.insert(out.end(),values.begin(),values.end());
+  }
+}
+
+int SimRobotController::getSensorMeasurementsBuffer(PyObject* buffer)
+{
+  vector<double> values;
+  getSensorMeasurements(values);
+  Py_buffer view;
+  GetDoubleBuffer(buffer,view);
+  size_t n = std::min(values.size(),size_t(view.len/sizeof(double)));
+  if(n > 0) memcpy(view.buf,&values[0],n*sizeof(double));
+  PyBuffer_Release(&view);
+  return (int)values.size();
+}
+
 std::vector<std::string> SimRobotController::commands()
 {
   return controller->controller->Commands();
@@ -17,6 +17,10 @@ class ControlledRobotSimulator;
 class ODEGeometry;
 typedef struct dxBody *dBodyID;
 
+// Forward declaration of C-type PyObject
+struct _object;
+typedef _object PyObject;
+
 //forward declarations
 class SimRobotSensor;
 class SimRobotController;
@@ -58,6 +62,14 @@ class SimRobotSensor
   std::vector<std::string> measurementNames();
   ///Returns a list of measurements from the previous simulation (or kinematicSimulate) timestep
   void getMeasurements(std::vector<double>& out);
+  ///Copies the measurements from the previous simulation (or kinematicSimulate)
+  ///timestep into buffer, which must be a writable, contiguous buffer of doubles
+  ///(e.g., a float64 numpy array).  Unlike getMeasurements, no Python object is
+  ///created per measurement.  At most len(buffer) values are written.
+  ///
+  ///Returns the number of measurements.  If this is larger than len(buffer),
+  ///call again with a larger buffer.
+  int getMeasurementsBuffer(PyObject* buffer);
   ///Returns the value of the named setting (you will need to manually parse this)
   std::string getSetting(const std::string& name);
   ///Sets the value of the named setting (you will need to manually cast an int/float/etc to a str)
@@ -134,6 +146,19 @@ class SimRobotController
   SimRobotSensor sensor(int index);
   /// Returns a sensor by name.  If unavailable, a null sensor is returned
   SimRobotSensor sensor(const char* name);
+  /// Returns the number of sensors
+  int numSensors();
+  /// Returns the measurements of all sensors, concatenated in sensor order,
+  /// in a single call.  The measurements of sensor i start at the sum of the
+  /// numbers of measurements of sensors 0,...,i-1.
+  void getSensorMeasurements(std::vector<double>& out);
+  /// Same as getSensorMeasurements, but copies the measurements into buffer,
+  /// which must be a writable, contiguous buffer of doubles (e.g., a float64
+  /// numpy array).  At most len(buffer) values are written.
+  ///
+  /// Returns the total number of measurements.  If this is larger than
+  /// len(buffer), call again with a larger buffer.
+  int getSensorMeasurementsBuffer(PyObject* buffer);
   
   /// gets a command list
   std::vector<std::string> commands();
@@ -390,6 +415,14 @@ class Simulator
   /// Returns the average contact force on object a over the last simulate()
   /// call
   void meanContactForce(int aid,int bid,double out[3]);
+  /// Returns all pairs of objects with contact feedback enabled that had
+  /// contact over the last simulate() call, in a single call.  Each pair is
+  /// given as a list [aid,bid,fx,fy,fz,mx,my,mz,n,c1,...,cn] with aid < bid,
+  /// where (fx,fy,fz) and (mx,my,mz) are the values of contactForce(aid,bid)
+  /// and contactTorque(aid,bid), n is the number of contacts at the last
+  /// time step, and each contact ci is a 10-element block
+  /// (x,n,kFriction,f) as returned by getContacts and getContactForces.
+  void getActiveContacts(std::vector<std::vector<double> >& out);
 
   /// Returns a controller for the indicated robot
   SimRobotController controller(int robot);
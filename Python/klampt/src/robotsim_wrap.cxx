@@ -36482,6 +36482,48 @@ fail:
 }
 
 
+SWIGINTERN PyObject *_wrap_WorldModel_setNumLoadingThreads(PyObject *SWIGUNUSEDPARM(self), PyObject *args) {
+  PyObject *resultobj = 0;
+  WorldModel *arg1 = (WorldModel *) 0 ;
+  int arg2 ;
+  void *argp1 = 0 ;
+  int res1 = 0 ;
+  int val2 ;
+  int ecode2 = 0 ;
+  PyObject * obj0 = 0 ;
+  PyObject * obj1 = 0 ;
+  
+  if (!PyArg_ParseTuple(args,(char *)"OO:WorldModel_setNumLoadingThreads",&obj0,&obj1)) SWIG_fail;
+  res1 = SWIG_ConvertPtr(obj0, &argp1,SWIGTYPE_p_WorldModel, 0 |  0 );
+  if (!SWIG_IsOK(res1)) {
+    SWIG_exception_fail(SWIG_ArgError(res1), "in method '" "WorldModel_setNumLoadingThreads" "', argument " "1"" of type '" "WorldModel *""'"); 
+  }
+  arg1 = reinterpret_cast< WorldModel * >(argp1);
+  ecode2 = SWIG_AsVal_int(obj1, &val2);
+  if (!SWIG_IsOK(ecode2)) {
+    SWIG_exception_fail(SWIG_ArgError(ecode2), "in method '" "WorldModel_setNumLoadingThreads" "', argument " "2"" of type '" "int""'");
+  } 
+  arg2 = static_cast< int >(val2);
+  {
+    try {
+      (arg1)->setNumLoadingThreads(arg2);
+    }
+    catch(PyException& e) {
+      e.setPyErr();
+      return NULL;
+    }
+    catch(std::exception& e) {
+      PyErr_SetString(PyExc_RuntimeError, const_cast<char*>(e.what()));
+      return NULL;
+    }
+  }
+  resultobj = SWIG_Py_Void();
+  return resultobj;
+fail:
+  return NULL;
+}
+
+
 SWIGINTERN PyObject *_wrap_WorldModel_index_set(PyObject *SWIGUNUSEDPARM(self), PyObject *args) {
   PyObject *resultobj = 0;
   WorldModel *arg1 = (WorldModel *) 0 ;
@@ -42043,6 +42085,43 @@ fail:
 }
 
 
+SWIGINTERN PyObject *_wrap_SimRobotSensor_getMeasurementsBuffer(PyObject *SWIGUNUSEDPARM(self), PyObject *args) {
+  PyObject *resultobj = 0;
+  SimRobotSensor *arg1 = (SimRobotSensor *) 0 ;
+  PyObject *arg2 = (PyObject *) 0 ;
+  void *argp1 = 0 ;
+  int res1 = 0 ;
+  PyObject * obj0 = 0 ;
+  PyObject * obj1 = 0 ;
+  int result;
+  
+  if (!PyArg_ParseTuple(args,(char *)"OO:SimRobotSensor_getMeasurementsBuffer",&obj0,&obj1)) SWIG_fail;
+  res1 = SWIG_ConvertPtr(obj0, &argp1,SWIGTYPE_p_SimRobotSensor, 0 |  0 );
+  if (!SWIG_IsOK(res1)) {
+    SWIG_exception_fail(SWIG_ArgError(res1), "in method '" "SimRobotSensor_getMeasurementsBuffer" "', argument " "1"" of type '" "SimRobotSensor *""'"); 
+  }
+  arg1 = reinterpret_cast< SimRobotSensor * >(argp1);
+  arg2 = obj1;
+  {
+    try {
+      result = (int)(arg1)->getMeasurementsBuffer(arg2);
+    }
+    catch(PyException& e) {
+      e.setPyErr();
+      return NULL;
+    }
+    catch(std::exception& e) {
+      PyErr_SetString(PyExc_RuntimeError, const_cast<char*>(e.what()));
+      return NULL;
+    }
+  }
+  resultobj = SWIG_From_int(static_cast< int >(result));
+  return resultobj;
+fail:
+  return NULL;
+}
+
+
 SWIGINTERN PyObject *_wrap_SimRobotSensor_getSetting(PyObject *SWIGUNUSEDPARM(self), PyObject *args) {
   PyObject *resultobj = 0;
   SimRobotSensor *arg1 = (SimRobotSensor *) 0 ;
@@ -43080,6 +43159,134 @@ fail:
 }
 
 
+SWIGINTERN PyObject *_wrap_SimRobotController_numSensors(PyObject *SWIGUNUSEDPARM(self), PyObject *args) {
+  PyObject *resultobj = 0;
+  SimRobotController *arg1 = (SimRobotController *) 0 ;
+  void *argp1 = 0 ;
+  int res1 = 0 ;
+  PyObject * obj0 = 0 ;
+  int result;
+  
+  if (!PyArg_ParseTuple(args,(char *)"O:SimRobotController_numSensors",&obj0)) SWIG_fail;
+  res1 = SWIG_ConvertPtr(obj0, &argp1,SWIGTYPE_p_SimRobotController, 0 |  0 );
+  if (!SWIG_IsOK(res1)) {
+    SWIG_exception_fail(SWIG_ArgError(res1), "in method '" "SimRobotController_numSensors" "', argument " "1"" of type '" "SimRobotController *""'"); 
+  }
+  arg1 = reinterpret_cast< SimRobotController * >(argp1);
+  {
+    try {
+      result = (int)(arg1)->numSensors();
+    }
+    catch(PyException& e) {
+      e.setPyErr();
+      return NULL;
+    }
+    catch(std::exception& e) {
+      PyErr_SetString(PyExc_RuntimeError, const_cast<char*>(e.what()));
+      return NULL;
+    }
+  }
+  resultobj = SWIG_From_int(static_cast< int >(result));
+  return resultobj;
+fail:
+  return NULL;
+}
+
+
+SWIGINTERN PyObject *_wrap_SimRobotController_getSensorMeasurements(PyObject *SWIGUNUSEDPARM(self), PyObject *args) {
+  PyObject *resultobj = 0;
+  SimRobotController *arg1 = (SimRobotController *) 0 ;
+  std::vector< double,std::allocator< double > > *arg2 = 0 ;
+  void *argp1 = 0 ;
+  int res1 = 0 ;
+  std::vector< double > temp2 ;
+  PyObject * obj0 = 0 ;
+  
+  {
+    arg2 = &temp2;
+  }
+  if (!PyArg_ParseTuple(args,(char *)"O:SimRobotController_getSensorMeasurements",&obj0)) SWIG_fail;
+  res1 = SWIG_ConvertPtr(obj0, &argp1,SWIGTYPE_p_SimRobotController, 0 |  0 );
+  if (!SWIG_IsOK(res1)) {
+    SWIG_exception_fail(SWIG_ArgError(res1), "in method '" "SimRobotController_getSensorMeasurements" "', argument " "1"" of type '" "SimRobotController *""'"); 
+  }
+  arg1 = reinterpret_cast< SimRobotController * >(argp1);
+  {
+    try {
+      (arg1)->getSensorMeasurements(*arg2);
+    }
+    catch(PyException& e) {
+      e.setPyErr();
+      return NULL;
+    }
+    catch(std::exception& e) {
+      PyErr_SetString(PyExc_RuntimeError, const_cast<char*>(e.what()));
+      return NULL;
+    }
+  }
+  resultobj = SWIG_Py_Void();
+  {
+    PyObject *o, *o2, *o3;
+    o = convert_darray_obj(&(*arg2)[0],(int)arg2->size());
+    if ((!resultobj) || (resultobj == Py_None)) {
+      resultobj = o;
+    } else {
+      if (!PyTuple_Check(resultobj)) {
+        PyObject *o2 = resultobj;
+        resultobj = PyTuple_New(1);
+        PyTuple_SetItem(resultobj,0,o2);
+      }
+      o3 = PyTuple_New(1);
+      PyTuple_SetItem(o3,0,o);
+      o2 = resultobj;
+      resultobj = PySequence_Concat(o2,o3);
+      Py_DECREF(o2);
+      Py_DECREF(o3);
+    }
+  }
+  return resultobj;
+fail:
+  return NULL;
+}
+
+
+SWIGINTERN PyObject *_wrap_SimRobotController_getSensorMeasurementsBuffer(PyObject *SWIGUNUSEDPARM(self), PyObject *args) {
+  PyObject *resultobj = 0;
+  SimRobotController *arg1 = (SimRobotController *) 0 ;
+  PyObject *arg2 = (PyObject *) 0 ;
+  void *argp1 = 0 ;
+  int res1 = 0 ;
+  PyObject * obj0 = 0 ;
+  PyObject * obj1 = 0 ;
+  int result;
+  
+  if (!PyArg_ParseTuple(args,(char *)"OO:SimRobotController_getSensorMeasurementsBuffer",&obj0,&obj1)) SWIG_fail;
+  res1 = SWIG_ConvertPtr(obj0, &argp1,SWIGTYPE_p_SimRobotController, 0 |  0 );
+  if (!SWIG_IsOK(res1)) {
+    SWIG_exception_fail(SWIG_ArgError(res1), "in method '" "SimRobotController_getSensorMeasurementsBuffer" "', argument " "1"" of type '" "SimRobotController *""'"); 
+  }
+  arg1 = reinterpret_cast< SimRobotController * >(argp1);
+  arg2 = obj1;
+  {
+    try {
+      result = (int)(arg1)->getSensorMeasurementsBuffer(arg2);
+    }
+    catch(PyException& e) {
+      e.setPyErr();
+      return NULL;
+    }
+    catch(std::exception& e) {
+      PyErr_SetString(PyExc_RuntimeError, const_cast<char*>(e.what()));
+      return NULL;
+    }
+  }
+  resultobj = SWIG_From_int(static_cast< int >(result));
+  return resultobj;
+fail:
+  return NULL;
+}
+
+
 SWIGINTERN PyObject *_wrap_SimRobotController_sendCommand(PyObject *SWIGUNUSEDPARM(self), PyObject *args) {
   PyObject *resultobj = 0;
   SimRobotController *arg1 = (SimRobotController *) 0 ;
@@ -47547,6 +47754,63 @@ fail:
 }
 
 
+SWIGINTERN PyObject *_wrap_Simulator_getActiveContacts(PyObject *SWIGUNUSEDPARM(self), PyObject *args) {
+  PyObject *resultobj = 0;
+  Simulator *arg1 = (Simulator *) 0 ;
+  std::vector< std::vector< double,std::allocator< double > >,std::allocator< std::vector< double,std::allocator< double > > > > *arg2 = 0 ;
+  void *argp1 = 0 ;
+  int res1 = 0 ;
+  std::vector< std::vector< double > > temp2 ;
+  PyObject * obj0 = 0 ;
+  
+  {
+    arg2 = &temp2;
+  }
+  if (!PyArg_ParseTuple(args,(char *)"O:Simulator_getActiveContacts",&obj0)) SWIG_fail;
+  res1 = SWIG_ConvertPtr(obj0, &argp1,SWIGTYPE_p_Simulator, 0 |  0 );
+  if (!SWIG_IsOK(res1)) {
+    SWIG_exception_fail(SWIG_ArgError(res1), "in method '" "Simulator_getActiveContacts" "', argument " "1"" of type '" "Simulator *""'"); 
+  }
+  arg1 = reinterpret_cast< Simulator * >(argp1);
+  {
+    try {
+      (arg1)->getActiveContacts(*arg2);
+    }
+    catch(PyException& e) {
+      e.setPyErr();
+      return NULL;
+    }
+    catch(std::exception& e) {
+      PyErr_SetString(PyExc_RuntimeError, const_cast<char*>(e.what()));
+      return NULL;
+    }
+  }
+  resultobj = SWIG_Py_Void();
+  {
+    PyObject *o, *o2, *o3;
+    o = convert_dmatrix_obj((*arg2));
+    if ((!resultobj) || (resultobj == Py_None)) {
+      resultobj = o;
+    } else {
+      if (!PyTuple_Check(resultobj)) {
+        PyObject *o2 = resultobj;
+        resultobj = PyTuple_New(1);
+        PyTuple_SetItem(resultobj,0,o2);
+      }
+      o3 = PyTuple_New(1);
+      PyTuple_SetItem(o3,0,o);
+      o2 = resultobj;
+      resultobj = PySequence_Concat(o2,o3);
+      Py_DECREF(o2);
+      Py_DECREF(o3);
+    }
+  }
+  return resultobj;
+fail:
+  return NULL;
+}
+
+
 SWIGINTERN PyObject *_wrap_Simulator_controller__SWIG_0(PyObject *SWIGUNUSEDPARM(self), PyObject *args) {
   PyObject *resultobj = 0;
   Simulator *arg1 = (Simulator *) 0 ;
@@ -51885,6 +52149,13 @@ static PyMethodDef SwigMethods[] = {
 		"indeed be initialized whenever geometry collision, distance, or ray-\n"
 		"casting routines are called. \n"
 		""},
+	 { (char *)"WorldModel_setNumLoadingThreads", _wrap_WorldModel_setNumLoadingThreads, METH_VARARGS, (char *)"\n"
+		"WorldModel_setNumLoadingThreads(WorldModel self, int numThreads)\n"
+		"\n"
+		"Sets the number of threads used to read the geometry files of rigid\n"
+		"objects and terrains when a world XML file is read (default 1). Robot\n"
+		"geometries are read serially. \n"
+		""},
 	 { (char *)"WorldModel_index_set", _wrap_WorldModel_index_set, METH_VARARGS, (char *)"WorldModel_index_set(WorldModel self, int index)"},
 	 { (char *)"WorldModel_index_get", _wrap_WorldModel_index_get, METH_VARARGS, (char *)"WorldModel_index_get(WorldModel self) -> int"},
 	 { (char *)"WorldModel_swigregister", WorldModel_swigregister, METH_VARARGS, NULL},
@@ -52300,6 +52571,18 @@ static PyMethodDef SwigMethods[] = {
 		"Returns a list of measurements from the previous simulation (or\n"
 		"kinematicSimulate) timestep. \n"
 		""},
+	 { (char *)"SimRobotSensor_getMeasurementsBuffer", _wrap_SimRobotSensor_getMeasurementsBuffer, METH_VARARGS, (char *)"\n"
+		"SimRobotSensor_getMeasurementsBuffer(SimRobotSensor self, PyObject * buffer) -> int\n"
+		"\n"
+		"Copies the measurements from the previous simulation (or\n"
+		"kinematicSimulate) timestep into buffer, which must be a writable,\n"
+		"contiguous buffer of doubles (e.g., a float64 numpy array). Unlike\n"
+		"getMeasurements, no Python object is created per measurement. At most\n"
+		"len(buffer) values are written.\n"
+		"\n"
+		"Returns the number of measurements. If this is larger than len(buffer),\n"
+		"call again with a larger buffer. \n"
+		""},
 	 { (char *)"SimRobotSensor_getSetting", _wrap_SimRobotSensor_getSetting, METH_VARARGS, (char *)"\n"
 		"SimRobotSensor_getSetting(SimRobotSensor self, std::string const & name) -> std::string\n"
 		"\n"
@@ -52379,6 +52662,28 @@ static PyMethodDef SwigMethods[] = {
 		"Returns a sensor by name. If unavailable, a null sensor is returned.\n"
 		"\n"
 		""},
+	 { (char *)"SimRobotController_numSensors", _wrap_SimRobotController_numSensors, METH_VARARGS, (char *)"\n"
+		"SimRobotController_numSensors(SimRobotController self) -> int\n"
+		"\n"
+		"Returns the number of sensors. \n"
+		""},
+	 { (char *)"SimRobotController_getSensorMeasurements", _wrap_SimRobotController_getSensorMeasurements, METH_VARARGS, (char *)"\n"
+		"SimRobotController_getSensorMeasurements(SimRobotController self)\n"
+		"\n"
+		"Returns the measurements of all sensors, concatenated in sensor order,\n"
+		"in a single call. The measurements of sensor i start at the sum of the\n"
+		"numbers of measurements of sensors 0,...,i-1. \n"
+		""},
+	 { (char *)"SimRobotController_getSensorMeasurementsBuffer", _wrap_SimRobotController_getSensorMeasurementsBuffer, METH_VARARGS, (char *)"\n"
+		"SimRobotController_getSensorMeasurementsBuffer(SimRobotController self, PyObject * buffer) -> int\n"
+		"\n"
+		"Same as getSensorMeasurements, but copies the measurements into\n"
+		"buffer, which must be a writable, contiguous buffer of doubles (e.g., a\n"
+		"float64 numpy array). At most len(buffer) values are written.\n"
+		"\n"
+		"Returns the total number of measurements. If this is larger than\n"
+		"len(buffer), call again with a larger buffer. \n"
+		""},
 	 { (char *)"SimRobotController_commands", _wrap_SimRobotController_commands, METH_VARARGS, (char *)"\n"
 		"SimRobotController_commands(SimRobotController self) -> stringVector\n"
 		"\n"
@@ -52807,6 +53112,17 @@ static PyMethodDef SwigMethods[] = {
 		"Returns the average contact force on object a over the last simulate()\n"
 		"call. \n"
 		""},
+	 { (char *)"Simulator_getActiveContacts", _wrap_Simulator_getActiveContacts, METH_VARARGS, (char *)"\n"
+		"Simulator_getActiveContacts(Simulator self)\n"
+		"\n"
+		"Returns all pairs of objects with contact feedback enabled that had\n"
+		"contact over the last simulate() call, in a single call.  Each pair is\n"
+		"given as a list [aid,bid,fx,fy,fz,mx,my,mz,n,c1,...,cn] with aid < bid,\n"
+		"where (fx,fy,fz) and (mx,my,mz) are the values of contactForce(aid,bid)\n"
+		"and contactTorque(aid,bid), n is the number of contacts at the last\n"
+		"time step, and each contact ci is a 10-element block\n"
+		"(x,n,kFriction,f) as returned by getContacts and getContactForces.\n"
+		""},
 	 { (char *)"Simulator_controller", _wrap_Simulator_controller, METH_VARARGS, (char *)"\n"
 		"controller(int robot) -> SimRobotController\n"
 		"Simulator_controller(Simulator self, RobotModel robot) -> SimRobotController\n"
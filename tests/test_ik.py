@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+
+import unittest
+from klampt import WorldModel
+from klampt.model import ik
+
+class ikTest(unittest.TestCase):
+
+    def setUp(self):
+        self.world = WorldModel()
+        self.robot = self.world.loadRobot('data/robots/planar3R.rob')
+        self.link = self.robot.link(2)
+
+    def test_solution_cache_bounded(self):
+        #a target that holds still (up to noise) keeps a single entry
+        cache = ik.IKSolutionCache()
+        for i in xrange(100):
+            noise = 1e-4*(i%3-1)
+            goal = ik.objective(self.link,local=[1,0,0],world=[2.0+noise,0,0.5])
+            self.assertTrue(ik.solve(goal,cache=cache))
+        stats = cache.stats()
+        self.assertEqual(stats['size'],1)
+        self.assertEqual(stats['hits'],99)
+        #distinct targets get their own entries
+        for x in [1.0,1.5]:
+            goal = ik.objective(self.link,local=[1,0,0],world=[x,0,0.5])
+            self.assertTrue(ik.solve(goal,cache=cache))
+        self.assertEqual(cache.stats()['size'],3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import unittest
+import numpy as np
+from klampt import WorldModel
+from klampt.math import so3
+from klampt.model.map import Vectorizer
+
+class mapTest(unittest.TestCase):
+
+    def setUp(self):
+        self.world = WorldModel()
+        self.robot = self.world.loadRobot('data/robots/planar3R.rob')
+        self.robot.setConfig([0.5,1.0,1.5])
+        self.obj = self.world.loadRigidObject('data/objects/block.obj')
+        self.obj.setTransform(so3.rotation([0,0,1],0.5),[1.0,2.0,3.0])
+        self.vectorizer = Vectorizer(self.world,['robots[0].config','rigidObjects[0].transform'])
+
+    def expected(self):
+        R,t = self.obj.getTransform()
+        values = {'robots[0].config':self.robot.getConfig(),
+                  'rigidObjects[0].transform':list(R)+list(t)}
+        res = []
+        for k in self.vectorizer.keys:
+            res += values[k]
+        return res
+
+    def test_size(self):
+        self.assertEqual(self.vectorizer.size,15)
+        lengths = dict(zip(self.vectorizer.keys,self.vectorizer.lengths))
+        self.assertEqual(lengths,{'robots[0].config':3,'rigidObjects[0].transform':12})
+
+    def test_getVector(self):
+        self.assertEqual(self.vectorizer.getVector(),self.expected())
+        out = np.empty(self.vectorizer.size)
+        res = self.vectorizer.getVector(out)
+        self.assertIs(res,out)
+        self.assertEqual(out.tolist(),self.expected())
+
+    def test_setVector(self):
+        R,t = self.obj.getTransform()
+        values = {'robots[0].config':[0.25,0.75,1.25],
+                  'rigidObjects[0].transform':list(R)+[-1.0,0.5,2.0]}
+        v = []
+        for k in self.vectorizer.keys:
+            v += values[k]
+        self.vectorizer.setVector(v)
+        self.assertEqual(self.robot.getConfig(),[0.25,0.75,1.25])
+        self.assertEqual(list(self.obj.getTransform()[1]),[-1.0,0.5,2.0])
+        self.assertRaises(ValueError,self.vectorizer.setVector,v+[0.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+import unittest
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+from klampt import IKObjective
+from klampt.model.contact import ContactPoint,Hold
+from klampt.model import multipath
+from klampt.model.multipath import MultiPath
+
+class multipathTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        path = MultiPath()
+        path.settings['robot'] = 'test "robot"'
+        h = Hold()
+        h.link = 3
+        h.contacts = [ContactPoint([0.0,0.5,0.0],[0.0,0.0,1.0],0.5)]
+        h.ikConstraint = IKObjective()
+        h.ikConstraint.setFixedPoint(3,[0.0,0.0,0.25],[0.0,0.5,0.0])
+        path.holdSet['foot'] = h
+        for i in xrange(3):
+            s = MultiPath.Section()
+            s.settings['index'] = str(i)
+            s.times = [i+0.125*j for j in xrange(9)]
+            s.configs = [[t,0.5*t,-0.25] for t in s.times]
+            s.velocities = [[1.0,0.5,0.0] for t in s.times]
+            s.holdIndices = ['foot']
+            path.sections.append(s)
+        path.sections[1].holds = [h]
+        self.path = path
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def assertPathsEqual(self,a,b):
+        self.assertEqual(a.settings,b.settings)
+        self.assertEqual(a.numSections(),b.numSections())
+        for sa,sb in zip(a.sections,b.sections):
+            self.assertEqual(sa.settings,sb.settings)
+            self.assertEqual(sa.configs,sb.configs)
+            self.assertEqual(sa.times,sb.times)
+            self.assertEqual(sa.velocities,sb.velocities)
+            self.assertEqual(sa.holdIndices,sb.holdIndices)
+            self.assertEqual(len(sa.holds),len(sb.holds))
+        self.assertEqual(sorted(a.holdSet.keys()),sorted(b.holdSet.keys()))
+        for k,h in a.holdSet.iteritems():
+            self.assertEqual(h.link,b.holdSet[k].link)
+            self.assertEqual(len(h.contacts),len(b.holdSet[k].contacts))
+            self.assertEqual(h.ikConstraint.getPosition(),b.holdSet[k].ikConstraint.getPosition())
+
+    def test_load_prettify_format(self):
+        #files written by the ElementTree-based writer load with the streaming reader
+        fn = os.path.join(self.dir,'path.xml')
+        f = open(fn,'w')
+        f.write('<?xml version="1.0"?>\n')
+        f.write(multipath._prettify(self.path.saveXML().getroot()))
+        f.close()
+        res = MultiPath()
+        res.load(fn)
+        self.assertPathsEqual(self.path,res)
+
+    def test_save_streaming(self):
+        #files written by the streaming writer load with the ElementTree-based reader
+        fn = os.path.join(self.dir,'path.xml')
+        self.path.save(fn)
+        res = MultiPath()
+        res.loadXML(ET.parse(fn))
+        self.assertPathsEqual(self.path,res)
+        res = MultiPath()
+        res.load(fn)
+        self.assertPathsEqual(self.path,res)
+
+    def test_save_binary(self):
+        fn = os.path.join(self.dir,'path.xml')
+        self.path.save(fn,binary=True)
+        self.assertTrue(os.path.exists(fn+'.bin'))
+        res = MultiPath()
+        res.load(fn)
+        self.assertPathsEqual(self.path,res)
+
+if __name__ == '__main__':
+    unittest.main()
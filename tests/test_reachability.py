@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+import unittest
+import os
+import math
+import shutil
+import tempfile
+from klampt import WorldModel
+from klampt.math import so3,vectorops
+from klampt.model.reachability import ReachabilityMap
+
+class reachabilityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.world = WorldModel()
+        self.world.readFile('data/robots/planar3R.rob')
+        self.robot = self.world.robot(0)
+        #the planar robot moves in the x-z plane, so use a single layer of
+        #voxels around y=0
+        self.rmap = ReachabilityMap(self.robot,2,localpt=[1,0,0],bmin=[-3.5,-0.25,-3.5],bmax=[3.5,0.25,3.5],resolution=0.5)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_voxels(self):
+        self.assertEqual(self.rmap.dims,[14,1,14])
+        for v in xrange(self.rmap.numVoxels()):
+            self.assertEqual(self.rmap.voxelIndex(self.rmap.voxelCenter(v)),v)
+        self.assertEqual(self.rmap.voxelIndex([4,0,0]),-1)
+        self.assertEqual(self.rmap.voxelIndex([0,0.5,0]),-1)
+        self.assertEqual(self.rmap.voxelCenter(self.rmap.voxelIndex([2,0,0])),[2.25,0.0,0.25])
+
+    def test_active_dofs(self):
+        self.assertEqual(self.rmap.activeDofs,[0,1,2])
+        self.assertEqual(self.rmap.baseLink,-1)
+        self.assertEqual(len(self.rmap.seeds),self.rmap.numVoxels()*3)
+
+    def test_score_seed(self):
+        self.rmap.build(numRestarts=2)
+        self.assertEqual(self.rmap.score([2,0,0]),1.0)
+        self.assertEqual(self.rmap.score([10,0,0]),0.0)
+        self.assertEqual(self.rmap.score([3.4,0,3.4]),0.0)
+        self.assertIsNone(self.rmap.seed([10,0,0]))
+        q = self.rmap.seed([2,0,0])
+        self.assertEqual(len(q),3)
+        self.assertTrue(self.rmap.solve([2,0,0]))
+        p = self.robot.link(2).getWorldPosition([1,0,0])
+        self.assertLess(vectorops.distance(p,[2,0,0]),1e-2)
+
+    def test_save_load(self):
+        self.rmap.build(numRestarts=2)
+        fn = os.path.join(self.dir,'planar3R.rmap')
+        self.rmap.save(fn)
+        res = ReachabilityMap.load(fn,self.robot)
+        self.assertEqual(res.link,self.rmap.link)
+        self.assertEqual(res.dims,self.rmap.dims)
+        self.assertEqual(res.bmin,self.rmap.bmin)
+        self.assertEqual(res.bmax,self.rmap.bmax)
+        self.assertEqual(res.resolution,self.rmap.resolution)
+        self.assertEqual(res.localpt,self.rmap.localpt)
+        self.assertEqual(res.activeDofs,self.rmap.activeDofs)
+        self.assertEqual(res.scores.tostring(),self.rmap.scores.tostring())
+        self.assertEqual(res.seeds.tostring(),self.rmap.seeds.tostring())
+        self.assertEqual(res.seed([2,0,0]),self.rmap.seed([2,0,0]))
+
+    def test_save_load_rotations(self):
+        rotations = [so3.identity()]
+        for axis in [[1,0,0],[0,1,0],[0,0,1]]:
+            rotations.append(so3.rotation(axis,math.pi/2))
+            rotations.append(so3.rotation(axis,-math.pi/2))
+        rmap = ReachabilityMap(self.robot,2,bmin=[-1,-1,-1],bmax=[1,1,1],resolution=1.0,rotations=rotations)
+        fn = os.path.join(self.dir,'rotations.rmap')
+        rmap.save(fn)
+        res = ReachabilityMap.load(fn,self.robot)
+        self.assertEqual(len(res.rotations),len(rotations))
+        for R,Rres in zip(rotations,res.rotations):
+            self.assertLess(so3.distance(R,Rres),1e-12)
+        self.assertEqual(len(res.seeds),rmap.numVoxels()*len(rotations)*3)
+
+    def test_rotation_slot(self):
+        rotations = [so3.identity()]
+        for axis in [[1,0,0],[0,1,0],[0,0,1]]:
+            rotations.append(so3.rotation(axis,math.pi/2))
+            rotations.append(so3.rotation(axis,-math.pi/2))
+        rmap = ReachabilityMap(self.robot,2,bmin=[-1,-1,-1],bmax=[1,1,1],resolution=1.0,rotations=rotations)
+        for i,R in enumerate(rotations):
+            self.assertEqual(rmap._rotationSlot(R),i)
+            for axis in [[1,0,0],[0,1,0],[0,0,1],[0.6,0.8,0]]:
+                self.assertEqual(rmap._rotationSlot(so3.mul(R,so3.rotation(axis,0.05))),i)
+
+if __name__ == '__main__':
+    unittest.main()
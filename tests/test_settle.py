@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+
+import unittest
+from klampt import WorldModel
+from klampt.math import so3
+from klampt.sim import settle
+
+class settleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.world = WorldModel()
+        self.world.loadTerrain('data/terrains/plane.env')
+        #two 0.4m cubes, stacked with small gaps
+        for z in [0.25,0.7]:
+            obj = self.world.loadRigidObject('data/objects/block.obj')
+            obj.setTransform(so3.identity(),[0,0,z])
+
+    def test_settle_many_stack(self):
+        transforms,settled = settle.settle_many(self.world,maxtime=5.0)
+        self.assertEqual(settled,[True,True])
+        zlow = transforms[0][1][2]
+        zhigh = transforms[1][1][2]
+        #the bottom cube rests on the plane, the top cube on the bottom one
+        self.assertLess(abs(zlow-0.2),0.05)
+        self.assertLess(abs(zhigh-0.6),0.05)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+import unittest
+import os
+import shutil
+import tempfile
+from klampt import WorldModel
+
+MESHES = ['data/objects/cube.off','data/objects/cylinder.off','data/objects/sphere.off',
+          'data/objects/srimugsmooth.off','data/objects/thincube.off',
+          'data/robots/pr2/shoulder_v0/shoulder_lift.stl','data/robots/pr2/shoulder_v0/upper_arm_roll_L.stl']
+
+def geometry_summary(geom):
+    res = [geom.type(),geom.getBB()]
+    if geom.type() == 'TriangleMesh':
+        m = geom.getTriangleMesh()
+        res += [list(m.vertices),list(m.indices)]
+    return res
+
+class worldloadTest(unittest.TestCase):
+
+    def setUp(self):
+        #a world with distinct copies of several meshes, some referenced with
+        #'.' and '..' path components
+        self.dir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.dir,'sub'))
+        f = open(os.path.join(self.dir,'world.xml'),'w')
+        f.write('<?xml version="1.0"?>\n<world>\n')
+        for i in xrange(3*len(MESHES)):
+            src = MESHES[i%len(MESHES)]
+            meshfn = 'mesh%d%s'%(i,os.path.splitext(src)[1])
+            shutil.copyfile(src,os.path.join(self.dir,meshfn))
+            if i%3 == 1:
+                meshfn = './'+meshfn
+            elif i%3 == 2:
+                meshfn = 'sub/../'+meshfn
+            f.write('  <rigidObject name="object%d" position="%g 0 0">\n'%(i,i*2.0))
+            f.write('    <geometry mesh="%s" />\n'%(meshfn,))
+            f.write('  </rigidObject>\n')
+        for i in xrange(2):
+            meshfn = 'terrain%d.off'%(i,)
+            shutil.copyfile(MESHES[i],os.path.join(self.dir,meshfn))
+            f.write('  <terrain file="%s" />\n'%(meshfn,))
+        f.write('</world>\n')
+        f.close()
+
+    def tearDown(self):
+        WorldModel().setNumLoadingThreads(1)
+        shutil.rmtree(self.dir)
+
+    def load(self,numThreads):
+        world = WorldModel()
+        world.setNumLoadingThreads(numThreads)
+        self.assertTrue(world.readFile(os.path.join(self.dir,'world.xml')))
+        res = [geometry_summary(world.rigidObject(i).geometry()) for i in xrange(world.numRigidObjects())]
+        res += [geometry_summary(world.terrain(i).geometry()) for i in xrange(world.numTerrains())]
+        return res
+
+    def test_parallel_matches_serial(self):
+        parallel = self.load(4)
+        serial = self.load(1)
+        self.assertEqual(len(parallel),3*len(MESHES)+2)
+        self.assertEqual(len(parallel),len(serial))
+        for p,s in zip(parallel,serial):
+            self.assertEqual(p,s)
+
+if __name__ == '__main__':
+    unittest.main()